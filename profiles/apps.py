@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class ProfilesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'profiles'
+
+    def ready(self):
+        from . import signals  # noqa: F401 — registers receivers
+        from . import tasks  # noqa: F401 — registers job handlers
@@ -0,0 +1,219 @@
+"""Process-wide registry for the Role / Agent / Map / Team catalog.
+
+Catalog rows change only through the admin or ``setup_project``, yet they
+are read on almost every request. This module keeps two things per worker:
+
+* ``resolve_icon_url`` memoises each icon URL per (model, pk, icon,
+  icon_url), since resolving an upload means an ``os.path.exists`` stat;
+* ``get_catalog()`` returns an immutable ``CatalogSnapshot`` of compact
+  ``__slots__`` records that the profile form, roster filters and card
+  renderer read instead of querying the four tables.
+
+Both are dropped whenever the catalog version changes. Saving or deleting a
+catalog row bumps the version (see ``profiles.signals``), which clears this
+process immediately and other processes on their next check — the shared
+version key is polled at most every ``CATALOG_VERSION_CHECK_INTERVAL``
+seconds. The snapshot is then rebuilt lazily on next use.
+"""
+
+import logging
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = 'catalog:version'
+
+_lock = threading.Lock()
+_build_lock = threading.Lock()
+_icon_urls = {}
+_state = {'version': None, 'checked_at': 0.0, 'snapshot': None}
+
+
+def catalog_version():
+    """Return the shared catalog version (0 until the catalog is first edited)."""
+    return cache.get(VERSION_KEY, 0)
+
+
+def bump_catalog_version():
+    """Invalidate every process's catalog registry."""
+    version = time.time_ns()
+    cache.set(VERSION_KEY, version, None)
+    with _lock:
+        _icon_urls.clear()
+        _state['version'] = version
+        _state['checked_at'] = time.monotonic()
+        _state['snapshot'] = None
+
+
+def _sync_version():
+    now = time.monotonic()
+    if now - _state['checked_at'] < getattr(settings, 'CATALOG_VERSION_CHECK_INTERVAL', 1.0):
+        return
+    version = catalog_version()
+    with _lock:
+        if version != _state['version']:
+            _icon_urls.clear()
+            _state['version'] = version
+            _state['snapshot'] = None
+        _state['checked_at'] = now
+
+
+def _resolve_icon_url(obj):
+    # Uploaded file first (only if it is actually on disk), then icon_url
+    if obj.icon:
+        try:
+            if os.path.exists(obj.icon.path):
+                return obj.icon.url
+        except (ValueError, NotImplementedError):
+            pass
+    return obj.icon_url or ''
+
+
+def resolve_icon_url(obj):
+    """Return the display URL for a catalog object's icon, memoised per version."""
+    if obj.pk is None:
+        return _resolve_icon_url(obj)
+    _sync_version()
+    key = (obj._meta.label_lower, obj.pk, obj.icon.name or '', obj.icon_url or '')
+    url = _icon_urls.get(key)
+    if url is None:
+        url = _resolve_icon_url(obj)
+        with _lock:
+            _icon_urls[key] = url
+    return url
+
+
+# ---------------------------------------------------------------------------
+# Snapshot
+# ---------------------------------------------------------------------------
+
+class CatalogRecord:
+    """Read-only stand-in for a catalog row, with the icon URL pre-resolved."""
+
+    __slots__ = ('id', 'name', 'icon', 'icon_url')
+
+    def __init__(self, obj):
+        self.id = obj.pk
+        self.name = obj.name
+        self.icon = obj.icon or None
+        self.icon_url = resolve_icon_url(obj)
+
+    @property
+    def pk(self):
+        return self.id
+
+    def get_icon_url(self):
+        return self.icon_url
+
+    def __str__(self):
+        return self.name
+
+    def __repr__(self):
+        return f'<{type(self).__name__} {self.id}: {self.name}>'
+
+
+class AgentRecord(CatalogRecord):
+    __slots__ = ('role',)
+
+    def __init__(self, obj, role):
+        super().__init__(obj)
+        self.role = role
+
+
+class TeamRecord(CatalogRecord):
+    __slots__ = ('custom_order',)
+
+    def __init__(self, obj):
+        super().__init__(obj)
+        self.custom_order = obj.custom_order
+
+
+class CatalogSnapshot:
+    """The whole catalog at one version, as tuples in each model's default ordering."""
+
+    __slots__ = ('version', 'agents', 'roles', 'teams', 'maps', '_by_id')
+
+    def __init__(self, version, agents, roles, teams, maps):
+        self.version = version
+        self.agents = tuple(agents)
+        self.roles = tuple(roles)
+        self.teams = tuple(teams)
+        self.maps = tuple(maps)
+        self._by_id = {
+            kind: {record.id: record for record in getattr(self, kind)}
+            for kind in ('agents', 'roles', 'teams', 'maps')
+        }
+
+    def get(self, kind, pk):
+        """Return the record of *kind* ('agents', 'roles', 'teams', 'maps') with *pk*, or None."""
+        return self._by_id[kind].get(pk)
+
+
+def _build_snapshot(version):
+    from .models import Agent, Map, Role, Team
+
+    roles = [CatalogRecord(role) for role in Role.objects.all()]
+    roles_by_id = {record.id: record for record in roles}
+    agents = [AgentRecord(agent, roles_by_id.get(agent.role_id)) for agent in Agent.objects.all()]
+    teams = [TeamRecord(team) for team in Team.objects.all()]
+    maps = [CatalogRecord(map_obj) for map_obj in Map.objects.all()]
+    return CatalogSnapshot(version, agents, roles, teams, maps)
+
+
+def get_catalog():
+    """Return the current ``CatalogSnapshot``, rebuilding it if the version moved."""
+    _sync_version()
+    snapshot = _state['snapshot']
+    if snapshot is not None and snapshot.version == _state['version']:
+        return snapshot
+    with _build_lock:
+        version = _state['version']
+        snapshot = _state['snapshot']
+        if snapshot is None or snapshot.version != version:
+            snapshot = _build_snapshot(version)
+            with _lock:
+                if _state['version'] == version:
+                    _state['snapshot'] = snapshot
+    return snapshot
+
+
+def warm_catalog():
+    """Load the snapshot at worker boot; a missing/unmigrated database is not fatal."""
+    try:
+        get_catalog()
+    except DatabaseError:
+        logger.warning('Catalog snapshot not loaded at startup; it will be built on first use.')
+
+
+def profile_selections(profile):
+    """Return ``(agents, roles, maps)`` selected on *profile* as snapshot records.
+
+    Costs one id-only query per relation and is memoised on the instance, so
+    the card cache key and the renderer share it. Objects that are not model
+    instances (benchmark doubles) are read through their relations as-is.
+    """
+    selections = getattr(profile, '_catalog_selections', None)
+    if selections is not None:
+        return selections
+
+    if not hasattr(profile, '_meta'):
+        return list(profile.agents.all()), list(profile.roles.all()), list(profile.maps.all())
+
+    catalog = get_catalog()
+    selections = []
+    for kind in ('agents', 'roles', 'maps'):
+        related = getattr(profile, kind)
+        ids = set(related.values_list('id', flat=True))
+        records = [record for record in getattr(catalog, kind) if record.id in ids]
+        if len(records) != len(ids):
+            # Row newer than this worker's snapshot; fall back to the database
+            records = list(related.all())
+        selections.append(records)
+    profile._catalog_selections = selections = tuple(selections)
+    return selections
@@ -3,6 +3,7 @@ from django.contrib.auth.forms import UserCreationForm, AuthenticationForm
 from django.contrib.auth.models import User
 from django.core.validators import RegexValidator
 from .models import Profile
+from .utils.riot_ids import RIOT_TAG_REGEX, normalize_name, normalize_riot_tag
 
 
 # ---------------------------------------------------------------------------
@@ -24,7 +25,7 @@ class SignUpForm(UserCreationForm):
         required=True,
         validators=[
             RegexValidator(
-                regex=r'^#[a-zA-Z0-9]{2,5}$',
+                regex=RIOT_TAG_REGEX,
                 message='Tag must start with # followed by 2-5 alphanumeric characters (e.g. #NA1)',
             )
         ],
@@ -173,47 +174,21 @@ class ProfileForm(forms.ModelForm):
         elif profile_picture_url:
             cleaned_data['profile_picture'] = None
 
-        # Check for duplicate duplicate in_game_name
-        if in_game_name:
-            # Case-insensitive check, excluding current profile if editing
-            query = Profile.objects.filter(in_game_name__iexact=in_game_name)
-            if self.instance.pk:
-                query = query.exclude(pk=self.instance.pk)
-            
-            if query.exists():
-                self.add_error('in_game_name', 'This In-Game Name is already taken.')
-
-        # Check for duplicate Riot ID + Tag combination
-        if riot_id:
-            # If tag is empty, treat it as empty string for comparison
-            tag_value = riot_tag if riot_tag else ''
-            
-            # Handle both NULL and empty string in DB for tag matching
-            # Filter for same ID (case-insensitive)
-            query = Profile.objects.filter(riot_id__iexact=riot_id)
-            
-            if self.instance.pk:
-                query = query.exclude(pk=self.instance.pk)
-            
-            # Since tag can be NULL or Empty in DB, we need to be careful.
-            # We'll just check matches in Python to be safe given the complexity of NULL vs '' on different DBs
-            # Or construct a complex Q object
-            duplicates = False
-            for p in query:
-                db_tag = p.riot_tag if p.riot_tag else ''
-                if db_tag.lower() == tag_value.lower():
-                    duplicates = True
-                    break
-            
-            if duplicates:
-                error_msg = f"The Riot ID {riot_id}"
-                if tag_value:
-                    error_msg += f"{tag_value}"
-                error_msg += " is already in use."
-                
-                self.add_error('riot_id', error_msg)
-                if tag_value:
-                    self.add_error('riot_tag', 'Combination taken.')
+        # Duplicate checks hit the unique *_norm indexes, excluding the
+        # current profile when editing. The constraints themselves close the
+        # race between this check and the save.
+        others = Profile.objects.exclude(pk=self.instance.pk) if self.instance.pk else Profile.objects.all()
+
+        if in_game_name and others.filter(in_game_name_norm=normalize_name(in_game_name)).exists():
+            self.add_error('in_game_name', 'This In-Game Name is already taken.')
+
+        if riot_id and others.filter(
+            riot_id_norm=normalize_name(riot_id), riot_tag_norm=normalize_riot_tag(riot_tag),
+        ).exists():
+            tag_value = riot_tag or ''
+            self.add_error('riot_id', f"The Riot ID {riot_id}{tag_value} is already in use.")
+            if tag_value:
+                self.add_error('riot_tag', 'Combination taken.')
 
         return cleaned_data
 
@@ -0,0 +1,75 @@
+import multiprocessing
+import tempfile
+import time
+from pathlib import Path
+
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management.base import BaseCommand
+
+from profiles.sqlite_cache import SQLiteCache
+
+_VALUE = {'peak_rank': 'Immortal 2', 'segments': list(range(50))}  # a small tracker-sized payload
+
+
+def _backends(tmp):
+    return {
+        'locmem': lambda: LocMemCache('bench', {'OPTIONS': {'MAX_ENTRIES': 100_000}}),
+        'file': lambda: FileBasedCache(str(Path(tmp) / 'files'), {'OPTIONS': {'MAX_ENTRIES': 100_000}}),
+        'sqlite': lambda: SQLiteCache(str(Path(tmp) / 'cache.sqlite3'), {'OPTIONS': {'MAX_ENTRIES': 100_000}}),
+    }
+
+
+def _incr_worker(factory, count):
+    cache = factory()
+    for _ in range(count):
+        try:
+            cache.incr('ratelimit')
+        except ValueError:
+            cache.add('ratelimit', 1)
+
+
+class Command(BaseCommand):
+    help = ('Benchmark the shared SQLite cache against LocMem and the file cache: single-process '
+            'get/set/incr throughput, and rate-limit counts kept by concurrent worker processes.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ops', type=int, default=5000)
+        parser.add_argument('--workers', type=int, default=3)
+
+    def _rate(self, func, ops):
+        start = time.perf_counter()
+        for i in range(ops):
+            func(i)
+        return ops / (time.perf_counter() - start)
+
+    def _shared_count(self, factory, workers, per_worker):
+        cache = factory()
+        cache.set('ratelimit', 0)
+        ctx = multiprocessing.get_context('fork')
+        procs = [ctx.Process(target=_incr_worker, args=(factory, per_worker)) for _ in range(workers)]
+        for proc in procs:
+            proc.start()
+        for proc in procs:
+            proc.join()
+        return cache.get('ratelimit')
+
+    def handle(self, *args, **options):
+        ops, workers = max(1, options['ops']), max(1, options['workers'])
+        per_worker = max(1, ops // 10)
+        expected = workers * per_worker
+
+        self.stdout.write(f'{ops} ops per test; {workers} processes x {per_worker} incr for the shared count')
+        self.stdout.write(f"{'backend':<8} {'set/s':>9} {'get/s':>9} {'incr/s':>9}   shared count")
+        with tempfile.TemporaryDirectory(prefix='bench-cache-') as tmp:
+            for name, factory in _backends(tmp).items():
+                cache = factory()
+                cache.set('ratelimit', 0)
+                set_rate = self._rate(lambda i: cache.set(f'k{i % 1000}', _VALUE, 300), ops)
+                get_rate = self._rate(lambda i: cache.get(f'k{i % 1000}'), ops)
+                incr_rate = self._rate(lambda i: cache.incr('ratelimit'), ops)
+                count = self._shared_count(factory, workers, per_worker)
+                verdict = 'ok' if count == expected else f'expected {expected}'
+                self.stdout.write(
+                    f'{name:<8} {set_rate:9.0f} {get_rate:9.0f} {incr_rate:9.0f}   {count} ({verdict})'
+                )
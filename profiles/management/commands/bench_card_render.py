@@ -0,0 +1,155 @@
+import re
+import time
+import tracemalloc
+from pathlib import Path
+from statistics import mean, median
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from django.core.management.base import BaseCommand
+from PIL import Image, ImageDraw
+
+from profiles.utils import card_image
+
+_PROC_STATUS = Path('/proc/self/status')
+_PROC_CLEAR_REFS = Path('/proc/self/clear_refs')
+
+
+# ---------------------------------------------------------------------------
+# Pre-optimisation implementations, kept only for the "before" numbers
+# ---------------------------------------------------------------------------
+
+def _legacy_draw_gradient(img):
+    draw = ImageDraw.Draw(img)
+    total = card_image.CARD_W + card_image.CARD_H
+    for i in range(total + 2):
+        t = i / total
+        color = tuple(
+            round(a + (b - a) * t) for a, b in zip(card_image.C_NAVY, card_image.C_TAN)
+        ) + (255,)
+        x1 = min(i, card_image.CARD_W - 1)
+        y1 = i - x1
+        x2 = i - min(i, card_image.CARD_H - 1)
+        y2 = min(i, card_image.CARD_H - 1)
+        draw.line([(x1, y1), (x2, y2)], fill=color, width=2)
+
+
+def _legacy_composite_over(base, overlay, x, y):
+    tmp = Image.new('RGBA', base.size, (0, 0, 0, 0))
+    tmp.paste(overlay.convert('RGBA'), (x, y))
+    base.alpha_composite(tmp)
+
+
+def _legacy_draw_watermark(img, text):
+    font = card_image._load_font('Oswald-Bold.ttf', 400)
+    layer = Image.new('RGBA', img.size, (0, 0, 0, 0))
+    draw = ImageDraw.Draw(layer)
+    bbox = draw.textbbox((0, 0), text, font=font)
+    tw, th = bbox[2] - bbox[0], bbox[3] - bbox[1]
+    draw.text(((card_image.CARD_W - tw) // 2, (card_image.CARD_H - th) // 2),
+              text, font=font, fill=(255, 255, 255, 13))
+    img.alpha_composite(layer)
+
+
+def _legacy_background():
+    img = Image.new('RGBA', (card_image.CARD_W, card_image.CARD_H), (*card_image.C_DARK, 255))
+    _legacy_draw_gradient(img)
+    return img
+
+
+# ---------------------------------------------------------------------------
+# Synthetic card data (no database needed)
+# ---------------------------------------------------------------------------
+
+class _Related(list):
+    def all(self):
+        return self
+
+
+def _catalog_item(name, folder):
+    url = f'/static/profiles/images/{folder}/{name}.png'
+    return SimpleNamespace(name=name, icon=None, get_icon_url=lambda url=url: url)
+
+
+def _sample_profile(teammate_count):
+    profile = SimpleNamespace(
+        in_game_name='Tyloo',
+        riot_tag='#NA1',
+        profile_picture=None,
+        profile_picture_url='/static/profiles/images/teams/House_of_Tyloo.png',
+        team=SimpleNamespace(name='House of Tyloo'),
+        agents=_Related(_catalog_item(n, 'agents') for n in ('Jett', 'Raze', 'Omen', 'Sova', 'Killjoy')),
+        roles=_Related(_catalog_item(n, 'roles') for n in ('Duelist', 'Controller', 'Initiator', 'Sentinel', 'IGL')),
+        maps=_Related(_catalog_item(n, 'maps') for n in ('Ascent', 'Bind', 'Haven')),
+        latest_tracker_snapshot=None,
+    )
+    teammates = [
+        SimpleNamespace(in_game_name=f'Mate{i}', profile_picture=None,
+                        profile_picture_url='/static/profiles/images/teams/Den_of_Tyloo.png')
+        for i in range(teammate_count)
+    ]
+    return profile, teammates
+
+
+def _reset_peak_rss():
+    """Reset the kernel's peak-RSS counter; returns False where unsupported."""
+    try:
+        _PROC_CLEAR_REFS.write_text('5')
+        return True
+    except OSError:
+        return False
+
+
+def _rss_kb(field):
+    match = re.search(rf'^{field}:\s+(\d+) kB', _PROC_STATUS.read_text(), re.MULTILINE)
+    return int(match.group(1)) if match else 0
+
+
+class Command(BaseCommand):
+    help = 'Micro-benchmark build_card_image: per-card time and peak memory, before vs after.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20)
+        parser.add_argument('--teammates', type=int, default=4)
+
+    def _measure(self, profile, teammates, iterations):
+        card_image.build_card_image(profile, teammates)  # warm fonts/icons
+
+        rss_supported = _reset_peak_rss()
+        rss_before = _rss_kb('VmRSS') if rss_supported else 0
+        tracemalloc.start()
+        timings = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            card_image.build_card_image(profile, teammates)
+            timings.append((time.perf_counter() - start) * 1000)
+        _, py_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        rss_peak = (_rss_kb('VmHWM') - rss_before) if rss_supported else None
+        return timings, py_peak, rss_peak
+
+    def _report(self, label, timings, py_peak, rss_peak):
+        timings = sorted(timings)
+        p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+        rss = f'{rss_peak / 1024:.1f} MB' if rss_peak is not None else 'n/a'
+        self.stdout.write(
+            f'{label:<7} mean {mean(timings):7.1f} ms | p50 {median(timings):7.1f} ms | '
+            f'p95 {p95:7.1f} ms | peak RSS growth {rss} | peak Python heap {py_peak / 1024:.0f} KB'
+        )
+
+    def handle(self, *args, **options):
+        iterations = max(1, options['iterations'])
+        profile, teammates = _sample_profile(options['teammates'])
+
+        with patch.object(card_image, '_composite_over', _legacy_composite_over), \
+             patch.object(card_image, '_draw_watermark', _legacy_draw_watermark), \
+             patch.object(card_image, '_gradient_background', _legacy_background):
+            before = self._measure(profile, teammates, iterations)
+        after = self._measure(profile, teammates, iterations)
+
+        self.stdout.write(f'{iterations} cards, 5 agents / 5 roles / 3 maps / {len(teammates)} teammates')
+        self._report('before', *before)
+        self._report('after', *after)
+        self.stdout.write(self.style.SUCCESS(
+            f'speed-up x{mean(before[0]) / max(mean(after[0]), 1e-9):.1f}'
+        ))
@@ -0,0 +1,128 @@
+import random
+import time
+from statistics import mean, median
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import RequestFactory
+
+from profiles.models import Agent, Map, Profile, Role, Team
+from profiles.services.search import rebuild_search_index, search_available, search_profiles
+from profiles.services.suggest import bump_suggest_version, get_suggest_index
+from profiles.views_search import search_suggest
+
+_SYLLABLES = ['ty', 'loo', 'jet', 'ra', 'ze', 'ka', 'vo', 'mi', 'sen', 'phy', 'ro', 'nix', 'zen', 'qu', 'el']
+_WORDS = ['clutch', 'entry', 'lurker', 'anchor', 'support', 'igl', 'flex', 'aim', 'calm', 'loud']
+_QUERIES = ['ty', 'tyloo', 'jett ascent', 'zenro', 'clutch igl', 'house', 'phyqu', 'nothingmatches']
+
+
+def _name(rng):
+    return ''.join(rng.choice(_SYLLABLES) for _ in range(rng.randint(2, 4))).capitalize()
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = ('Benchmark roster search at scale: icontains vs the FTS5 index, and the typeahead '
+            'endpoint, over N synthetic profiles. Runs inside a transaction that is rolled back.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--profiles', type=int, default=100_000)
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--seed', type=int, default=1)
+
+    def _time(self, func, repeat):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - start) * 1000)
+        return timings
+
+    def handle(self, *args, **options):
+        if not search_available():
+            raise CommandError('Full-text search needs SQLite with FTS5.')
+        try:
+            with transaction.atomic():
+                self._run(options)
+                raise _Rollback
+        except _Rollback:
+            self.stdout.write('Synthetic data rolled back.')
+
+    def _run(self, options):
+        rng = random.Random(options['seed'])
+        count, repeat = options['profiles'], max(1, options['repeat'])
+
+        role, _ = Role.objects.get_or_create(name='Duelist')
+        agents = [Agent.objects.get_or_create(name=n, defaults={'role': role})[0]
+                  for n in ('Jett', 'Raze', 'Sova', 'Omen')]
+        maps = [Map.objects.get_or_create(name=n)[0] for n in ('Ascent', 'Bind', 'Haven')]
+        teams = [Team.objects.create(name=f'Bench House {i}') for i in range(20)]
+
+        start = time.perf_counter()
+        Profile.objects.bulk_create(
+            (Profile(
+                in_game_name=f'{_name(rng)}{i}',
+                riot_id=_name(rng),
+                riot_tag=f'#{rng.randint(100, 99999)}',
+                team=rng.choice(teams + [None]),
+                bio=' '.join(rng.choice(_WORDS) for _ in range(rng.randint(0, 12))),
+            ) for i in range(count)),
+            batch_size=2000,
+        )
+        ids = list(Profile.objects.filter(riot_tag__isnull=False).values_list('id', flat=True))
+        Profile.agents.through.objects.bulk_create(
+            (Profile.agents.through(profile_id=pk, agent_id=rng.choice(agents).id) for pk in ids),
+            batch_size=5000, ignore_conflicts=True,
+        )
+        Profile.maps.through.objects.bulk_create(
+            (Profile.maps.through(profile_id=pk, map_id=rng.choice(maps).id) for pk in ids),
+            batch_size=5000, ignore_conflicts=True,
+        )
+        self.stdout.write(f'Seeded {len(ids)} profiles in {time.perf_counter() - start:.1f}s')
+
+        start = time.perf_counter()
+        indexed = rebuild_search_index()
+        self.stdout.write(f'Indexed {indexed} profiles in {time.perf_counter() - start:.1f}s')
+
+        self.stdout.write(f'{"query":<16} {"icontains p50":>14} {"fts5 p50":>10} {"hits":>6}')
+        before_all, after_all = [], []
+        for query in _QUERIES:
+            before = self._time(
+                lambda: list(Profile.objects.filter(in_game_name__icontains=query)
+                             .order_by('-created_at').values_list('id', flat=True)[:24]),
+                repeat,
+            )
+            after = self._time(lambda: search_profiles(query, limit=24), repeat)
+            before_all.extend(before)
+            after_all.extend(after)
+            hits = len(search_profiles(query))
+            self.stdout.write(f'{query:<16} {median(before):11.2f} ms {median(after):7.2f} ms {hits:>6}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'mean icontains {mean(before_all):.2f} ms vs fts5 {mean(after_all):.2f} ms'
+        ))
+        self._bench_suggest(repeat)
+
+    def _bench_suggest(self, repeat):
+        bump_suggest_version()
+        start = time.perf_counter()
+        index = get_suggest_index()
+        self.stdout.write(f'Suggest index: {len(index.keys)} keys built in {time.perf_counter() - start:.2f}s')
+
+        factory = RequestFactory()
+        prefixes = [q[:n] for q in _QUERIES for n in range(1, min(len(q), 6) + 1)]
+        timings = []
+        for _ in range(repeat * 20):
+            for prefix in prefixes:
+                request = factory.get('/api/search/suggest/', {'q': prefix})
+                start = time.perf_counter()
+                search_suggest(request)
+                timings.append((time.perf_counter() - start) * 1000)
+        timings.sort()
+        p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+        self.stdout.write(self.style.SUCCESS(
+            f'suggest view over {len(timings)} requests: p50 {median(timings):.3f} ms | p99 {p99:.3f} ms'
+        ))
@@ -0,0 +1,126 @@
+import multiprocessing
+import random
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+from statistics import median
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connections, transaction
+
+from profiles.utils.db_retry import retry_on_locked
+
+ROWS = 500
+PAYLOAD = 'x' * 600  # about the size of an encoded session with tracker autofill
+
+# What Django does with no OPTIONS: rollback journal, DEFERRED transactions,
+# the sqlite3 module's 5 s busy timeout
+BASELINE_OPTIONS = {'init_command': 'PRAGMA journal_mode=DELETE'}
+
+
+def _session_write(key):
+    # Read-then-write, like SessionStore.save / a profile save
+    with transaction.atomic():
+        with connections['default'].cursor() as cursor:
+            cursor.execute('SELECT data FROM bench_session WHERE k = %s', [key])
+            cursor.fetchone()
+            cursor.execute('UPDATE bench_session SET data = %s, hits = hits + 1 WHERE k = %s', [PAYLOAD, key])
+
+
+def _read(key):
+    with connections['default'].cursor() as cursor:
+        cursor.execute('SELECT data FROM bench_session WHERE k = %s', [key])
+        cursor.fetchone()
+
+
+def _worker(path, options, retry, seconds, write_ratio, seed, start_at, results):
+    # Forked child: point the default connection at the benchmark file
+    conn = connections['default']
+    conn.close()
+    conn.settings_dict = {**conn.settings_dict, 'NAME': path, 'OPTIONS': dict(options)}
+    write = retry_on_locked(_session_write) if retry else _session_write
+
+    rng = random.Random(seed)
+    reads = writes = failed = 0
+    latencies = []
+    time.sleep(max(0.0, start_at - time.time()))
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        key = rng.randrange(ROWS)
+        if rng.random() >= write_ratio:
+            _read(key)
+            reads += 1
+            continue
+        start = time.perf_counter()
+        try:
+            write(key)
+            writes += 1
+        except OperationalError:
+            failed += 1
+        latencies.append((time.perf_counter() - start) * 1000)
+    conn.close()
+    results.put((reads, writes, failed, latencies))
+
+
+def _create_database(path):
+    db = sqlite3.connect(path)
+    db.execute('CREATE TABLE bench_session (k INTEGER PRIMARY KEY, data TEXT NOT NULL, hits INTEGER NOT NULL)')
+    db.executemany('INSERT INTO bench_session VALUES (?, ?, 0)', [(k, PAYLOAD) for k in range(ROWS)])
+    db.commit()
+    db.close()
+
+
+class Command(BaseCommand):
+    help = ('Benchmark concurrent SQLite writers (one process per gunicorn worker): Django defaults '
+            'vs the configured WAL / IMMEDIATE / retry profile. Uses throwaway database files.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=6)
+        parser.add_argument('--seconds', type=float, default=5.0)
+        parser.add_argument('--write-ratio', type=float, default=0.3)
+
+    def _run(self, path, options, retry, opts):
+        _create_database(path)
+        connections.close_all()  # never share a connection across fork()
+        ctx = multiprocessing.get_context('fork')
+        results = ctx.Queue()
+        start_at = time.time() + 0.5
+        procs = [
+            ctx.Process(target=_worker, args=(path, options, retry, opts['seconds'], opts['write_ratio'],
+                                              seed, start_at, results))
+            for seed in range(opts['workers'])
+        ]
+        for proc in procs:
+            proc.start()
+        totals = [results.get() for _ in procs]
+        for proc in procs:
+            proc.join()
+
+        reads = sum(t[0] for t in totals)
+        writes = sum(t[1] for t in totals)
+        failed = sum(t[2] for t in totals)
+        latencies = sorted(ms for t in totals for ms in t[3])
+        return reads, writes, failed, latencies
+
+    def _report(self, label, seconds, reads, writes, failed, latencies):
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] if latencies else 0.0
+        self.stdout.write(
+            f'{label:<7} {writes / seconds:8.0f} writes/s | {reads / seconds:8.0f} reads/s | '
+            f'{failed:5d} "database is locked" | write p50 {median(latencies or [0]):6.1f} ms | p99 {p99:7.1f} ms'
+        )
+
+    def handle(self, *args, **opts):
+        configured = settings.DATABASES['default'].get('OPTIONS', {})
+        with tempfile.TemporaryDirectory(prefix='bench-sqlite-') as tmp:
+            before = self._run(str(Path(tmp) / 'before.sqlite3'), BASELINE_OPTIONS, False, opts)
+            after = self._run(str(Path(tmp) / 'after.sqlite3'), configured, True, opts)
+
+        self.stdout.write(f"{opts['workers']} processes x {opts['seconds']:.0f} s, "
+                          f"{opts['write_ratio']:.0%} read-then-write transactions")
+        self._report('before', opts['seconds'], *before)
+        self._report('after', opts['seconds'], *after)
+        self.stdout.write(self.style.SUCCESS(
+            f'write throughput x{(after[1] / max(before[1], 1)):.1f}'
+        ))
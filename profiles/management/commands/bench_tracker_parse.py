@@ -0,0 +1,292 @@
+import json
+import random
+import time
+import tracemalloc
+from pathlib import Path
+from statistics import median
+
+from django.core.management.base import BaseCommand, CommandError
+
+from profiles.services import tracker_api
+from profiles.utils.tracker_views import parse_profile
+
+PLAYLISTS = ['competitive', 'unrated', 'swiftplay', 'spikerush', 'deathmatch', 'premier']
+AGENTS = ['Jett', 'Raze', 'Reyna', 'Phoenix', 'Neon', 'Yoru', 'Iso', 'Omen', 'Brimstone', 'Viper', 'Astra',
+          'Harbor', 'Clove', 'Sova', 'Breach', 'Skye', 'KAY/O', 'Fade', 'Gekko', 'Killjoy', 'Cypher', 'Sage']
+STAT_NAMES = ['matchesPlayed', 'matchesWon', 'kills', 'deaths', 'kDRatio', 'damagePerRound',
+              'headshotsPercentage', 'timePlayed', 'scorePerRound', 'firstBloods']
+
+
+# ---------------------------------------------------------------------------
+# Pre-optimisation implementation, kept only for the "before" numbers
+# ---------------------------------------------------------------------------
+
+def _legacy_parse_profile(data, playlist="competitive", season_id=""):
+    platform = data["data"]["platformInfo"]
+    metadata = data["data"].get("metadata", {})
+    handle = platform["platformUserHandle"]
+    if "#" in handle:
+        riot_id, tag = handle.split("#", 1)
+        riot_tag = "#" + tag
+    else:
+        riot_id = handle
+        riot_tag = ""
+
+    avatar_url = platform.get("avatarUrl", "")
+    region = metadata.get("activeShard", "").upper()
+    segments = data["data"]["segments"]
+
+    def _get_seg(seg_type, attributes=None):
+        for seg in segments:
+            if seg["type"] != seg_type:
+                continue
+            if attributes and not all(
+                seg["attributes"].get(k) == v for k, v in attributes.items()
+            ):
+                continue
+            return seg
+        return None
+
+    # ── Current-season stats ────────────────────────────────────────────
+    target_playlist = (playlist or metadata.get("defaultPlaylist") or "competitive").lower()
+    default_season_id = season_id or metadata.get("defaultSeason", "")
+    season = None
+    if default_season_id:
+        season = _get_seg(
+            "season",
+            {"playlist": target_playlist, "seasonId": default_season_id},
+        )
+    if not season:
+        season = _get_seg("season", {"playlist": target_playlist})
+    if not season:
+        season = _get_seg("season")
+    season_stats = season["stats"] if season else {}
+
+    rank_meta = season_stats.get("rank", {}).get("metadata", {})
+    current_rank = rank_meta.get("tierName", "")
+    current_rank_icon = rank_meta.get("iconUrl", "")
+
+    # ── Peak rank — PRIMARY: dedicated peak-rating segment ──────────────
+    peak_seg = _get_seg("peak-rating", {"playlist": target_playlist})
+    if peak_seg:
+        pr = peak_seg["stats"].get("peakRating", {})
+        peak_meta = pr.get("metadata", {})
+        peak_rank = pr.get("displayValue", "")
+        peak_rank_icon = peak_meta.get("iconUrl", "")
+        peak_act = peak_meta.get("actName", "")
+    else:
+        # FALLBACK: season segment's peakRank (act-scoped only)
+        pr = season_stats.get("peakRank", {})
+        peak_meta = pr.get("metadata", {})
+        peak_rank = pr.get("displayValue", "")
+        peak_rank_icon = peak_meta.get("iconUrl", "")
+        peak_act = peak_meta.get("actName", "")
+
+    # Some tracker responses omit peak icon metadata; use current rank icon as fallback.
+    if not peak_rank_icon:
+        peak_rank_icon = current_rank_icon
+
+    # ── Other season stats ───────────────────────────────────────────────
+    kd_ratio = ""
+    for kd_key in ("kDRatio", "kdRatio", "kd", "killDeathRatio"):
+        kd_stat = season_stats.get(kd_key)
+        if kd_stat:
+            kd_ratio = kd_stat.get("displayValue", "")
+            break
+
+    wins = season_stats.get("matchesWon", {}).get("displayValue", "")
+    matches_played = season_stats.get("matchesPlayed", {}).get("displayValue", "")
+    damage_per_round = season_stats.get("damagePerRound", {}).get("displayValue", "")
+    headshot_pct = season_stats.get("headshotsPercentage", {}).get("displayValue", "")
+
+    # ── Top agents ───────────────────────────────────────────────────────
+    agent_segs = []
+    for seg in segments:
+        if seg.get("type") != "agent":
+            continue
+        attrs = seg.get("attributes", {})
+        if attrs.get("playlist") != target_playlist:
+            continue
+        if default_season_id and attrs.get("seasonId") != default_season_id:
+            continue
+        agent_segs.append(seg)
+
+    # API order is not guaranteed to be "top"; sort by matches played and then time played.
+    agent_segs.sort(
+        key=lambda s: (
+            s.get("stats", {}).get("matchesPlayed", {}).get("value", 0),
+            s.get("stats", {}).get("timePlayed", {}).get("value", 0),
+        ),
+        reverse=True,
+    )
+
+    if not agent_segs:
+        agent_segs = [s for s in segments if s.get("type") == "agent"]
+        agent_segs.sort(
+            key=lambda s: (
+                s.get("stats", {}).get("matchesPlayed", {}).get("value", 0),
+                s.get("stats", {}).get("timePlayed", {}).get("value", 0),
+            ),
+            reverse=True,
+        )
+
+    top_agents = []
+    primary_agent_key = ""
+    primary_agent_name = ""
+    for agent in agent_segs[:5]:
+        meta = agent.get("metadata", {})
+        attrs = agent.get("attributes", {})
+        agent_key = attrs.get("key") or attrs.get("agentId") or ""
+        name = (
+            meta.get("agentName")
+            or meta.get("name")
+            or attrs.get("agentName")
+            or attrs.get("agentId")
+            or "Unknown"
+        )
+        if not primary_agent_key:
+            primary_agent_key = str(agent_key)
+            primary_agent_name = str(name).strip().lower()
+        a_stats = agent.get("stats", {})
+        a_kd = ""
+        for kd_key in ("kDRatio", "kdRatio", "kd", "killDeathRatio"):
+            if kd_key in a_stats:
+                a_kd = a_stats[kd_key].get("displayValue", "")
+                break
+        top_agents.append({
+            "name": name,
+            "wins": a_stats.get("matchesWon", {}).get("displayValue", ""),
+            "played": a_stats.get("matchesPlayed", {}).get("displayValue", ""),
+            "kd": a_kd,
+        })
+
+
+    return {
+        "riot_id": riot_id,
+        "riot_tag": riot_tag,
+        "in_game_name": riot_id,
+        "avatar_url": avatar_url,
+        "region": region,
+        "current_rank": current_rank,
+        "current_rank_icon": current_rank_icon,
+        "peak_rank": peak_rank,
+        "peak_rank_icon": peak_rank_icon,
+        "peak_act": peak_act,
+        "kd_ratio": kd_ratio,
+        "wins": wins,
+        "matches_played": matches_played,
+        "damage_per_round": damage_per_round,
+        "headshot_pct": headshot_pct,
+        "top_agents": top_agents,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Synthetic payload shaped like a tracker.gg v2 profile response
+# ---------------------------------------------------------------------------
+
+def _stat(rng, name):
+    value = round(rng.uniform(0, 500), 2)
+    return {
+        'rank': None, 'percentile': round(rng.uniform(0, 100), 1),
+        'displayName': name, 'displayCategory': 'General', 'category': 'general',
+        'metadata': {}, 'value': value, 'displayValue': f'{value:g}', 'displayType': 'Number',
+    }
+
+
+def _stats(rng):
+    return {name: _stat(rng, name) for name in STAT_NAMES}
+
+
+def synthetic_payload(playlists, seasons, agents, seed=1):
+    rng = random.Random(seed)
+    season_ids = [f'season-{i:02d}' for i in range(seasons)]
+    segments = []
+    for playlist in PLAYLISTS[:playlists]:
+        segments.append({
+            'type': 'peak-rating', 'attributes': {'playlist': playlist}, 'metadata': {},
+            'stats': {'peakRating': {'displayValue': 'Immortal 2',
+                                     'metadata': {'iconUrl': 'https://example.invalid/27.png', 'actName': 'E9: A2'}}},
+        })
+        for season_id in season_ids:
+            stats = _stats(rng)
+            stats['rank'] = {'metadata': {'tierName': 'Diamond 3', 'iconUrl': 'https://example.invalid/20.png'}}
+            segments.append({'type': 'season', 'attributes': {'playlist': playlist, 'seasonId': season_id},
+                             'metadata': {'name': season_id}, 'stats': stats})
+            for name in rng.sample(AGENTS, min(agents, len(AGENTS))):
+                segments.append({
+                    'type': 'agent',
+                    'attributes': {'playlist': playlist, 'seasonId': season_id, 'key': name.lower()},
+                    'metadata': {'name': name, 'imageUrl': f'https://example.invalid/{name}.png'},
+                    'stats': _stats(rng),
+                })
+    return {'data': {
+        'platformInfo': {'platformUserHandle': 'Tyloo#NA1', 'avatarUrl': 'https://example.invalid/a.png'},
+        'metadata': {'activeShard': 'na', 'defaultPlaylist': 'competitive', 'defaultSeason': season_ids[-1]},
+        'segments': segments,
+    }}
+
+
+class Command(BaseCommand):
+    help = ('Benchmark decoding + parsing tracker.gg profile payloads: stdlib json and linear segment '
+            'scans (before) vs the segment index and orjson when installed (after).')
+
+    def add_arguments(self, parser):
+        parser.add_argument('payloads', nargs='*', help='Recorded tracker.gg JSON responses (default: synthetic).')
+        parser.add_argument('--iterations', type=int, default=50)
+        parser.add_argument('--playlists', type=int, default=4)
+        parser.add_argument('--seasons', type=int, default=8)
+        parser.add_argument('--agents', type=int, default=12)
+
+    def _bodies(self, options):
+        if not options['payloads']:
+            payload = synthetic_payload(options['playlists'], options['seasons'], options['agents'])
+            return [('synthetic', json.dumps(payload).encode())]
+        bodies = []
+        for path in options['payloads']:
+            try:
+                bodies.append((Path(path).name, Path(path).read_bytes()))
+            except OSError as exc:
+                raise CommandError(f'Cannot read {path}: {exc}') from exc
+        return bodies
+
+    def _time(self, func, arg, iterations):
+        func(arg)  # warm up
+        timings = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            func(arg)
+            timings.append((time.perf_counter() - start) * 1000)
+        return median(timings)
+
+    def _peak_heap(self, func, arg):
+        # Separate pass: tracemalloc would skew the timings
+        tracemalloc.start()
+        func(arg)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return peak
+
+    def _measure(self, label, decode, parse, body, iterations):
+        data = decode(body)
+        decode_ms = self._time(decode, body, iterations)
+        parse_ms = self._time(parse, data, iterations)
+        peak = self._peak_heap(lambda b: parse(decode(b)), body)
+        self.stdout.write(f'  {label:<7} decode {decode_ms:7.2f} ms | parse {parse_ms:6.2f} ms | '
+                          f'total {decode_ms + parse_ms:7.2f} ms | peak Python heap {peak / 1024:6.0f} KB')
+        return decode_ms + parse_ms
+
+    def handle(self, *args, **options):
+        iterations = max(1, options['iterations'])
+        decoder = 'orjson' if tracker_api.orjson is not None else 'json (orjson not installed)'
+        self.stdout.write(f'{iterations} iterations per payload (medians); decoder: {decoder}')
+
+        for name, body in self._bodies(options):
+            data = json.loads(body)
+            legacy, parsed = _legacy_parse_profile(data), parse_profile(data)
+            if any(parsed[name] != value for name, value in legacy.items()):
+                raise CommandError(f'{name}: parsed results differ between implementations')
+            self.stdout.write(f"{name}: {len(body) / 1024:.0f} KB, {len(data['data']['segments'])} segments")
+            before = self._measure('before', json.loads, _legacy_parse_profile, body, iterations)
+            after = self._measure('after', tracker_api.decode_json, parse_profile, body, iterations)
+            self.stdout.write(self.style.SUCCESS(f'  speed-up x{before / max(after, 1e-9):.1f}'))
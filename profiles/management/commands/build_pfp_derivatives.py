@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from profiles.models import Profile
+from profiles.utils.pfp_derivatives import refresh_profile_picture_derivatives
+
+
+class Command(BaseCommand):
+    help = 'Generate profile-picture derivatives for profiles that are missing or out of date.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Rebuild derivatives even if they are already up to date.',
+        )
+
+    def handle(self, *args, **kwargs):
+        force = bool(kwargs.get('force'))
+        profiles = Profile.objects.exclude(
+            Q(profile_picture='') | Q(profile_picture__isnull=True),
+            Q(profile_picture_url='') | Q(profile_picture_url__isnull=True),
+        )
+        built = 0
+        for profile in profiles.iterator():
+            if refresh_profile_picture_derivatives(profile, force=force):
+                built += 1
+        self.stdout.write(self.style.SUCCESS(f'Built derivatives for {built} profile(s).'))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from profiles.services.search import rebuild_search_index, search_available
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text player search index from the profiles table.'
+
+    def handle(self, *args, **kwargs):
+        if not search_available():
+            raise CommandError('Full-text search needs SQLite with FTS5; nothing to rebuild.')
+        indexed = rebuild_search_index()
+        self.stdout.write(self.style.SUCCESS(f'Indexed {indexed} profile(s).'))
@@ -0,0 +1,236 @@
+import json
+import os
+import signal
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import F, Max, Q
+from django.utils import timezone
+
+from profiles.models import Profile
+from profiles.services import tracker_api
+from profiles.services.tracker_snapshots import record_snapshot
+from profiles.utils.card_cache import invalidate_profile_cards
+from profiles.utils.ranks import rank_tier
+from profiles.utils.tracker_views import select_view
+
+# bulk_update bypasses Profile.save(), so the derived tier is written explicitly
+PEAK_FIELDS = ['peak_rank', 'peak_rank_icon', Profile.DERIVED_FIELDS['peak_rank']]
+
+
+class _Backoff:
+    """One pause shared by every worker: a 429 holds them all back, doubling per strike."""
+
+    def __init__(self, base, cap):
+        self._lock = threading.Lock()
+        self.base, self.cap = base, cap
+        self.strikes = 0
+        self.until = 0.0
+        self.hits = 0
+
+    def wait(self, stop):
+        with self._lock:
+            delay = self.until - time.monotonic()
+        if delay > 0:
+            stop.wait(delay)
+
+    def hit(self, retry_after=0):
+        with self._lock:
+            self.hits += 1
+            self.strikes += 1
+            delay = max(retry_after, min(self.cap, self.base * 2 ** (self.strikes - 1)))
+            self.until = max(self.until, time.monotonic() + delay)
+            return delay
+
+    def reset(self):
+        with self._lock:
+            self.strikes = 0
+
+
+class Command(BaseCommand):
+    help = ('Refresh peak ranks from tracker.gg for claimed profiles with a Riot ID, oldest snapshot '
+            'first, within the site-wide TRACKER_UPSTREAM_RPM budget. Progress is checkpointed so an '
+            'interrupted run resumes where it stopped.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4, help='Concurrent lookups.')
+        parser.add_argument('--rpm', type=int, default=None,
+                            help='Upstream requests per minute (default: TRACKER_UPSTREAM_RPM).')
+        parser.add_argument('--min-age', type=float, default=None,
+                            help='Only profiles whose latest snapshot is older than this many hours '
+                                 '(default: TRACKER_SNAPSHOT_FRESH_SECONDS).')
+        parser.add_argument('--limit', type=int, default=None, help='Refresh at most this many profiles.')
+        parser.add_argument('--batch-size', type=int, default=50, help='Profiles per bulk_update / checkpoint.')
+        parser.add_argument('--max-retries', type=int, default=3, help='Retries per profile after a 429.')
+        parser.add_argument('--backoff', type=float, default=15.0,
+                            help='First pause after a 429, in seconds; doubles per strike up to 5 minutes.')
+        parser.add_argument('--checkpoint', default=None,
+                            help='Checkpoint file (default: data/refresh_tracker_ranks.json).')
+        parser.add_argument('--restart', action='store_true', help='Ignore an existing checkpoint.')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='List the profiles that would be refreshed; no requests, no writes.')
+
+    # -- selection ---------------------------------------------------------------
+
+    def _candidates(self, min_age_hours, skip_ids):
+        cutoff = timezone.now() - timedelta(hours=min_age_hours)
+        return (
+            Profile.objects
+            .filter(user__isnull=False)
+            .exclude(Q(riot_id_norm__isnull=True) | Q(riot_id_norm='') | Q(riot_tag_norm=''))
+            .exclude(id__in=skip_ids)
+            .annotate(last_fetched=Max('tracker_snapshots__fetched_at'))
+            .filter(Q(last_fetched__isnull=True) | Q(last_fetched__lt=cutoff))
+            .order_by(F('last_fetched').asc(nulls_first=True), 'id')
+            .only('id', 'in_game_name', 'riot_id', 'riot_tag', *PEAK_FIELDS)
+        )
+
+    # -- checkpoint ----------------------------------------------------------------
+
+    def _load_checkpoint(self, path):
+        try:
+            return set(json.loads(path.read_text())['done'])
+        except (OSError, ValueError, KeyError):
+            return set()
+
+    def _save_checkpoint(self, path, done):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix('.tmp')
+        tmp.write_text(json.dumps({'done': sorted(done), 'saved_at': timezone.now().isoformat()}))
+        os.replace(tmp, path)
+
+    # -- lookups (worker threads: network only, no database) --------------------------
+
+    def _lookup(self, profile, rpm, backoff, stop, max_retries):
+        for _ in range(max_retries + 1):
+            backoff.wait(stop)
+            if stop.is_set():
+                return profile, None, 'interrupted'
+            try:
+                # Stale cache entries are refetched here, within the budget, not revalidated in the background
+                with tracker_api.upstream_budget(rpm, stop=stop):
+                    data = tracker_api.fetch_tracker_views(profile.riot_id, profile.riot_tag, allow_stale=False)
+            except tracker_api.BudgetInterrupted:
+                return profile, None, 'interrupted'
+            except (tracker_api.TrackerRateLimited, tracker_api.TrackerUnavailable) as exc:
+                delay = backoff.hit(exc.retry_after)
+                self.stderr.write(f'{profile.riot_id}{profile.riot_tag}: {exc} Backing off {delay:.0f}s.')
+                continue
+            except tracker_api.TrackerNotFound:
+                return profile, None, 'not_found'
+            except ValueError as exc:
+                return profile, None, str(exc)
+            backoff.reset()
+            return profile, data, None
+        return profile, None, 'rate limited'
+
+    # -- results (main thread) --------------------------------------------------------
+
+    def _apply(self, profile, data, pending, stats):
+        record_snapshot(profile, data)
+        view = select_view(data)
+        if not view['peak_rank']:
+            stats['no_rank'] += 1
+        elif (view['peak_rank'], view['peak_rank_icon']) == (profile.peak_rank, profile.peak_rank_icon):
+            stats['unchanged'] += 1
+        else:
+            profile.peak_rank = view['peak_rank']
+            profile.peak_rank_icon = view['peak_rank_icon']
+            profile.peak_rank_tier = rank_tier(profile.peak_rank)
+            pending.append(profile)
+            stats['updated'] += 1
+
+    def _flush(self, pending, done, checkpoint):
+        if pending:
+            Profile.objects.bulk_update(pending, PEAK_FIELDS)
+            invalidate_profile_cards(*(profile.pk for profile in pending))
+            pending.clear()
+        self._save_checkpoint(checkpoint, done)
+
+    def handle(self, *args, **opts):
+        rpm = max(1, opts['rpm'] or getattr(settings, 'TRACKER_UPSTREAM_RPM', 30))
+        min_age = opts['min_age']
+        if min_age is None:
+            min_age = getattr(settings, 'TRACKER_SNAPSHOT_FRESH_SECONDS', 6 * 3600) / 3600
+        checkpoint = Path(opts['checkpoint'] or Path(settings.BASE_DIR) / 'data' / 'refresh_tracker_ranks.json')
+        done = set() if opts['restart'] else self._load_checkpoint(checkpoint)
+
+        candidates = self._candidates(min_age, done)
+        if opts['limit']:
+            candidates = candidates[:opts['limit']]
+        profiles = list(candidates)
+        if done:
+            self.stdout.write(f'Resuming: {len(done)} profile(s) already done in this run.')
+
+        if opts['dry_run']:
+            for profile in profiles:
+                last = profile.last_fetched.strftime('%Y-%m-%d %H:%M') if profile.last_fetched else 'never'
+                self.stdout.write(f'  {profile.riot_id}{profile.riot_tag:<8} last snapshot {last}  '
+                                  f'peak {profile.peak_rank or "-"}')
+            minutes = len(profiles) / rpm
+            self.stdout.write(self.style.SUCCESS(
+                f'Dry run: {len(profiles)} profile(s) to refresh, at least {minutes:.1f} min at {rpm} req/min.'
+            ))
+            return
+
+        stop = threading.Event()
+        previous = {sig: signal.signal(sig, lambda *_: stop.set()) for sig in (signal.SIGINT, signal.SIGTERM)}
+        backoff = _Backoff(base=max(0.0, opts['backoff']), cap=300.0)
+        stats = dict.fromkeys(('updated', 'unchanged', 'no_rank', 'not_found', 'failed'), 0)
+        pending = []
+        workers = max(1, opts['workers'])
+        started = time.monotonic()
+        todo = iter(profiles)
+
+        try:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='tracker-refresh') as pool:
+                in_flight = set()
+                while True:
+                    # Keep at most two lookups per worker queued, so a stop takes effect quickly
+                    while not stop.is_set() and len(in_flight) < workers * 2:
+                        profile = next(todo, None)
+                        if profile is None:
+                            break
+                        in_flight.add(pool.submit(self._lookup, profile, rpm, backoff, stop, opts['max_retries']))
+                    if not in_flight:
+                        break
+                    finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        profile, data, error = future.result()
+                        if error == 'interrupted':
+                            continue
+                        if data is not None:
+                            self._apply(profile, data, pending, stats)
+                        elif error == 'not_found':
+                            stats['not_found'] += 1
+                        else:
+                            # Not checkpointed: a resumed run tries it again
+                            stats['failed'] += 1
+                            self.stderr.write(f'{profile.riot_id}{profile.riot_tag}: {error}')
+                            continue
+                        done.add(profile.pk)
+                        if len(pending) >= opts['batch_size'] or len(done) % opts['batch_size'] == 0:
+                            self._flush(pending, done, checkpoint)
+        finally:
+            self._flush(pending, done, checkpoint)
+            for sig, handler in previous.items():
+                signal.signal(sig, handler)
+
+        elapsed = time.monotonic() - started
+        looked_up = sum(stats.values())
+        self.stdout.write(
+            f"Looked up {looked_up} profile(s) in {elapsed:.1f}s ({looked_up / max(elapsed, 1e-9) * 60:.1f}/min, "
+            f"budget {rpm} req/min): {stats['updated']} peak rank(s) updated, {stats['unchanged']} unchanged, "
+            f"{stats['no_rank']} without a rank, {stats['not_found']} not found, {stats['failed']} failed; "
+            f"{backoff.hits} rate-limit backoff(s)."
+        )
+        if stop.is_set():
+            self.stdout.write(self.style.WARNING(f'Interrupted; rerun to resume from {checkpoint}.'))
+        else:
+            checkpoint.unlink(missing_ok=True)
+            self.stdout.write(self.style.SUCCESS('Done.'))
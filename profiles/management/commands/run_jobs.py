@@ -0,0 +1,44 @@
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+
+from profiles.services import jobs
+
+
+class Command(BaseCommand):
+    help = 'Run background job workers (tracker.gg fetches, card renders) in this process.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=2, help='Number of worker threads.')
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Run every queued job once on the main thread, then exit.',
+        )
+
+    def handle(self, *args, **kwargs):
+        jobs.fail_stale_jobs()
+        jobs.purge_finished_jobs()
+
+        if kwargs.get('once'):
+            count = jobs.run_pending()
+            self.stdout.write(self.style.SUCCESS(f'Ran {count} job(s).'))
+            return
+
+        stop = threading.Event()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, lambda *_: stop.set())
+
+        workers = [
+            threading.Thread(target=jobs.worker_loop, args=(stop,), name=f'job-worker-{idx}', daemon=True)
+            for idx in range(max(1, kwargs['workers']))
+        ]
+        for thread in workers:
+            thread.start()
+        self.stdout.write(self.style.SUCCESS(f'Started {len(workers)} job worker(s). Ctrl+C to stop.'))
+
+        while not stop.is_set():
+            stop.wait(1)
+        for thread in workers:
+            thread.join(timeout=30)
@@ -0,0 +1,31 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0013_profile_peak_rank_icon'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='pfp_card',
+            field=models.ImageField(blank=True, editable=False, null=True, upload_to='profiles/derived/'),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='pfp_list',
+            field=models.ImageField(blank=True, editable=False, null=True, upload_to='profiles/derived/'),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='pfp_source',
+            field=models.CharField(blank=True, default='', editable=False, max_length=600),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='pfp_thumb',
+            field=models.ImageField(blank=True, editable=False, null=True, upload_to='profiles/derived/'),
+        ),
+    ]
@@ -0,0 +1,51 @@
+from django.db import migrations
+
+# Full-text index over profiles (see profiles/services/search.py). SQLite
+# only: on other databases search falls back to icontains.
+
+CREATE_SQL = """
+CREATE VIRTUAL TABLE IF NOT EXISTS profiles_profile_search USING fts5(
+    in_game_name, riot_id, team, bio, agents, maps,
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3'
+)
+"""
+
+POPULATE_SQL = """
+INSERT INTO profiles_profile_search (rowid, in_game_name, riot_id, team, bio, agents, maps)
+SELECT p.id,
+       p.in_game_name,
+       p.riot_id || ' ' || REPLACE(COALESCE(p.riot_tag, ''), '#', ''),
+       COALESCE(t.name, ''),
+       p.bio,
+       COALESCE((SELECT group_concat(a.name, ' ') FROM profiles_profile_agents pa
+                 JOIN profiles_agent a ON a.id = pa.agent_id WHERE pa.profile_id = p.id), ''),
+       COALESCE((SELECT group_concat(m.name, ' ') FROM profiles_profile_maps pm
+                 JOIN profiles_map m ON m.id = pm.map_id WHERE pm.profile_id = p.id), '')
+FROM profiles_profile p
+LEFT JOIN profiles_team t ON t.id = p.team_id
+"""
+
+
+def create_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(CREATE_SQL)
+    schema_editor.execute(POPULATE_SQL)
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute('DROP TABLE IF EXISTS profiles_profile_search')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0015_job'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
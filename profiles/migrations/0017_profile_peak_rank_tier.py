@@ -0,0 +1,29 @@
+from django.db import migrations, models
+
+# Frozen copy of profiles.utils.ranks.RANK_TIERS at the time of this migration
+RANK_TIERS = (
+    'Iron', 'Bronze', 'Silver', 'Gold', 'Platinum',
+    'Diamond', 'Ascendant', 'Immortal', 'Radiant',
+)
+
+
+def backfill_peak_rank_tier(apps, schema_editor):
+    Profile = apps.get_model('profiles', 'Profile')
+    for tier, name in enumerate(RANK_TIERS, start=1):
+        Profile.objects.filter(peak_rank__istartswith=name).update(peak_rank_tier=tier)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0016_profile_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='peak_rank_tier',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_peak_rank_tier, migrations.RunPython.noop),
+    ]
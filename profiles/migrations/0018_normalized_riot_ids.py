@@ -0,0 +1,86 @@
+from django.db import migrations, models
+
+
+# Frozen copies of profiles.utils.riot_ids at the time of this migration
+def _name(value):
+    return (value or '').strip().casefold()
+
+
+def _tag(value):
+    return (value or '').strip().lstrip('#').casefold()
+
+
+def backfill_normalized_ids(apps, schema_editor):
+    """Fill the *_norm columns. Where legacy rows already collide, the oldest
+    keeps the value and later ones stay NULL (exempt from the constraints)
+    until they are renamed through the form."""
+    Profile = apps.get_model('profiles', 'Profile')
+    UserProfile = apps.get_model('profiles', 'UserProfile')
+
+    names, riot_ids, batch = set(), set(), []
+    for profile in Profile.objects.order_by('created_at', 'pk').iterator(chunk_size=2000):
+        name = _name(profile.in_game_name)
+        profile.in_game_name_norm = name if name not in names else None
+        names.add(name)
+
+        riot_key = (_name(profile.riot_id), _tag(profile.riot_tag))
+        profile.riot_tag_norm = riot_key[1]
+        profile.riot_id_norm = riot_key[0] if not riot_key[0] or riot_key not in riot_ids else None
+        riot_ids.add(riot_key)
+        batch.append(profile)
+    Profile.objects.bulk_update(batch, ['in_game_name_norm', 'riot_id_norm', 'riot_tag_norm'], batch_size=500)
+
+    batch = []
+    for user_profile in UserProfile.objects.iterator(chunk_size=2000):
+        user_profile.riot_id_norm = _name(user_profile.riot_id)
+        user_profile.riot_tag_norm = _tag(user_profile.riot_tag)
+        batch.append(user_profile)
+    UserProfile.objects.bulk_update(batch, ['riot_id_norm', 'riot_tag_norm'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0017_profile_peak_rank_tier'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='in_game_name_norm',
+            field=models.CharField(editable=False, max_length=100, null=True),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='riot_id_norm',
+            field=models.CharField(editable=False, max_length=50, null=True),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='riot_tag_norm',
+            field=models.CharField(default='', editable=False, max_length=10),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='riot_id_norm',
+            field=models.CharField(default='', editable=False, max_length=50),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='riot_tag_norm',
+            field=models.CharField(default='', editable=False, max_length=10),
+        ),
+        migrations.RunPython(backfill_normalized_ids, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='userprofile',
+            index=models.Index(fields=['riot_id_norm', 'riot_tag_norm'], name='profiles_us_riot_id_8cd01f_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='profile',
+            constraint=models.UniqueConstraint(fields=('in_game_name_norm',), name='profile_unique_in_game_name'),
+        ),
+        migrations.AddConstraint(
+            model_name='profile',
+            constraint=models.UniqueConstraint(condition=models.Q(('riot_id_norm', ''), _negated=True), fields=('riot_id_norm', 'riot_tag_norm'), name='profile_unique_riot_id'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def _reverse_index(table, column):
+    # (catalog id, profile id) on an auto-created M2M through table, which has
+    # no Meta of its own. Serves "which profiles play X" lookups from the index
+    # alone; the unique (profile_id, X_id) index covers the forward direction.
+    name = f'{table}_{column}_profile_idx'
+    return migrations.RunSQL(
+        f'CREATE INDEX {name} ON {table} ({column}, profile_id)',
+        f'DROP INDEX {name}',
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0018_normalized_riot_ids'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='profile',
+            name='team',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.PROTECT, to='profiles.team'),
+        ),
+        migrations.AddIndex(
+            model_name='profile',
+            index=models.Index(fields=['created_at', 'id'], name='profile_newest_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='profile',
+            index=models.Index(fields=['team', 'created_at', 'id'], name='profile_team_newest_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='profile',
+            index=models.Index(fields=['peak_rank_tier', 'created_at'], name='profile_rank_tier_idx'),
+        ),
+        _reverse_index('profiles_profile_roles', 'role_id'),
+        _reverse_index('profiles_profile_agents', 'agent_id'),
+        _reverse_index('profiles_profile_maps', 'map_id'),
+    ]
@@ -0,0 +1,25 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0019_query_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrackerSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fetched_at', models.DateTimeField()),
+                ('data', models.JSONField()),
+                ('profile', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='tracker_snapshots', to='profiles.profile')),
+            ],
+            options={
+                'ordering': ['-fetched_at', '-id'],
+                'indexes': [models.Index(fields=['profile', '-fetched_at', '-id'], name='tracker_snapshot_latest_idx')],
+            },
+        ),
+    ]
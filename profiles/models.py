@@ -1,10 +1,32 @@
-import os
+import uuid
+from functools import cached_property
 
 from django.db import models
 from django.core.validators import RegexValidator
 from django.contrib.auth.models import User
 
-class Role(models.Model):
+from .catalog import resolve_icon_url
+from .utils.ranks import rank_tier
+from .utils.riot_ids import RIOT_TAG_REGEX, normalize_name, normalize_riot_tag
+from .utils.tracker_views import select_view
+
+
+def _with_derived_fields(update_fields, derived):
+    """Extend a save(update_fields=...) list with the columns derived from it."""
+    if update_fields is None:
+        return None
+    return {*update_fields, *(column for source, column in derived.items() if source in update_fields)}
+
+
+class IconMixin:
+    """get_icon_url() for catalog models with an ``icon`` upload and ``icon_url`` fallback."""
+
+    def get_icon_url(self):
+        # Uploaded file if it exists on disk, else icon_url — memoised in profiles.catalog
+        return resolve_icon_url(self)
+
+
+class Role(IconMixin, models.Model):
     """
     Valorant roles that exist independently.
     Examples: Duelist, Controller, Initiator, Sentinel
@@ -14,16 +36,6 @@ class Role(models.Model):
     icon = models.ImageField(upload_to='roles/', blank=True, null=True)
     icon_url = models.URLField(max_length=500, blank=True, null=True, help_text='Alternative: Provide image URL instead of upload')
     
-    def get_icon_url(self):
-        # Returns icon URL - verifies uploaded file exists before returning its URL
-        if self.icon:
-            try:
-                if os.path.exists(self.icon.path):
-                    return self.icon.url
-            except (ValueError, NotImplementedError):
-                pass
-        return self.icon_url or ''
-    
     def __str__(self):
         return self.name
     
@@ -31,7 +43,7 @@ class Role(models.Model):
         ordering = ['name']  # Alphabetical ordering
 
 
-class Agent(models.Model):
+class Agent(IconMixin, models.Model):
     """
     Valorant agents with their assigned role.
     Examples: Jett (Duelist), Brimstone (Controller)
@@ -43,16 +55,6 @@ class Agent(models.Model):
     icon = models.ImageField(upload_to='agents/', blank=True, null=True)
     icon_url = models.URLField(max_length=500, blank=True, null=True, help_text='Alternative: Provide image URL instead of upload')
     
-    def get_icon_url(self):
-        # Returns icon URL - verifies uploaded file exists before returning its URL
-        if self.icon:
-            try:
-                if os.path.exists(self.icon.path):
-                    return self.icon.url
-            except (ValueError, NotImplementedError):
-                pass
-        return self.icon_url or ''
-    
     def __str__(self):
         return f"{self.name} ({self.role.name})"
     
@@ -60,7 +62,7 @@ class Agent(models.Model):
         ordering = ['name']  # Alphabetical ordering
 
 
-class Team(models.Model):
+class Team(IconMixin, models.Model):
     """
     Predefined teams that players can select.
     Managed via Django admin.
@@ -70,16 +72,6 @@ class Team(models.Model):
     icon_url = models.URLField(max_length=500, blank=True, null=True, help_text='Alternative: Provide image URL instead of upload')
     custom_order = models.PositiveIntegerField(default=0, help_text="Higher numbers appear later in the list")
     
-    def get_icon_url(self):
-        # Returns icon URL - verifies uploaded file exists before returning its URL
-        if self.icon:
-            try:
-                if os.path.exists(self.icon.path):
-                    return self.icon.url
-            except (ValueError, NotImplementedError):
-                pass
-        return self.icon_url or ''
-    
     def __str__(self):
         return self.name
     
@@ -87,7 +79,7 @@ class Team(models.Model):
         ordering = ['custom_order', 'name']
 
 
-class Map(models.Model):
+class Map(IconMixin, models.Model):
     """
     Valorant maps.
     Managed via Django admin.
@@ -96,16 +88,6 @@ class Map(models.Model):
     icon = models.ImageField(upload_to='maps/', blank=True, null=True)
     icon_url = models.URLField(max_length=500, blank=True, null=True, help_text='Alternative: Provide image URL instead of upload')
     
-    def get_icon_url(self):
-        # Returns icon URL - verifies uploaded file exists before returning its URL
-        if self.icon:
-            try:
-                if os.path.exists(self.icon.path):
-                    return self.icon.url
-            except (ValueError, NotImplementedError):
-                pass
-        return self.icon_url or ''
-    
     def __str__(self):
         return self.name
     
@@ -129,16 +111,39 @@ class UserProfile(models.Model):
         null=True,
         validators=[
             RegexValidator(
-                regex=r'^#[a-zA-Z0-9]{2,5}$',
+                regex=RIOT_TAG_REGEX,
                 message='Tag must start with # and be followed by 2-5 alphanumeric characters (e.g. #NA1)'
             )
         ],
         help_text="Tag starting with # followed by 2-5 characters"
     )
 
+    # Normalised Riot ID (see utils/riot_ids.py), kept in sync by save()
+    riot_id_norm = models.CharField(max_length=50, default='', editable=False)
+    riot_tag_norm = models.CharField(max_length=10, default='', editable=False)
+
+    DERIVED_FIELDS = {'riot_id': 'riot_id_norm', 'riot_tag': 'riot_tag_norm'}
+
+    def save(self, *args, **kwargs):
+        self.riot_id_norm = normalize_name(self.riot_id)
+        self.riot_tag_norm = normalize_riot_tag(self.riot_tag)
+        kwargs['update_fields'] = _with_derived_fields(kwargs.get('update_fields'), self.DERIVED_FIELDS)
+        super().save(*args, **kwargs)
+
+    def matches_profile(self, profile):
+        """True if *profile* carries this account's Riot ID."""
+        profile_riot_id = profile.riot_id_norm
+        if profile_riot_id is None:
+            # Legacy duplicate without a stored value (see Profile._norms_to_store)
+            profile_riot_id = normalize_name(profile.riot_id)
+        return (self.riot_id_norm, self.riot_tag_norm) == (profile_riot_id, normalize_riot_tag(profile.riot_tag))
+
     def __str__(self):
         return f"{self.user.username} ({self.riot_id}{self.riot_tag or ''})"
 
+    class Meta:
+        indexes = [models.Index(fields=['riot_id_norm', 'riot_tag_norm'])]
+
 
 class Profile(models.Model):
     
@@ -153,7 +158,7 @@ class Profile(models.Model):
         null=True,
         validators=[
             RegexValidator(
-                regex=r'^#[a-zA-Z0-9]{2,5}$',
+                regex=RIOT_TAG_REGEX,
                 message='Tag must start with # and be followed by 2-5 alphanumeric characters (e.g. #NA1, #12345)'
             )
         ],
@@ -161,10 +166,28 @@ class Profile(models.Model):
     )
     profile_picture = models.ImageField(upload_to='profiles/', blank=True, null=True)
     profile_picture_url = models.URLField(max_length=500, blank=True, null=True, help_text='Alternative: Provide image URL instead of upload')
-    team = models.ForeignKey(Team, on_delete=models.PROTECT, null=True, blank=True)
+
+    # Derivatives generated once per picture change (see utils/pfp_derivatives.py).
+    # pfp_source records which upload/URL they were built from.
+    pfp_card = models.ImageField(upload_to='profiles/derived/', blank=True, null=True, editable=False)
+    pfp_thumb = models.ImageField(upload_to='profiles/derived/', blank=True, null=True, editable=False)
+    pfp_list = models.ImageField(upload_to='profiles/derived/', blank=True, null=True, editable=False)
+    pfp_source = models.CharField(max_length=600, blank=True, default='', editable=False)
+
+    # Indexed by the (team, created_at, id) composite in Meta instead
+    team = models.ForeignKey(Team, on_delete=models.PROTECT, null=True, blank=True, db_index=False)
     
     peak_rank = models.CharField(max_length=100, blank=True, default='')
     peak_rank_icon = models.URLField(max_length=500, blank=True, default='')
+    # Ordinal of peak_rank (0 unranked, 1 Iron … 9 Radiant), kept in sync by save()
+    peak_rank_tier = models.PositiveSmallIntegerField(default=0, editable=False)
+
+    # Normalised copies of the name and Riot ID (see utils/riot_ids.py), kept in
+    # sync by save() and unique in the database. NULL only on legacy duplicates
+    # that predate the constraints.
+    in_game_name_norm = models.CharField(max_length=100, null=True, editable=False)
+    riot_id_norm = models.CharField(max_length=50, null=True, editable=False)
+    riot_tag_norm = models.CharField(max_length=10, default='', editable=False)
 
     # ManyToMany: Users can select multiple agents they play
     agents = models.ManyToManyField(Agent, blank=True, related_name='player_profiles')
@@ -198,11 +221,154 @@ class Profile(models.Model):
             return self.profile_picture.url
         return self.profile_picture_url or ''
 
+    @property
+    def picture_source(self):
+        """Identifier of the picture currently set (upload name or URL); '' if none."""
+        if self.profile_picture:
+            return f'upload:{self.profile_picture.name}'
+        if self.profile_picture_url:
+            return f'url:{self.profile_picture_url}'
+        return ''
+
+    def _derivative_url(self, field):
+        # Only trust a derivative built from the picture currently set
+        if field and self.pfp_source and self.pfp_source == self.picture_source:
+            return field.url
+        return self.get_profile_picture_url()
+
+    def get_card_pfp_url(self):
+        """350px circle-cropped card picture with glitch layers, or the original."""
+        return self._derivative_url(self.pfp_card)
+
+    def get_teammate_thumb_url(self):
+        """60px circle-cropped teammate thumbnail, or the original."""
+        return self._derivative_url(self.pfp_thumb)
+
+    def get_list_thumb_url(self):
+        """Square WebP thumbnail for the roster list, or the original."""
+        return self._derivative_url(self.pfp_list)
+
+    @cached_property
+    def latest_tracker_snapshot(self):
+        """Most recent TrackerSnapshot, or None; queried once per instance."""
+        return self.tracker_snapshots.first() if self.pk else None
+
+    # source field -> column save() derives from it
+    DERIVED_FIELDS = {
+        'peak_rank': 'peak_rank_tier',
+        'in_game_name': 'in_game_name_norm',
+        'riot_id': 'riot_id_norm',
+        'riot_tag': 'riot_tag_norm',
+    }
+
+    def _norms_to_store(self):
+        """
+        ``(in_game_name_norm, riot_id_norm, riot_tag_norm)`` for save(). Legacy
+        duplicates left NULL by migration 0018 stay NULL while another profile
+        still owns the value, so saving them for any other reason does not hit
+        the unique constraints; renaming them through the form stores it.
+        """
+        name_norm = normalize_name(self.in_game_name)
+        riot_id_norm = normalize_name(self.riot_id)
+        riot_tag_norm = normalize_riot_tag(self.riot_tag)
+        if not self._state.adding:
+            others = Profile.objects.exclude(pk=self.pk)
+            if self.in_game_name_norm is None and others.filter(in_game_name_norm=name_norm).exists():
+                name_norm = None
+            if (self.riot_id_norm is None and riot_id_norm
+                    and others.filter(riot_id_norm=riot_id_norm, riot_tag_norm=riot_tag_norm).exists()):
+                riot_id_norm = None
+        return name_norm, riot_id_norm, riot_tag_norm
+
+    def save(self, *args, **kwargs):
+        self.peak_rank_tier = rank_tier(self.peak_rank)
+        self.in_game_name_norm, self.riot_id_norm, self.riot_tag_norm = self._norms_to_store()
+        kwargs['update_fields'] = _with_derived_fields(kwargs.get('update_fields'), self.DERIVED_FIELDS)
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return self.in_game_name
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Roster pages: newest first, keyset on (created_at, id)
+            models.Index(fields=['created_at', 'id'], name='profile_newest_idx'),
+            # Team / free-agent filters and teammate lookups, still in list order
+            models.Index(fields=['team', 'created_at', 'id'], name='profile_team_newest_idx'),
+            models.Index(fields=['peak_rank_tier', 'created_at'], name='profile_rank_tier_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['in_game_name_norm'], name='profile_unique_in_game_name'),
+            # Legacy profiles without a Riot ID are exempt
+            models.UniqueConstraint(
+                fields=['riot_id_norm', 'riot_tag_norm'],
+                condition=~models.Q(riot_id_norm=''),
+                name='profile_unique_riot_id',
+            ),
+        ]
+
+
+class TrackerSnapshot(models.Model):
 
+    # One row per tracker.gg refresh of a profile — see services/tracker_snapshots.py.
+    # ``data`` holds the parsed playlist/season views (utils.tracker_views.parse_views),
+    # tens of KB at most, rather than the multi-MB raw API payload.
 
+    # Indexed by the (profile, -fetched_at, -id) composite in Meta instead
+    profile = models.ForeignKey(Profile, on_delete=models.CASCADE, related_name='tracker_snapshots',
+                                db_index=False)
+    fetched_at = models.DateTimeField()
+    data = models.JSONField()
+
+    def view(self, playlist='competitive', season_id=''):
+        """Flat stats for one playlist/season (competitive, current season by default)."""
+        return select_view(self.data, playlist=playlist, season_id=season_id)
+
+    def __str__(self):
+        return f"{self.profile_id} @ {self.fetched_at:%Y-%m-%d %H:%M}"
 
+    class Meta:
+        ordering = ['-fetched_at', '-id']
+        indexes = [models.Index(fields=['profile', '-fetched_at', '-id'], name='tracker_snapshot_latest_idx')]
+
+
+class Job(models.Model):
+
+    # Background work queued by views (tracker.gg fetches, card renders) and
+    # executed by worker threads — see services/jobs.py.
+
+    STATUS_QUEUED = 'queued'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, 'Queued'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_DONE, 'Done'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    kind = models.CharField(max_length=50)
+    payload = models.JSONField(default=dict, blank=True)
+    # Identical in-flight jobs share a dedup key and are only run once
+    dedup_key = models.CharField(max_length=200, blank=True, default='', db_index=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_QUEUED)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True, default='')
+    user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    @property
+    def is_finished(self):
+        return self.status in (self.STATUS_DONE, self.STATUS_FAILED)
+
+    def __str__(self):
+        return f"{self.kind} [{self.status}]"
+
+    class Meta:
+        ordering = ['created_at']
+        indexes = [models.Index(fields=['status', 'created_at'])]
@@ -0,0 +1,186 @@
+"""
+Warm headless-Chromium pool for the playwright card render backend.
+
+Each gunicorn worker lazily starts ``CARD_BROWSER_POOL_SIZE`` render threads.
+Every thread owns one Chromium browser and a reusable 1920x1080 context/page
+(playwright's sync API is bound to the thread that started it). Jobs go
+through a bounded queue; the caller waits at most ``CARD_BROWSER_JOB_TIMEOUT``
+seconds, and a browser is relaunched after ``CARD_BROWSER_RECYCLE_AFTER``
+renders to cap its memory growth.
+
+Instead of sleeping a fixed amount, a render waits for ``card_profile.html``
+to set ``window.cardReady`` once fonts and images have loaded.
+"""
+
+import atexit
+import logging
+import queue
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+
+logger = logging.getLogger(__name__)
+
+READY_SIGNAL = "window.cardReady === true"
+
+_STOP = object()
+
+
+class CardBrowserBusy(RuntimeError):
+    """Raised when the render queue is full or a job did not finish in time."""
+
+
+class _RenderJob:
+    __slots__ = ("url", "cookies", "future")
+
+    def __init__(self, url, cookies):
+        self.url = url
+        self.cookies = cookies
+        self.future = Future()
+
+
+def _launch_chromium(viewport):
+    """Start playwright + Chromium on the calling thread. Returns (playwright, browser, page)."""
+    from playwright.sync_api import sync_playwright
+
+    playwright = sync_playwright().start()
+    try:
+        browser = playwright.chromium.launch(headless=True)
+        context = browser.new_context(viewport=viewport)
+        page = context.new_page()
+    except Exception:
+        playwright.stop()
+        raise
+    return playwright, browser, page
+
+
+class CardBrowserPool:
+    """Bounded pool of long-lived Chromium pages that screenshot card URLs."""
+
+    def __init__(self, size=1, queue_max=8, job_timeout=20.0, recycle_after=100,
+                 viewport=None, launch=_launch_chromium):
+        self.size = max(1, int(size))
+        self.job_timeout = float(job_timeout)
+        self.recycle_after = max(1, int(recycle_after))
+        self.viewport = viewport or {"width": 1920, "height": 1080}
+        self._launch = launch
+        self._queue = queue.Queue(maxsize=max(1, int(queue_max)))
+        self._threads = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _ensure_started(self):
+        if self._threads:
+            return
+        with self._lock:
+            if self._threads:
+                return
+            for idx in range(self.size):
+                thread = threading.Thread(
+                    target=self._run, name=f"card-browser-{idx}", daemon=True,
+                )
+                thread.start()
+                self._threads.append(thread)
+
+    def render(self, url, cookies=None):
+        """Screenshot *url* and return PNG bytes.
+
+        Raises CardBrowserBusy if the queue is full or the job times out.
+        Any other error from the browser is re-raised to the caller.
+        """
+        if self._closed:
+            raise CardBrowserBusy("Card browser pool is shut down.")
+        self._ensure_started()
+
+        job = _RenderJob(url, cookies or [])
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full as exc:
+            raise CardBrowserBusy("Card render queue is full.") from exc
+
+        try:
+            return job.future.result(timeout=self.job_timeout)
+        except FutureTimeoutError as exc:
+            job.future.cancel()
+            raise CardBrowserBusy("Card render timed out.") from exc
+
+    def shutdown(self):
+        """Stop all render threads and close their browsers."""
+        self._closed = True
+        for _ in self._threads:
+            try:
+                self._queue.put_nowait(_STOP)
+            except queue.Full:
+                break
+
+    # -- render thread ---------------------------------------------------
+
+    def _run(self):
+        playwright = browser = page = None
+        renders = 0
+        while True:
+            job = self._queue.get()
+            if job is _STOP:
+                break
+            if not job.future.set_running_or_notify_cancel():
+                continue  # caller already gave up
+
+            try:
+                if page is None or renders >= self.recycle_after:
+                    self._close(playwright, browser)
+                    playwright, browser, page = self._launch(self.viewport)
+                    renders = 0
+                job.future.set_result(self._screenshot(page, job))
+                renders += 1
+            except Exception as exc:
+                logger.warning("Card browser render failed for %s: %s", job.url, exc)
+                job.future.set_exception(exc)
+                # A failed page may be wedged; start fresh on the next job.
+                self._close(playwright, browser)
+                playwright = browser = page = None
+
+        self._close(playwright, browser)
+
+    def _screenshot(self, page, job):
+        timeout_ms = int(self.job_timeout * 1000)
+        context = page.context
+        context.clear_cookies()
+        if job.cookies:
+            context.add_cookies(job.cookies)
+        page.goto(job.url, wait_until="load", timeout=timeout_ms)
+        page.wait_for_function(READY_SIGNAL, timeout=timeout_ms)
+        return page.screenshot(full_page=False)
+
+    @staticmethod
+    def _close(playwright, browser):
+        try:
+            if browser is not None:
+                browser.close()
+        except Exception:
+            pass
+        try:
+            if playwright is not None:
+                playwright.stop()
+        except Exception:
+            pass
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_card_browser_pool():
+    """Return this process's pool, creating it from settings on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                from django.conf import settings
+
+                _pool = CardBrowserPool(
+                    size=getattr(settings, "CARD_BROWSER_POOL_SIZE", 1),
+                    queue_max=getattr(settings, "CARD_BROWSER_QUEUE_MAX", 8),
+                    job_timeout=getattr(settings, "CARD_BROWSER_JOB_TIMEOUT", 20),
+                    recycle_after=getattr(settings, "CARD_BROWSER_RECYCLE_AFTER", 100),
+                )
+                atexit.register(_pool.shutdown)
+    return _pool
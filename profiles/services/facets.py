@@ -0,0 +1,157 @@
+"""
+Roster filters and their facet counts.
+
+Filters are OR within a facet and AND across facets. Each facet is counted
+with every *other* active filter applied, so ticking Duelist still shows how
+many Controllers there are. All five facets (team, role, agent, map, peak
+rank tier) come back from one statement: a UNION ALL of grouped counts over
+the profile table and the M2M through tables.
+"""
+
+from django.db import connection
+from django.db.models import Exists, OuterRef, Q
+from django.http import QueryDict
+
+from ..models import Profile
+from ..utils.ranks import RANK_TIERS
+
+FREE_AGENT = 'free_agent'
+
+# Largest id SQLite can bind (signed 64-bit); anything above it cannot match a row
+MAX_ID = 2 ** 63 - 1
+
+FACETS = ('team', 'role', 'agent', 'map', 'rank')
+
+# facet name -> (through model, column holding the catalog id)
+M2M_FACETS = {
+    'role': (Profile.roles.through, 'role_id'),
+    'agent': (Profile.agents.through, 'agent_id'),
+    'map': (Profile.maps.through, 'map_id'),
+}
+
+
+def empty_filters():
+    return {
+        'teams': [], 'free_agent': False,
+        'role': [], 'agent': [], 'map': [],
+        'rank_min': None, 'rank_max': None,
+    }
+
+
+def _number(value):
+    # ASCII digits only: isdigit() alone also accepts '²', which int() rejects
+    return int(value) if value.isascii() and value.isdigit() else None
+
+
+def _ids(values):
+    return sorted({n for n in map(_number, values) if n is not None and 0 < n <= MAX_ID})
+
+
+def _tier(value):
+    tier = _number((value or '').strip())
+    return tier if tier is not None and 1 <= tier <= len(RANK_TIERS) else None
+
+
+def parse_filters(params):
+    """Read the facet filters from a GET QueryDict; malformed values are ignored."""
+    filters = empty_filters()
+    teams = params.getlist('team')
+    filters['teams'] = _ids(teams)
+    filters['free_agent'] = FREE_AGENT in teams
+    for facet in M2M_FACETS:
+        filters[facet] = _ids(params.getlist(facet))
+    filters['rank_min'] = _tier(params.get('rank_min'))
+    filters['rank_max'] = _tier(params.get('rank_max'))
+    return filters
+
+
+def filters_query(filters, q='', drop=None):
+    """Return a mutable QueryDict encoding *q* and *filters*, minus the facet *drop*."""
+    query = QueryDict(mutable=True)
+    if q:
+        query['q'] = q
+    if drop != 'team':
+        teams = [str(pk) for pk in filters['teams']]
+        if filters['free_agent']:
+            teams.insert(0, FREE_AGENT)
+        if teams:
+            query.setlist('team', teams)
+    for facet in M2M_FACETS:
+        if drop != facet and filters[facet]:
+            query.setlist(facet, [str(pk) for pk in filters[facet]])
+    if drop != 'rank':
+        for key in ('rank_min', 'rank_max'):
+            if filters[key] is not None:
+                query[key] = str(filters[key])
+    return query
+
+
+def has_active_filters(filters):
+    return bool(
+        filters['teams'] or filters['free_agent']
+        or filters['role'] or filters['agent'] or filters['map']
+        or filters['rank_min'] is not None or filters['rank_max'] is not None
+    )
+
+
+def apply_filters(queryset, filters, exclude=None):
+    """Narrow a Profile *queryset* by *filters*, skipping the facet named *exclude*."""
+    if exclude != 'team' and (filters['teams'] or filters['free_agent']):
+        team_q = Q(team_id__in=filters['teams']) if filters['teams'] else Q(pk__in=[])
+        if filters['free_agent']:
+            team_q |= Q(team__isnull=True)
+        queryset = queryset.filter(team_q)
+
+    for facet, (through, column) in M2M_FACETS.items():
+        if exclude != facet and filters[facet]:
+            # EXISTS keeps one row per profile however many selected values match
+            queryset = queryset.filter(Exists(
+                through.objects.filter(profile_id=OuterRef('pk'), **{f'{column}__in': filters[facet]})
+            ))
+
+    if exclude != 'rank' and (filters['rank_min'] is not None or filters['rank_max'] is not None):
+        # Any bound implies "ranked": unranked players never fall inside a range
+        queryset = queryset.filter(peak_rank_tier__gte=filters['rank_min'] or 1)
+        if filters['rank_max'] is not None:
+            queryset = queryset.filter(peak_rank_tier__lte=filters['rank_max'])
+    return queryset
+
+
+def _ids_sql(queryset, filters, exclude):
+    subquery = apply_filters(queryset, filters, exclude=exclude).order_by().values('pk')
+    return subquery.query.sql_with_params()
+
+
+def facet_counts(queryset, filters):
+    """Return ``{facet: {value: count}}`` for team, role, agent, map and rank.
+
+    *queryset* is the roster before facet filters (search already applied).
+    Team counts use None for free agents; rank counts are keyed by tier.
+    """
+    profile_table = Profile._meta.db_table
+    parts, params = [], []
+
+    sql, sql_params = _ids_sql(queryset, filters, 'team')
+    parts.append(f"SELECT 'team', team_id, COUNT(*) FROM {profile_table} WHERE id IN ({sql}) GROUP BY team_id")
+    params.extend(sql_params)
+
+    for facet, (through, column) in M2M_FACETS.items():
+        sql, sql_params = _ids_sql(queryset, filters, facet)
+        parts.append(
+            f"SELECT '{facet}', {column}, COUNT(*) FROM {through._meta.db_table} "
+            f"WHERE profile_id IN ({sql}) GROUP BY {column}"
+        )
+        params.extend(sql_params)
+
+    sql, sql_params = _ids_sql(queryset, filters, 'rank')
+    parts.append(
+        f"SELECT 'rank', peak_rank_tier, COUNT(*) FROM {profile_table} WHERE id IN ({sql}) GROUP BY peak_rank_tier"
+    )
+    params.extend(sql_params)
+
+    counts = {facet: {} for facet in FACETS}
+    with connection.cursor() as cursor:
+        cursor.execute(' UNION ALL '.join(parts), params)
+        for facet, value, count in cursor.fetchall():
+            counts[facet][value] = count
+    return counts
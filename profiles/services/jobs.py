@@ -0,0 +1,204 @@
+"""
+Lightweight SQLite-backed job queue.
+
+Views call ``enqueue(kind, payload, dedup_key=...)`` and return straight away
+with the job id; clients poll ``/api/jobs/<id>/``. Jobs are rows in the
+``Job`` table, so any process sharing the database can run them:
+
+* each web worker starts ``JOBS_INPROCESS_WORKERS`` daemon threads on first
+  enqueue (set it to 0 when running dedicated workers), and
+* ``manage.py run_jobs`` runs workers in a separate process.
+
+A worker claims the oldest queued row with a conditional UPDATE, so a job
+only ever runs once. Enqueueing a job whose dedup key matches a queued or
+running job of the same user returns that job instead of creating another.
+
+Handlers are registered with ``@register('kind')`` (see ``profiles/tasks.py``)
+and receive the payload as keyword arguments. A ``ValueError`` message is
+shown to the user; any other exception is logged and reported generically.
+"""
+
+import logging
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from ..models import Job
+from ..utils.db_retry import retry_on_locked
+
+logger = logging.getLogger(__name__)
+
+HANDLERS = {}
+
+_wakeup = threading.Event()
+_workers = []
+_workers_lock = threading.Lock()
+
+
+def register(kind):
+    """Decorator registering *func* as the handler for jobs of *kind*."""
+    def decorator(func):
+        HANDLERS[kind] = func
+        return func
+    return decorator
+
+
+@retry_on_locked
+def enqueue(kind, payload=None, dedup_key='', user=None):
+    """Queue a job (or return the in-flight job with the same dedup key)."""
+    if kind not in HANDLERS:
+        raise KeyError(f"No job handler registered for '{kind}'.")
+
+    owner = user if user is not None and user.is_authenticated else None
+    with transaction.atomic():
+        if dedup_key:
+            # Only the owner may poll a user's job, so dedup never crosses users
+            existing = Job.objects.filter(
+                dedup_key=dedup_key,
+                user=owner,
+                status__in=(Job.STATUS_QUEUED, Job.STATUS_RUNNING),
+            ).first()
+            if existing is not None:
+                return existing
+        job = Job.objects.create(
+            kind=kind,
+            payload=payload or {},
+            dedup_key=dedup_key,
+            user=owner,
+        )
+
+    if getattr(settings, 'JOBS_INPROCESS_WORKERS', 2) > 0:
+        transaction.on_commit(_start_inprocess_workers)
+        transaction.on_commit(_wakeup.set)
+    return job
+
+
+def job_status(job):
+    """Return the JSON-safe status payload for *job*."""
+    data = {"id": str(job.id), "kind": job.kind, "status": job.status}
+    if job.status == Job.STATUS_DONE:
+        data["result"] = job.result
+    elif job.status == Job.STATUS_FAILED:
+        data["error"] = job.error
+    return data
+
+
+# ---------------------------------------------------------------------------
+# Execution
+# ---------------------------------------------------------------------------
+
+def claim_next():
+    """Atomically move the oldest queued job to running and return it (or None)."""
+    while True:
+        job = Job.objects.filter(status=Job.STATUS_QUEUED).order_by('created_at').first()
+        if job is None:
+            return None
+        now = timezone.now()
+        claimed = Job.objects.filter(pk=job.pk, status=Job.STATUS_QUEUED).update(
+            status=Job.STATUS_RUNNING, started_at=now,
+        )
+        if claimed:
+            job.status = Job.STATUS_RUNNING
+            job.started_at = now
+            return job
+        # Another worker won the race; try the next one.
+
+
+def run_job(job):
+    """Execute a claimed job and persist its outcome."""
+    handler = HANDLERS.get(job.kind)
+    result = None
+    error = ''
+    try:
+        if handler is None:
+            raise ValueError(f"Unknown job type '{job.kind}'.")
+        result = handler(**job.payload)
+    except ValueError as exc:
+        error = str(exc)
+    except Exception:
+        logger.exception('Job %s (%s) failed', job.id, job.kind)
+        error = 'An internal error occurred while processing this request.'
+
+    job.status = Job.STATUS_FAILED if error else Job.STATUS_DONE
+    job.result = result
+    job.error = error
+    job.finished_at = timezone.now()
+    _save_outcome(job)
+    return job
+
+
+@retry_on_locked
+def _save_outcome(job):
+    # The handler has already run; losing its result to a locked database
+    # would leave the job 'running' until fail_stale_jobs gives up on it.
+    Job.objects.filter(pk=job.pk).update(
+        status=job.status, result=job.result, error=job.error, finished_at=job.finished_at,
+    )
+
+
+def run_pending(limit=None):
+    """Run queued jobs on the calling thread until none are left. Returns the count."""
+    count = 0
+    while limit is None or count < limit:
+        job = claim_next()
+        if job is None:
+            break
+        run_job(job)
+        count += 1
+    return count
+
+
+def fail_stale_jobs():
+    """Mark jobs stuck in 'running' (their worker died) as failed."""
+    cutoff = timezone.now() - timedelta(seconds=getattr(settings, 'JOBS_STALE_SECONDS', 600))
+    return Job.objects.filter(status=Job.STATUS_RUNNING, started_at__lt=cutoff).update(
+        status=Job.STATUS_FAILED,
+        error='The job was interrupted. Please try again.',
+        finished_at=timezone.now(),
+    )
+
+
+def purge_finished_jobs():
+    """Delete finished jobs older than JOBS_RETENTION_SECONDS."""
+    cutoff = timezone.now() - timedelta(seconds=getattr(settings, 'JOBS_RETENTION_SECONDS', 86400))
+    deleted, _ = Job.objects.filter(
+        status__in=(Job.STATUS_DONE, Job.STATUS_FAILED), finished_at__lt=cutoff,
+    ).delete()
+    return deleted
+
+
+def worker_loop(stop_event=None, poll_interval=None):
+    """Claim and run jobs until *stop_event* is set."""
+    poll_interval = poll_interval or getattr(settings, 'JOBS_POLL_INTERVAL', 1.0)
+    stop_event = stop_event or threading.Event()
+    while not stop_event.is_set():
+        close_old_connections()
+        try:
+            ran = run_pending(limit=10)
+        except Exception:
+            logger.exception('Job worker loop error')
+            ran = 0
+        if not ran:
+            _wakeup.wait(poll_interval)
+            _wakeup.clear()
+    close_old_connections()
+
+
+def _start_inprocess_workers():
+    if _workers:
+        return
+    with _workers_lock:
+        if _workers:
+            return
+        try:
+            fail_stale_jobs()
+            purge_finished_jobs()
+        except Exception:
+            logger.exception('Job queue housekeeping failed')
+        for idx in range(getattr(settings, 'JOBS_INPROCESS_WORKERS', 2)):
+            thread = threading.Thread(target=worker_loop, name=f'job-worker-{idx}', daemon=True)
+            thread.start()
+            _workers.append(thread)
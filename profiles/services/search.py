@@ -0,0 +1,163 @@
+"""
+Full-text player search backed by an SQLite FTS5 table.
+
+``profiles_profile_search`` (created in migration 0016) holds one row per
+profile, with ``rowid`` = profile id. Its columns are the in-game name, the
+Riot ID and tag, the team name, the bio, and the agent and map names.
+Signal handlers in ``profiles.signals`` re-index a profile when it, its
+selections, or a team/agent/map it references changes.
+``manage.py rebuild_search_index`` rebuilds the table from scratch.
+
+Every word of the query is matched as a prefix ("jet asc" finds a Jett
+main who likes Ascent), and results are ranked by bm25 with the name and
+Riot ID weighted above the rest. Roster filters run inside the FTS query
+(``rowid IN (filtered profiles)``), before ORDER BY / LIMIT, and pages
+continue from a ``(score, id)`` position, so a filtered search sees every
+match. On databases other than SQLite, ``search_profiles`` and
+``search_filter`` return None and callers fall back to icontains.
+"""
+
+import re
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from ..utils.db_retry import retry_on_locked
+
+SEARCH_TABLE = 'profiles_profile_search'
+
+# bm25 weights, in column order: in_game_name, riot_id, team, bio, agents, maps
+COLUMN_WEIGHTS = (10.0, 8.0, 4.0, 1.0, 2.0, 2.0)
+MAX_TERMS = 8
+
+_ROWS_SQL = """
+SELECT p.id,
+       p.in_game_name,
+       p.riot_id || ' ' || REPLACE(COALESCE(p.riot_tag, ''), '#', ''),
+       COALESCE(t.name, ''),
+       p.bio,
+       COALESCE((SELECT group_concat(a.name, ' ') FROM profiles_profile_agents pa
+                 JOIN profiles_agent a ON a.id = pa.agent_id WHERE pa.profile_id = p.id), ''),
+       COALESCE((SELECT group_concat(m.name, ' ') FROM profiles_profile_maps pm
+                 JOIN profiles_map m ON m.id = pm.map_id WHERE pm.profile_id = p.id), '')
+FROM profiles_profile p
+LEFT JOIN profiles_team t ON t.id = p.team_id
+"""
+
+_INSERT_SQL = f"INSERT INTO {SEARCH_TABLE} (rowid, in_game_name, riot_id, team, bio, agents, maps) "
+
+
+def search_available():
+    return connection.vendor == 'sqlite'
+
+
+def _chunks(ids, size=500):
+    ids = list(ids)
+    for start in range(0, len(ids), size):
+        yield ids[start:start + size]
+
+
+@retry_on_locked
+def index_profiles(profile_ids):
+    """(Re)index the given profiles; ids that no longer exist are removed."""
+    if not search_available():
+        return
+    with transaction.atomic(), connection.cursor() as cursor:
+        for chunk in _chunks(set(profile_ids)):
+            marks = ','.join(['%s'] * len(chunk))
+            cursor.execute(f'DELETE FROM {SEARCH_TABLE} WHERE rowid IN ({marks})', chunk)
+            cursor.execute(f'{_INSERT_SQL}{_ROWS_SQL} WHERE p.id IN ({marks})', chunk)
+
+
+@retry_on_locked
+def remove_profiles(profile_ids):
+    if not search_available():
+        return
+    with connection.cursor() as cursor:
+        for chunk in _chunks(set(profile_ids)):
+            marks = ','.join(['%s'] * len(chunk))
+            cursor.execute(f'DELETE FROM {SEARCH_TABLE} WHERE rowid IN ({marks})', chunk)
+
+
+def rebuild_search_index():
+    """Repopulate the whole index and return the number of profiles indexed."""
+    if not search_available():
+        return 0
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE}')
+        cursor.execute(f'{_INSERT_SQL}{_ROWS_SQL}')
+        cursor.execute(f"INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}) VALUES ('optimize')")
+        cursor.execute(f'SELECT count(*) FROM {SEARCH_TABLE}')
+        return cursor.fetchone()[0]
+
+
+def build_match_query(text):
+    """Turn free text into an FTS5 query: every word must match as a prefix.
+
+    Returns '' when *text* has no searchable words. User input never reaches
+    FTS5 syntax unquoted, so operators like NEAR/OR/* are treated as words.
+    """
+    terms = re.findall(r'\w+', (text or '').lower())[:MAX_TERMS]
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def search_filter(text):
+    """A ``Q`` limiting Profile rows to full-text matches of *text*, or None if unavailable."""
+    if not search_available():
+        return None
+    match = build_match_query(text)
+    if not match:
+        return Q(pk__in=[])
+    return Q(pk__in=RawSQL(f'SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s', [match]))
+
+
+def search_profiles(text, queryset=None, after=None, limit=None):
+    """Return ``[(profile_id, score), ...]`` best first (lower score is better).
+
+    Only profiles in *queryset* (if given) are considered; its filters are
+    part of the FTS query. *after* is the ``(score, profile_id)`` of the last
+    hit already shown, and *limit* caps the hits returned (default: all).
+
+    Ties, and queries matching more than PROFILE_SEARCH_RANK_LIMIT profiles,
+    are ordered newest first: bm25 gives near-zero weight to a term found in
+    most rows, so ranking such a query would cost a full sort for no signal.
+    Returns None if full-text search is unavailable on this database.
+    """
+    if not search_available():
+        return None
+    match = build_match_query(text)
+    if not match:
+        return []
+
+    where, params = f'{SEARCH_TABLE} MATCH %s', [match]
+    if queryset is not None and queryset.query.where:
+        sql, sql_params = queryset.order_by().values('pk').query.sql_with_params()
+        where += f' AND rowid IN ({sql})'
+        params.extend(sql_params)
+    limit = -1 if limit is None else limit  # SQLite: LIMIT -1 is no limit
+    rank_limit = getattr(settings, 'PROFILE_SEARCH_RANK_LIMIT', 10000)
+    weights = ', '.join(str(w) for w in COLUMN_WEIGHTS)
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT count(*) FROM (SELECT rowid FROM {SEARCH_TABLE} WHERE {where} LIMIT %s)',
+            [*params, rank_limit + 1],
+        )
+        if cursor.fetchone()[0] > rank_limit:
+            score = '0.0'
+        else:
+            score = f'bm25({SEARCH_TABLE}, {weights})'
+        # The outer query sees the hits with their score, so a page can start after one
+        position, position_params = '', []
+        if after is not None:
+            last_score, last_id = after
+            position = 'WHERE score > %s OR (score = %s AND id < %s)'
+            position_params = [last_score, last_score, last_id]
+        cursor.execute(
+            f'SELECT id, score FROM (SELECT rowid AS id, {score} AS score FROM {SEARCH_TABLE} WHERE {where}) '
+            f'{position} ORDER BY score, id DESC LIMIT %s',
+            [*params, *position_params, limit],
+        )
+        return cursor.fetchall()
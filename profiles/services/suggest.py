@@ -0,0 +1,120 @@
+"""
+In-memory prefix index behind the roster search box's typeahead.
+
+Each worker keeps a sorted list of lowercased keys — in-game names,
+``RiotID#TAG`` strings and team names (plus every later word of a team
+name, so "tyl" finds "House of Tyloo") — and answers a prefix query with one
+``bisect`` and a short forward scan, without touching the database.
+
+Saving or deleting a profile or team bumps a shared version key (see
+``profiles.signals``). Workers poll it at most every
+``SUGGEST_VERSION_CHECK_INTERVAL`` seconds. When it has moved, the next
+request rebuilds the index while concurrent requests keep answering from
+the previous one.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+
+from django.conf import settings
+from django.core.cache import cache
+
+VERSION_KEY = 'suggest:version'
+
+KIND_PLAYER = 'player'
+KIND_RIOT_ID = 'riot_id'
+KIND_TEAM = 'team'
+
+
+class SuggestIndex:
+    """Immutable sorted prefix index built at one version."""
+
+    __slots__ = ('version', 'keys', 'entries')
+
+    def __init__(self, version, items):
+        # items: (key, kind, label, object id); sorted by key, then label
+        items = sorted(items)
+        self.version = version
+        self.keys = [item[0] for item in items]
+        self.entries = [item[1:] for item in items]
+
+    def lookup(self, prefix, limit):
+        """Return up to *limit* distinct ``(kind, label, id)`` whose key starts with *prefix*."""
+        results, seen = [], set()
+        keys, entries = self.keys, self.entries
+        i = bisect_left(keys, prefix)
+        while i < len(keys) and keys[i].startswith(prefix) and len(results) < limit:
+            kind, label, pk = entries[i]
+            if (kind, pk) not in seen:
+                seen.add((kind, pk))
+                results.append((kind, label, pk))
+            i += 1
+        return results
+
+
+_state = {'index': None, 'version': None, 'checked_at': 0.0}
+_rebuild_lock = threading.Lock()
+
+
+def suggest_version():
+    return cache.get(VERSION_KEY, 0)
+
+
+def bump_suggest_version():
+    """Mark every worker's index stale."""
+    cache.set(VERSION_KEY, time.time_ns(), None)
+    _state['checked_at'] = 0.0
+
+
+def _build_index(version):
+    from ..models import Profile, Team
+
+    items = []
+    for pk, name, riot_id, riot_tag in Profile.objects.order_by().values_list(
+        'id', 'in_game_name', 'riot_id', 'riot_tag',
+    ):
+        if name:
+            items.append((name.lower(), KIND_PLAYER, name, pk))
+        if riot_id:
+            label = f'{riot_id}{riot_tag or ""}'
+            items.append((label.lower(), KIND_RIOT_ID, label, pk))
+    for pk, name in Team.objects.order_by().values_list('id', 'name'):
+        words = name.lower().split()
+        for start in range(len(words)):
+            items.append((' '.join(words[start:]), KIND_TEAM, name, pk))
+    return SuggestIndex(version, items)
+
+
+def get_suggest_index():
+    """Return the current index, rebuilding it if the shared version moved."""
+    now = time.monotonic()
+    if now - _state['checked_at'] >= getattr(settings, 'SUGGEST_VERSION_CHECK_INTERVAL', 2.0):
+        _state['version'] = suggest_version()
+        _state['checked_at'] = now
+
+    index = _state['index']
+    if index is not None and index.version == _state['version']:
+        return index
+
+    # One thread rebuilds; the rest keep serving the previous index meanwhile.
+    if not _rebuild_lock.acquire(blocking=index is None):
+        return index
+    try:
+        version = _state['version']
+        index = _state['index']
+        if index is None or index.version != version:
+            index = _state['index'] = _build_index(version)
+        return index
+    finally:
+        _rebuild_lock.release()
+
+
+def suggest(prefix, limit=None):
+    """Top matches for *prefix* as ``(version, [(kind, label, id), ...])``."""
+    limit = limit or getattr(settings, 'SUGGEST_LIMIT', 8)
+    index = get_suggest_index()
+    prefix = (prefix or '').strip().lower()
+    if not prefix:
+        return index.version, []
+    return index.version, index.lookup(prefix, limit)
@@ -4,11 +4,30 @@ Tracker.gg API service for Valorant profile auto-fill.
 Reads TRACKER_CF_CLEARANCE and TRACKER_EXTRA_COOKIES from Django settings.
 Set those via environment variables — never hard-code credentials in settings.py.
 cf_clearance expires roughly every 30 minutes; refresh it from browser DevTools.
+
+Parsed results are cached per player (see ``fetch_tracker_views``) so
+retries, repeat lookups and switches between playlists or seasons do not
+spend the rate limit or the clearance cookie on identical upstream calls.
 """
 
+import hashlib
+import json
+import logging
 import re
+import threading
+import time
+from contextlib import contextmanager
 from urllib.parse import parse_qs, unquote, urlparse
 
+try:
+    import orjson
+except ImportError:  # optional: several times faster on multi-hundred-KB payloads
+    orjson = None
+
+from ..utils.tracker_views import parse_views, profile_response
+
+logger = logging.getLogger(__name__)
+
 IMPERSONATE_OPTIONS = ["firefox135", "firefox133", "firefox144", "chrome124", "chrome131"]
 
 _HEADERS_BASE = {
@@ -23,6 +42,16 @@ _HEADERS_BASE = {
 }
 
 
+class TrackerNotFound(ValueError):
+    """The player does not exist on tracker.gg (HTTP 404)."""
+
+
+def _setting(name, default):
+    from django.conf import settings
+
+    return getattr(settings, name, default)
+
+
 def _build_cookie():
     from django.conf import settings
 
@@ -77,213 +106,449 @@ def parse_tracker_url(url):
     }
 
 
-def fetch_tracker_profile(riot_id, riot_tag, playlist="competitive", season_id=""):
-    """
-    Fetch and parse a Valorant profile from the tracker.gg API.
-
-    Tries each value in IMPERSONATE_OPTIONS until one returns HTTP 200.
-    Raises ValueError with a user-friendly message on expected failures.
-    """
+# ---------------------------------------------------------------------------
+# Upstream transport
+# ---------------------------------------------------------------------------
+#
+# Idle curl_cffi Sessions are pooled per impersonation profile for the whole
+# process, so TLS connections are reused across lookups on any thread (request
+# workers, background revalidation, batch pools); a request checks one out and
+# hands it back, and at most TRACKER_SESSION_POOL_SIZE idle ones are kept open
+# per profile. The profile that last got through is
+# tried first. After TRACKER_BREAKER_THRESHOLD consecutive lookups end in
+# 401/403/429 the circuit opens and lookups fail fast for
+# TRACKER_BREAKER_COOLDOWN seconds; then a single trial lookup either closes
+# it again or re-opens it.
+
+BLOCKED_STATUSES = frozenset({401, 403, 429})
+
+_local = threading.local()
+_idle_sessions = {}  # impersonate -> [Session, ...] not checked out by any thread
+_sessions_lock = threading.Lock()
+_stats_lock = threading.Lock()
+_preferred_impersonation = None
+_impersonation_stats = {}
+
+
+class TrackerUnavailable(ValueError):
+    """tracker.gg keeps refusing requests and the circuit breaker is open."""
+
+    def __init__(self, message, retry_after=0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class TrackerRateLimited(ValueError):
+    """tracker.gg answered 429; ``retry_after`` is its Retry-After in seconds (0 if absent)."""
+
+    def __init__(self, message, retry_after=0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class BudgetInterrupted(Exception):
+    """The ``upstream_budget`` stop event was set while a lookup waited for room in the window."""
+
+
+class _CircuitBreaker:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.failures = 0
+        self.open_until = 0.0
+
+    def before_call(self):
+        """
+        Raise TrackerUnavailable while open; let one trial through after the cooldown.
+        Returns a token for ``end_trial`` when this call is the trial, else None.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if now < self.open_until:
+                wait = int(self.open_until - now) + 1
+                raise TrackerUnavailable(
+                    "Tracker.gg is temporarily refusing requests. "
+                    f"Please try again in about {wait} seconds.",
+                    retry_after=wait,
+                )
+            if self.failures >= _setting("TRACKER_BREAKER_THRESHOLD", 3):
+                # Half-open: hold everyone else back while this call is the trial.
+                self.open_until = now + _setting("TRACKER_BREAKER_COOLDOWN", 300)
+                return self.open_until
+            return None
+
+    def end_trial(self, token):
+        """
+        Called however the trial call ended. If it reached no verdict (network
+        error, 5xx, a bug) the hold is lifted so the next call becomes the trial.
+        """
+        with self._lock:
+            if self.open_until == token:
+                self.open_until = 0.0
+
+    def record(self, blocked, retry_after=0):
+        with self._lock:
+            if not blocked:
+                self.failures = 0
+                self.open_until = 0.0
+                return
+            self.failures += 1
+            if self.failures >= _setting("TRACKER_BREAKER_THRESHOLD", 3):
+                cooldown = max(float(_setting("TRACKER_BREAKER_COOLDOWN", 300)), retry_after)
+                self.open_until = time.monotonic() + cooldown
+                logger.warning(
+                    "tracker.gg refused %d lookups in a row; pausing requests for %.0fs.",
+                    self.failures, cooldown,
+                )
+
+
+_breaker = _CircuitBreaker()
+
+
+def _cffi():
     try:
         from curl_cffi import requests as cffi_requests
     except ImportError as exc:
         raise ValueError(
             "curl_cffi is not installed. Run: pip install curl_cffi"
         ) from exc
+    return cffi_requests
+
+
+def _close_session(session):
+    try:
+        session.close()
+    except Exception:
+        pass
+
+
+@contextmanager
+def _session(impersonate):
+    """Check a Session for *impersonate* out of the pool; one that raised is closed, not returned."""
+    with _sessions_lock:
+        idle = _idle_sessions.setdefault(impersonate, [])
+        session = idle.pop() if idle else None
+    if session is None:
+        session = _cffi().Session(impersonate=impersonate)
+    try:
+        yield session
+    except BaseException:
+        _close_session(session)
+        raise
+    with _sessions_lock:
+        idle = _idle_sessions.setdefault(impersonate, [])
+        if len(idle) < _setting("TRACKER_SESSION_POOL_SIZE", 8):
+            idle.append(session)
+            session = None
+    if session is not None:
+        _close_session(session)
+
+
+def _impersonation_order():
+    preferred = _preferred_impersonation
+    if preferred in IMPERSONATE_OPTIONS:
+        return [preferred] + [name for name in IMPERSONATE_OPTIONS if name != preferred]
+    return list(IMPERSONATE_OPTIONS)
+
+
+def _record_attempt(impersonate, status):
+    """Update per-profile stats; 200 and 404 mean the fingerprint got through."""
+    global _preferred_impersonation
+    ok = status in (200, 404)
+    with _stats_lock:
+        stats = _impersonation_stats.setdefault(
+            impersonate, {"success": 0, "failure": 0, "last_status": None},
+        )
+        stats["success" if ok else "failure"] += 1
+        stats["last_status"] = status
+        if ok:
+            _preferred_impersonation = impersonate
+
+
+def impersonation_stats():
+    """Per-profile success/failure counts plus the profile currently tried first."""
+    with _stats_lock:
+        return {
+            "preferred": _preferred_impersonation,
+            "profiles": {name: dict(stats) for name, stats in _impersonation_stats.items()},
+            "breaker_failures": _breaker.failures,
+        }
+
 
+# ---------------------------------------------------------------------------
+# Upstream budget
+# ---------------------------------------------------------------------------
+#
+# Every request sent to tracker.gg is counted in a per-minute window in the
+# tracker cache, so all processes sharing it see one total. Interactive
+# lookups are only counted; batch work (``refresh_tracker_ranks``) runs inside
+# ``upstream_budget(rpm)`` and waits for room in the window before each
+# request, so it only uses what the site left over.
+
+def _spend_budget():
+    rpm = getattr(_local, "budget_rpm", 0)
+    stop = getattr(_local, "budget_stop", None)
+    while True:
+        now = time.time()
+        window = int(now // 60)
+        key = f"tracker:rpm:{window}"
+        cache = _cache()
+        cache.add(key, 0, 120)
+        try:
+            used = cache.incr(key)
+        except ValueError:  # evicted between add() and incr()
+            cache.set(key, 1, 120)
+            used = 1
+        if not rpm or used <= rpm:
+            return used
+        if stop is None:
+            time.sleep((window + 1) * 60 - now)
+        elif stop.wait((window + 1) * 60 - now):
+            raise BudgetInterrupted("Stopped while waiting for the tracker.gg request budget.")
+
+
+def upstream_calls_this_minute():
+    """Requests sent to tracker.gg (by any process) in the current minute."""
+    return _cache().get(f"tracker:rpm:{int(time.time() // 60)}", 0)
+
+
+@contextmanager
+def upstream_budget(rpm, stop=None):
+    """
+    Hold upstream requests made on this thread to *rpm* per minute, site-wide.
+
+    Setting the *stop* event (a ``threading.Event``) ends a wait for the next
+    window early with ``BudgetInterrupted``.
+    """
+    previous = getattr(_local, "budget_rpm", 0), getattr(_local, "budget_stop", None)
+    _local.budget_rpm, _local.budget_stop = rpm, stop
+    try:
+        yield
+    finally:
+        _local.budget_rpm, _local.budget_stop = previous
+
+
+def _retry_after(resp):
+    value = (resp.headers.get("Retry-After") or "").strip()
+    return float(value) if value.isdigit() else 0
+
+
+def _fetch_upstream(riot_id, riot_tag):
+    """
+    Fetch a Valorant profile from the tracker.gg API (uncached) and parse
+    every playlist/season view in it (see ``parse_views``).
+
+    Tries each value in IMPERSONATE_OPTIONS, last-successful first, until one
+    returns HTTP 200. Raises ValueError with a user-friendly message on
+    expected failures.
+    """
+    _cffi()
+    trial = _breaker.before_call()
+    try:
+        return _request_views(riot_id, riot_tag)
+    finally:
+        if trial is not None:
+            _breaker.end_trial(trial)
+
+
+def _request_views(riot_id, riot_tag):
     combined = f"{riot_id}{riot_tag}"       # e.g. "welly#wells"
     encoded = combined.replace("#", "%23")  # e.g. "welly%23wells"
     url = f"https://api.tracker.gg/api/v2/valorant/standard/profile/riot/{encoded}"
 
     headers = {**_HEADERS_BASE, "Cookie": _build_cookie()}
+    timeout = _setting("TRACKER_REQUEST_TIMEOUT", 15)
 
     last_status = None
-    for impersonate in IMPERSONATE_OPTIONS:
+    for impersonate in _impersonation_order():
+        _spend_budget()
         try:
-            resp = cffi_requests.get(url, headers=headers, impersonate=impersonate)
+            with _session(impersonate) as session:
+                resp = session.get(url, headers=headers, timeout=timeout)
         except Exception:
+            _record_attempt(impersonate, None)
             continue
 
         last_status = resp.status_code
+        _record_attempt(impersonate, resp.status_code)
 
         if resp.status_code == 200:
-            return _parse_profile(resp.json(), playlist=playlist, season_id=season_id)
+            _breaker.record(blocked=False)
+            return parse_views(decode_json(resp.content))
         if resp.status_code == 404:
-            raise ValueError(
+            _breaker.record(blocked=False)
+            raise TrackerNotFound(
                 f"Player '{riot_id}{riot_tag}' was not found on tracker.gg."
             )
         if resp.status_code == 429:
-            raise ValueError(
-                "Rate limited by tracker.gg. Please wait a moment and try again."
+            retry_after = _retry_after(resp)
+            _breaker.record(blocked=True, retry_after=retry_after)
+            raise TrackerRateLimited(
+                "Rate limited by tracker.gg. Please wait a moment and try again.",
+                retry_after=retry_after,
             )
         if resp.status_code == 401:
+            _breaker.record(blocked=True)
             raise ValueError(
                 "Tracker.gg authentication failed. "
                 "The CF clearance cookie may have expired — refresh it from browser DevTools."
             )
 
+    if last_status in BLOCKED_STATUSES:
+        _breaker.record(blocked=True)
     raise ValueError(
         f"Could not retrieve tracker.gg data (last HTTP status: {last_status}). "
         "The cf_clearance cookie may need refreshing."
     )
 
 
-def _parse_profile(data, playlist="competitive", season_id=""):
-    """Parse the raw tracker.gg API JSON into a flat dict."""
-    platform = data["data"]["platformInfo"]
-    metadata = data["data"].get("metadata", {})
-    handle = platform["platformUserHandle"]
-    if "#" in handle:
-        riot_id, tag = handle.split("#", 1)
-        riot_tag = "#" + tag
-    else:
-        riot_id = handle
-        riot_tag = ""
-
-    avatar_url = platform.get("avatarUrl", "")
-    region = metadata.get("activeShard", "").upper()
-    segments = data["data"]["segments"]
-
-    def _get_seg(seg_type, attributes=None):
-        for seg in segments:
-            if seg["type"] != seg_type:
-                continue
-            if attributes and not all(
-                seg["attributes"].get(k) == v for k, v in attributes.items()
-            ):
-                continue
-            return seg
-        return None
+# ---------------------------------------------------------------------------
+# Result cache
+# ---------------------------------------------------------------------------
+#
+# Entries live in the TRACKER_CACHE_ALIAS cache, one per player, as
+#   {"data": {...}, "fetched_at": ts}                    — every parsed view, or
+#   {"not_found": True, "error": msg, "fetched_at": ts}  — a recent 404.
+# A profile younger than TRACKER_CACHE_TTL is returned as-is; up to
+# TRACKER_CACHE_STALE_SECONDS past that it is still returned, and one
+# background refresh is started. Concurrent misses for the same key in this
+# process share a single upstream call.
 
-    # ── Current-season stats ────────────────────────────────────────────
-    target_playlist = (playlist or metadata.get("defaultPlaylist") or "competitive").lower()
-    default_season_id = season_id or metadata.get("defaultSeason", "")
-    season = None
-    if default_season_id:
-        season = _get_seg(
-            "season",
-            {"playlist": target_playlist, "seasonId": default_season_id},
-        )
-    if not season:
-        season = _get_seg("season", {"playlist": target_playlist})
-    if not season:
-        season = _get_seg("season")
-    season_stats = season["stats"] if season else {}
-
-    rank_meta = season_stats.get("rank", {}).get("metadata", {})
-    current_rank = rank_meta.get("tierName", "")
-    current_rank_icon = rank_meta.get("iconUrl", "")
-
-    # ── Peak rank — PRIMARY: dedicated peak-rating segment ──────────────
-    peak_seg = _get_seg("peak-rating", {"playlist": target_playlist})
-    if peak_seg:
-        pr = peak_seg["stats"].get("peakRating", {})
-        peak_meta = pr.get("metadata", {})
-        peak_rank = pr.get("displayValue", "")
-        peak_rank_icon = peak_meta.get("iconUrl", "")
-        peak_act = peak_meta.get("actName", "")
-    else:
-        # FALLBACK: season segment's peakRank (act-scoped only)
-        pr = season_stats.get("peakRank", {})
-        peak_meta = pr.get("metadata", {})
-        peak_rank = pr.get("displayValue", "")
-        peak_rank_icon = peak_meta.get("iconUrl", "")
-        peak_act = peak_meta.get("actName", "")
-
-    # Some tracker responses omit peak icon metadata; use current rank icon as fallback.
-    if not peak_rank_icon:
-        peak_rank_icon = current_rank_icon
-
-    # ── Other season stats ───────────────────────────────────────────────
-    kd_ratio = ""
-    for kd_key in ("kDRatio", "kdRatio", "kd", "killDeathRatio"):
-        kd_stat = season_stats.get(kd_key)
-        if kd_stat:
-            kd_ratio = kd_stat.get("displayValue", "")
-            break
-
-    wins = season_stats.get("matchesWon", {}).get("displayValue", "")
-    matches_played = season_stats.get("matchesPlayed", {}).get("displayValue", "")
-    damage_per_round = season_stats.get("damagePerRound", {}).get("displayValue", "")
-    headshot_pct = season_stats.get("headshotsPercentage", {}).get("displayValue", "")
-
-    # ── Top agents ───────────────────────────────────────────────────────
-    agent_segs = []
-    for seg in segments:
-        if seg.get("type") != "agent":
-            continue
-        attrs = seg.get("attributes", {})
-        if attrs.get("playlist") != target_playlist:
-            continue
-        if default_season_id and attrs.get("seasonId") != default_season_id:
-            continue
-        agent_segs.append(seg)
-
-    # API order is not guaranteed to be "top"; sort by matches played and then time played.
-    agent_segs.sort(
-        key=lambda s: (
-            s.get("stats", {}).get("matchesPlayed", {}).get("value", 0),
-            s.get("stats", {}).get("timePlayed", {}).get("value", 0),
-        ),
-        reverse=True,
-    )
+class _Flight:
+    __slots__ = ("done", "result", "error")
 
-    if not agent_segs:
-        agent_segs = [s for s in segments if s.get("type") == "agent"]
-        agent_segs.sort(
-            key=lambda s: (
-                s.get("stats", {}).get("matchesPlayed", {}).get("value", 0),
-                s.get("stats", {}).get("timePlayed", {}).get("value", 0),
-            ),
-            reverse=True,
-        )
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+_flights = {}
+_flights_lock = threading.Lock()
 
-    top_agents = []
-    primary_agent_key = ""
-    primary_agent_name = ""
-    for agent in agent_segs[:5]:
-        meta = agent.get("metadata", {})
-        attrs = agent.get("attributes", {})
-        agent_key = attrs.get("key") or attrs.get("agentId") or ""
-        name = (
-            meta.get("agentName")
-            or meta.get("name")
-            or attrs.get("agentName")
-            or attrs.get("agentId")
-            or "Unknown"
+
+def _cache():
+    from django.core.cache import caches
+
+    return caches[_setting("TRACKER_CACHE_ALIAS", "default")]
+
+
+def tracker_cache_key(riot_id, riot_tag):
+    """Cache key for a player; Riot ID and tag compare case-insensitively."""
+    ident = "|".join((
+        (riot_id or "").strip().lower(),
+        (riot_tag or "").strip().lstrip("#").lower(),
+    ))
+    return "tracker:v2:" + hashlib.sha1(ident.encode("utf-8")).hexdigest()
+
+
+def _single_flight(key, func):
+    """Run *func* once per *key* at a time; concurrent callers share its outcome."""
+    with _flights_lock:
+        flight = _flights.get(key)
+        leader = flight is None
+        if leader:
+            flight = _flights[key] = _Flight()
+
+    if not leader:
+        flight.done.wait()
+        if flight.error is not None:
+            raise flight.error
+        return flight.result
+
+    try:
+        flight.result = func()
+        return flight.result
+    except Exception as exc:
+        flight.error = exc
+        raise
+    finally:
+        with _flights_lock:
+            _flights.pop(key, None)
+        flight.done.set()
+
+
+def _refresh(key, riot_id, riot_tag):
+    ttl = _setting("TRACKER_CACHE_TTL", 600)
+    stale = _setting("TRACKER_CACHE_STALE_SECONDS", 3600)
+    try:
+        data = _fetch_upstream(riot_id, riot_tag)
+    except TrackerNotFound as exc:
+        _cache().set(
+            key,
+            {"not_found": True, "error": str(exc), "fetched_at": time.time()},
+            _setting("TRACKER_NOT_FOUND_TTL", 120),
         )
-        if not primary_agent_key:
-            primary_agent_key = str(agent_key)
-            primary_agent_name = str(name).strip().lower()
-        a_stats = agent.get("stats", {})
-        a_kd = ""
-        for kd_key in ("kDRatio", "kdRatio", "kd", "killDeathRatio"):
-            if kd_key in a_stats:
-                a_kd = a_stats[kd_key].get("displayValue", "")
-                break
-        top_agents.append({
-            "name": name,
-            "wins": a_stats.get("matchesWon", {}).get("displayValue", ""),
-            "played": a_stats.get("matchesPlayed", {}).get("displayValue", ""),
-            "kd": a_kd,
-        })
+        raise
+    data["fetched_at"] = time.time()
+    _cache().set(key, {"data": data, "fetched_at": data["fetched_at"]}, ttl + stale)
+    return data
 
 
-    return {
-        "riot_id": riot_id,
-        "riot_tag": riot_tag,
-        "in_game_name": riot_id,
-        "avatar_url": avatar_url,
-        "region": region,
-        "current_rank": current_rank,
-        "current_rank_icon": current_rank_icon,
-        "peak_rank": peak_rank,
-        "peak_rank_icon": peak_rank_icon,
-        "peak_act": peak_act,
-        "kd_ratio": kd_ratio,
-        "wins": wins,
-        "matches_played": matches_played,
-        "damage_per_round": damage_per_round,
-        "headshot_pct": headshot_pct,
-        "top_agents": top_agents,
-    }
+def _revalidate_in_background(key, riot_id, riot_tag):
+    with _flights_lock:
+        if key in _flights:
+            return
+
+    def run():
+        try:
+            _single_flight(key, lambda: _refresh(key, riot_id, riot_tag))
+        except Exception as exc:
+            logger.info("Background tracker refresh failed for %s%s: %s", riot_id, riot_tag, exc)
+
+    threading.Thread(target=run, name="tracker-revalidate", daemon=True).start()
+
+
+def fetch_tracker_views(riot_id, riot_tag, allow_stale=True):
+    """
+    Return every parsed playlist/season view for a player (see ``parse_views``),
+    from the cache when possible.
+
+    A stale entry is returned at once and revalidated in the background;
+    with ``allow_stale=False`` it is refetched on the calling thread instead,
+    inside any ``upstream_budget`` the caller holds.
+
+    Raises ValueError with a user-friendly message on expected failures;
+    a 404 is remembered for TRACKER_NOT_FOUND_TTL seconds.
+    """
+    key = tracker_cache_key(riot_id, riot_tag)
+    entry = _cache().get(key)
+    if entry:
+        age = time.time() - entry.get("fetched_at", 0)
+        if entry.get("not_found"):
+            if age < _setting("TRACKER_NOT_FOUND_TTL", 120):
+                raise TrackerNotFound(entry["error"])
+        elif "data" in entry:
+            ttl = _setting("TRACKER_CACHE_TTL", 600)
+            if age < ttl:
+                return entry["data"]
+            if allow_stale and age < ttl + _setting("TRACKER_CACHE_STALE_SECONDS", 3600):
+                _revalidate_in_background(key, riot_id, riot_tag)
+                return entry["data"]
+
+    return _single_flight(key, lambda: _refresh(key, riot_id, riot_tag))
+
+
+def cached_tracker_views(riot_id, riot_tag):
+    """Return the cached views for a player (fresh or stale), or None; never calls upstream."""
+    entry = _cache().get(tracker_cache_key(riot_id, riot_tag))
+    return entry.get("data") if entry else None
+
+
+def fetch_tracker_profile(riot_id, riot_tag, playlist="competitive", season_id=""):
+    """
+    Return the parsed tracker.gg profile for *playlist* / *season_id*
+    (see ``profile_response``). Other playlists and seasons of the same
+    player are served from the same cache entry.
+    """
+    return profile_response(fetch_tracker_views(riot_id, riot_tag), playlist=playlist, season_id=season_id)
+
+
+# ---------------------------------------------------------------------------
+# Decoding (the views themselves are parsed in utils.tracker_views)
+# ---------------------------------------------------------------------------
+
+def decode_json(body):
+    """Decode a response body (bytes or str), with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(body)
+    return json.loads(body)
@@ -0,0 +1,150 @@
+"""
+Persisted tracker.gg results (``TrackerSnapshot``), one row per refresh.
+
+``fetch_tracker_profile`` is what views and jobs call: when the player has a
+profile whose latest snapshot is younger than TRACKER_SNAPSHOT_FRESH_SECONDS
+it is answered from that row and tracker.gg is not contacted at all;
+otherwise it goes through ``tracker_api`` (cache, then upstream) and records
+the result as a new snapshot.
+
+Retention is applied whenever a snapshot is written: a profile keeps its
+newest TRACKER_SNAPSHOT_KEEP rows, minus any older than
+TRACKER_SNAPSHOT_RETENTION_DAYS — but never loses its latest one.
+
+``iter_tracker_profiles`` does the same for several players at once, with the
+upstream lookups on a small thread pool.
+"""
+
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from ..models import Profile, TrackerSnapshot
+from ..utils.db_retry import retry_on_locked
+from ..utils.riot_ids import normalize_name, normalize_riot_tag
+from ..utils.tracker_views import profile_response
+from . import tracker_api
+
+
+def profile_for_riot_id(riot_id, riot_tag):
+    """Return the Profile registered with this Riot ID, or None."""
+    riot_id_norm = normalize_name(riot_id)
+    if not riot_id_norm:
+        return None
+    return Profile.objects.filter(riot_id_norm=riot_id_norm, riot_tag_norm=normalize_riot_tag(riot_tag)).first()
+
+
+def is_fresh(snapshot):
+    max_age = getattr(settings, 'TRACKER_SNAPSHOT_FRESH_SECONDS', 6 * 3600)
+    return snapshot is not None and timezone.now() - snapshot.fetched_at < timedelta(seconds=max_age)
+
+
+def _fetched_at(data):
+    stamp = data.get('fetched_at')
+    return datetime.fromtimestamp(stamp, tz=dt_timezone.utc) if stamp else timezone.now()
+
+
+@retry_on_locked
+def record_snapshot(profile, data):
+    """
+    Store *data* (a ``tracker_views.parse_views`` result) for *profile* and
+    apply retention. A result already recorded (same fetch) is not stored twice.
+    """
+    fetched_at = _fetched_at(data)
+    latest = profile.latest_tracker_snapshot
+    if latest is not None and latest.fetched_at >= fetched_at:
+        return latest
+
+    with transaction.atomic():
+        snapshot = TrackerSnapshot.objects.create(profile=profile, fetched_at=fetched_at, data=data)
+        keep = max(1, getattr(settings, 'TRACKER_SNAPSHOT_KEEP', 10))
+        cutoff = timezone.now() - timedelta(days=getattr(settings, 'TRACKER_SNAPSHOT_RETENTION_DAYS', 90))
+        kept = profile.tracker_snapshots.values_list('id', flat=True)[:keep]
+        profile.tracker_snapshots.exclude(id=snapshot.id).filter(
+            Q(fetched_at__lt=cutoff) | ~Q(id__in=list(kept)),
+        ).delete()
+
+    profile.latest_tracker_snapshot = snapshot
+    return snapshot
+
+
+def record_cached_snapshot(profile):
+    """Snapshot whatever tracker_api has cached for *profile*'s Riot ID (no upstream call)."""
+    data = tracker_api.cached_tracker_views(profile.riot_id, profile.riot_tag)
+    return record_snapshot(profile, data) if data else None
+
+
+def fresh_tracker_profile(riot_id, riot_tag, playlist='competitive', season_id=''):
+    """The tracker response from a fresh snapshot, or None if there is none."""
+    profile = profile_for_riot_id(riot_id, riot_tag)
+    snapshot = profile.latest_tracker_snapshot if profile is not None else None
+    if not is_fresh(snapshot):
+        return None
+    return profile_response(snapshot.data, playlist=playlist, season_id=season_id)
+
+
+def fetch_tracker_profile(riot_id, riot_tag, playlist='competitive', season_id=''):
+    """
+    ``tracker_api.fetch_tracker_profile``, answered from a fresh snapshot when
+    there is one and recording a new snapshot when there is not.
+    """
+    profile = profile_for_riot_id(riot_id, riot_tag)
+    snapshot = profile.latest_tracker_snapshot if profile is not None else None
+    if is_fresh(snapshot):
+        data = snapshot.data
+    else:
+        data = tracker_api.fetch_tracker_views(riot_id, riot_tag)
+        if profile is not None:
+            record_snapshot(profile, data)
+    return profile_response(data, playlist=playlist, season_id=season_id)
+
+
+def iter_tracker_profiles(lookups, workers=4):
+    """
+    ``fetch_tracker_profile`` for several ``(riot_id, riot_tag, playlist, season_id)``
+    lookups, yielding ``(position, data, error)`` as each one completes.
+
+    Fresh snapshots are yielded first, without a thread; a player asked for
+    more than once is fetched once. Worker threads only go through
+    ``tracker_api`` (cache and upstream) — snapshots are read and recorded on
+    the calling thread, so the database is never shared across threads.
+    """
+    waiting = {}  # tracker cache key -> (profile, riot_id, riot_tag, [(position, playlist, season_id), ...])
+    for position, (riot_id, riot_tag, playlist, season_id) in enumerate(lookups):
+        profile = profile_for_riot_id(riot_id, riot_tag)
+        snapshot = profile.latest_tracker_snapshot if profile is not None else None
+        if is_fresh(snapshot):
+            yield position, profile_response(snapshot.data, playlist=playlist, season_id=season_id), None
+            continue
+        key = tracker_api.tracker_cache_key(riot_id, riot_tag)
+        waiting.setdefault(key, (profile, riot_id, riot_tag, []))[3].append((position, playlist, season_id))
+    if not waiting:
+        return
+
+    pool = ThreadPoolExecutor(max_workers=max(1, min(workers, len(waiting))), thread_name_prefix='tracker-batch')
+    try:
+        futures = {
+            pool.submit(tracker_api.fetch_tracker_views, riot_id, riot_tag): (profile, wanted)
+            for profile, riot_id, riot_tag, wanted in waiting.values()
+        }
+        while futures:
+            finished, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in finished:
+                profile, wanted = futures.pop(future)
+                try:
+                    data = future.result()
+                except Exception as exc:
+                    for position, _, _ in wanted:
+                        yield position, None, exc
+                    continue
+                if profile is not None:
+                    record_snapshot(profile, data)
+                for position, playlist, season_id in wanted:
+                    yield position, profile_response(data, playlist=playlist, season_id=season_id), None
+    finally:
+        # A client that disconnects mid-stream closes the generator: drop what has not started
+        pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,20 @@
+"""Database session backend whose writes survive short writer-lock contention.
+
+Selected with ``SESSION_ENGINE = 'profiles.sessions'``. Identical to
+``django.contrib.sessions.backends.db`` except that ``save`` and ``delete``
+retry on "database is locked" (see ``utils/db_retry.py``).
+"""
+
+from django.contrib.sessions.backends.db import SessionStore as DBStore
+
+from .utils.db_retry import retry_on_locked
+
+
+class SessionStore(DBStore):
+    @retry_on_locked
+    def save(self, must_create=False):
+        return super().save(must_create=must_create)
+
+    @retry_on_locked
+    def delete(self, session_key=None):
+        return super().delete(session_key)
@@ -0,0 +1,169 @@
+"""Signal handlers that keep derived data in sync with the models."""
+
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .catalog import bump_catalog_version
+from .models import Agent, Map, Profile, Role, Team
+from .services.search import index_profiles, remove_profiles
+from .services.suggest import bump_suggest_version
+from .utils.card_cache import bump_catalog_epoch, invalidate_profile_cards
+from .utils.pfp_derivatives import (
+    delete_profile_picture_derivatives,
+    derivatives_outdated,
+    refresh_profile_picture_derivatives,
+)
+
+
+# ---------------------------------------------------------------------------
+# Rendered card cache
+# ---------------------------------------------------------------------------
+
+def _team_member_ids(team_id):
+    if not team_id:
+        return []
+    return list(Profile.objects.filter(team_id=team_id).values_list('id', flat=True))
+
+
+@receiver(post_save, sender=Profile)
+@receiver(post_delete, sender=Profile)
+def invalidate_cards_on_profile_change(sender, instance, **kwargs):
+    # Teammates' cards show this profile's name and picture too.
+    invalidate_profile_cards(instance.pk, *_team_member_ids(instance.team_id))
+
+
+@receiver(m2m_changed, sender=Profile.agents.through)
+@receiver(m2m_changed, sender=Profile.roles.through)
+@receiver(m2m_changed, sender=Profile.maps.through)
+def invalidate_cards_on_selection_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        invalidate_profile_cards(instance.pk)
+    elif pk_set:
+        invalidate_profile_cards(*pk_set)
+    else:
+        # Reverse clear (e.g. agent.player_profiles.clear()) — ids are gone already.
+        bump_catalog_epoch()
+
+
+@receiver(post_save, sender=Agent)
+@receiver(post_save, sender=Role)
+@receiver(post_save, sender=Map)
+@receiver(post_save, sender=Team)
+@receiver(post_delete, sender=Agent)
+@receiver(post_delete, sender=Role)
+@receiver(post_delete, sender=Map)
+@receiver(post_delete, sender=Team)
+def invalidate_cards_on_catalog_change(sender, **kwargs):
+    bump_catalog_version()
+    bump_catalog_epoch()
+
+
+# ---------------------------------------------------------------------------
+# Profile-picture derivatives
+# ---------------------------------------------------------------------------
+
+def _refresh_pfp_derivatives(profile_id):
+    profile = Profile.objects.filter(pk=profile_id).first()
+    if profile is not None:
+        refresh_profile_picture_derivatives(profile)
+
+
+@receiver(post_save, sender=Profile)
+def refresh_pfp_derivatives(sender, instance, raw=False, **kwargs):
+    if raw or not derivatives_outdated(instance):
+        return
+    # After commit, so the picture fetch and encodes never hold the SQLite write lock
+    profile_id = instance.pk
+    transaction.on_commit(lambda: _refresh_pfp_derivatives(profile_id), robust=True)
+
+
+@receiver(post_delete, sender=Profile)
+def delete_pfp_derivatives(sender, instance, **kwargs):
+    delete_profile_picture_derivatives(instance)
+
+
+# ---------------------------------------------------------------------------
+# Full-text search index
+# ---------------------------------------------------------------------------
+#
+# Index writes wait for the saving transaction to commit, so they never hold
+# the SQLite write lock it took (see _save_atomically in views.py); a rolled
+# back save leaves the index alone.
+
+def _index_on_commit(profile_ids):
+    profile_ids = list(profile_ids)   # resolved now, while the rows are visible
+    if profile_ids:
+        transaction.on_commit(lambda: index_profiles(profile_ids), robust=True)
+
+
+@receiver(post_save, sender=Profile)
+def index_profile_for_search(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    _index_on_commit([instance.pk])
+
+
+@receiver(post_delete, sender=Profile)
+def remove_profile_from_search(sender, instance, **kwargs):
+    profile_id = instance.pk
+    transaction.on_commit(lambda: remove_profiles([profile_id]), robust=True)
+
+
+@receiver(m2m_changed, sender=Profile.agents.through)
+@receiver(m2m_changed, sender=Profile.maps.through)
+def reindex_on_selection_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse and action == 'pre_clear':
+        # agent.player_profiles.clear() — remember who is affected before the rows go
+        instance._search_reindex_ids = list(instance.player_profiles.values_list('id', flat=True))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        _index_on_commit([instance.pk])
+    elif action == 'post_clear':
+        _index_on_commit(getattr(instance, '_search_reindex_ids', []))
+    elif pk_set:
+        _index_on_commit(pk_set)
+
+
+@receiver(post_save, sender=Team)
+def reindex_team_members(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    _index_on_commit(_team_member_ids(instance.pk))
+
+
+@receiver(post_save, sender=Agent)
+@receiver(post_save, sender=Map)
+def reindex_catalog_players(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    _index_on_commit(instance.player_profiles.values_list('id', flat=True))
+
+
+@receiver(pre_delete, sender=Agent)
+@receiver(pre_delete, sender=Map)
+def remember_catalog_players(sender, instance, **kwargs):
+    instance._search_reindex_ids = list(instance.player_profiles.values_list('id', flat=True))
+
+
+@receiver(post_delete, sender=Agent)
+@receiver(post_delete, sender=Map)
+def reindex_after_catalog_delete(sender, instance, **kwargs):
+    _index_on_commit(getattr(instance, '_search_reindex_ids', []))
+
+
+# ---------------------------------------------------------------------------
+# Typeahead prefix index
+# ---------------------------------------------------------------------------
+
+@receiver(post_save, sender=Profile)
+@receiver(post_save, sender=Team)
+@receiver(post_delete, sender=Profile)
+@receiver(post_delete, sender=Team)
+def invalidate_suggest_index(sender, **kwargs):
+    # After commit, or another worker could rebuild from the old rows and keep them
+    transaction.on_commit(bump_suggest_version, robust=True)
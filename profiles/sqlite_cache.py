@@ -0,0 +1,210 @@
+"""
+Cache backend shared by every worker process on the host, stored in SQLite.
+
+``LocMemCache`` gives each gunicorn worker its own copy, so rate-limit
+counters (and every app cache) were multiplied by the worker count. This
+backend keeps entries in one WAL-mode SQLite file instead; no external
+service is needed.
+
+* ``incr`` is a single ``UPDATE ... RETURNING``, so concurrent increments
+  from different workers never lose a count (what django_ratelimit needs).
+* ``add`` is a single upsert that only overwrites an *expired* entry.
+* Integers are stored as SQL integers (so they can be incremented in place);
+  everything else is pickled.
+* Expired rows are invisible to reads and are deleted, along with the
+  soonest-to-expire rows beyond ``MAX_ENTRIES``, every ``CULL_EVERY`` writes.
+
+Configure with::
+
+    'default': {
+        'BACKEND': 'profiles.sqlite_cache.SQLiteCache',
+        'LOCATION': BASE_DIR / 'data' / 'cache.sqlite3',
+        'OPTIONS': {'MAX_ENTRIES': 20000},
+    }
+
+Each thread keeps one autocommit connection per file, reopened after fork.
+"""
+
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache_entry (
+    key     TEXT PRIMARY KEY,
+    value   BLOB,
+    num     INTEGER,
+    expires REAL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS cache_entry_expires ON cache_entry (expires);
+"""
+
+# Row is live: no expiry, or expiry in the future (bound to "now")
+_LIVE = '(expires IS NULL OR expires > ?)'
+
+_local = threading.local()
+
+
+def _encode(value):
+    """Return ``(blob, num)``; plain 64-bit ints go in the integer column."""
+    if type(value) is int and -2 ** 63 <= value < 2 ** 63:
+        return None, value
+    return pickle.dumps(value, pickle.HIGHEST_PROTOCOL), None
+
+
+def _decode(blob, num):
+    return num if blob is None else pickle.loads(blob)
+
+
+class SQLiteCache(BaseCache):
+    def __init__(self, location, params):
+        super().__init__(params)
+        self._path = str(location)
+        options = params.get('OPTIONS', {})
+        self._busy_timeout = float(options.get('BUSY_TIMEOUT', 5))
+        self._cull_every = max(1, int(options.get('CULL_EVERY', 500)))
+        self._writes = 0
+
+    # -- connection ---------------------------------------------------------
+
+    def _connection(self):
+        connections = getattr(_local, 'connections', None)
+        if connections is None or _local.pid != os.getpid():
+            # First use on this thread, or we are in a freshly forked worker
+            connections = _local.connections = {}
+            _local.pid = os.getpid()
+        conn = connections.get(self._path)
+        if conn is None:
+            Path(self._path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self._path, timeout=self._busy_timeout,
+                                   isolation_level=None, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.executescript(_SCHEMA)
+            connections[self._path] = conn
+        return conn
+
+    def _expires(self, timeout):
+        return self.get_backend_timeout(timeout)  # absolute time, or None for "never"
+
+    def _wrote(self, conn, count=1):
+        self._writes += count
+        if self._writes >= self._cull_every:
+            self._writes = 0
+            self._cull(conn)
+
+    def _cull(self, conn):
+        now = time.time()
+        conn.execute('DELETE FROM cache_entry WHERE expires <= ?', [now])
+        excess = conn.execute('SELECT COUNT(*) FROM cache_entry').fetchone()[0] - self._max_entries
+        if excess > 0:
+            # Over budget: drop the entries that would expire soonest (never-expiring last)
+            conn.execute(
+                'DELETE FROM cache_entry WHERE key IN ('
+                ' SELECT key FROM cache_entry ORDER BY expires IS NULL, expires LIMIT ?)',
+                [excess + self._max_entries // max(self._cull_frequency, 1)],
+            )
+
+    # -- cache API ------------------------------------------------------------
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        blob, num = _encode(value)
+        conn = self._connection()
+        cursor = conn.execute(
+            'INSERT INTO cache_entry (key, value, num, expires) VALUES (?, ?, ?, ?) '
+            'ON CONFLICT (key) DO UPDATE SET value = excluded.value, num = excluded.num, '
+            'expires = excluded.expires WHERE NOT ' + _LIVE.replace('expires', 'cache_entry.expires'),
+            [key, blob, num, self._expires(timeout), time.time()],
+        )
+        added = cursor.rowcount > 0
+        if added:
+            self._wrote(conn)
+        return added
+
+    def get(self, key, default=None, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        row = self._connection().execute(
+            f'SELECT value, num FROM cache_entry WHERE key = ? AND {_LIVE}', [key, time.time()],
+        ).fetchone()
+        return default if row is None else _decode(*row)
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        blob, num = _encode(value)
+        conn = self._connection()
+        conn.execute('INSERT OR REPLACE INTO cache_entry (key, value, num, expires) VALUES (?, ?, ?, ?)',
+                     [key, blob, num, self._expires(timeout)])
+        self._wrote(conn)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        cursor = self._connection().execute(
+            f'UPDATE cache_entry SET expires = ? WHERE key = ? AND {_LIVE}',
+            [self._expires(timeout), key, time.time()],
+        )
+        return cursor.rowcount > 0
+
+    def delete(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        cursor = self._connection().execute('DELETE FROM cache_entry WHERE key = ?', [key])
+        return cursor.rowcount > 0
+
+    def has_key(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        row = self._connection().execute(
+            f'SELECT 1 FROM cache_entry WHERE key = ? AND {_LIVE}', [key, time.time()],
+        ).fetchone()
+        return row is not None
+
+    def incr(self, key, delta=1, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        # fetchall() runs the statement to completion, ending the implicit transaction
+        rows = self._connection().execute(
+            f'UPDATE cache_entry SET num = num + ? WHERE key = ? AND num IS NOT NULL AND {_LIVE} '
+            'RETURNING num',
+            [delta, key, time.time()],
+        ).fetchall()
+        if not rows:
+            raise ValueError(f"Key '{key}' not found")
+        return rows[0][0]
+
+    def get_many(self, keys, version=None):
+        key_map = {self.make_and_validate_key(key, version=version): key for key in keys}
+        if not key_map:
+            return {}
+        placeholders = ', '.join('?' * len(key_map))
+        rows = self._connection().execute(
+            f'SELECT key, value, num FROM cache_entry WHERE key IN ({placeholders}) AND {_LIVE}',
+            [*key_map, time.time()],
+        ).fetchall()
+        return {key_map[key]: _decode(blob, num) for key, blob, num in rows}
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        expires = self._expires(timeout)
+        rows = [
+            (self.make_and_validate_key(key, version=version), *_encode(value), expires)
+            for key, value in data.items()
+        ]
+        conn = self._connection()
+        with conn:  # one transaction for the batch
+            conn.execute('BEGIN IMMEDIATE')
+            conn.executemany('INSERT OR REPLACE INTO cache_entry (key, value, num, expires) VALUES (?, ?, ?, ?)',
+                             rows)
+        self._wrote(conn, len(rows))
+        return []
+
+    def delete_many(self, keys, version=None):
+        keys = [self.make_and_validate_key(key, version=version) for key in keys]
+        if keys:
+            self._connection().execute(
+                f"DELETE FROM cache_entry WHERE key IN ({', '.join('?' * len(keys))})", keys,
+            )
+
+    def clear(self):
+        self._connection().execute('DELETE FROM cache_entry')
@@ -0,0 +1,40 @@
+"""Background job handlers (see services/jobs.py)."""
+
+from django.urls import reverse
+
+from .models import Profile
+from .services.jobs import register
+from .services.tracker_snapshots import fetch_tracker_profile
+from .utils.card_cache import card_cache_key, get_card, store_card
+from .utils.card_render import get_render_backend, render_card
+
+TRACKER_FETCH = 'tracker.fetch'
+CARD_RENDER = 'card.render'
+
+
+@register(TRACKER_FETCH)
+def fetch_tracker(riot_id, riot_tag, playlist='competitive', season_id=''):
+    return fetch_tracker_profile(riot_id, riot_tag, playlist=playlist, season_id=season_id)
+
+
+@register(CARD_RENDER)
+def render_card_download(profile_id, fmt='png'):
+    """Render a card into the card cache; the result points at the download URL."""
+    try:
+        profile = Profile.objects.select_related('team').get(id=profile_id)
+    except Profile.DoesNotExist as exc:
+        raise ValueError('Profile not found.') from exc
+
+    teammates = []
+    if profile.team:
+        teammates = list(Profile.objects.filter(team=profile.team).exclude(id=profile.id))
+
+    backend = get_render_backend()
+    key = card_cache_key(profile, teammates, backend, fmt)
+    if get_card(key) is None:
+        store_card(key, render_card(profile, teammates, backend=backend, fmt=fmt), profile.id)
+
+    return {
+        'etag': key,
+        'download_url': f"{reverse('card_download', args=[profile.id])}?format={fmt}",
+    }
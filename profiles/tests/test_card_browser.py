@@ -0,0 +1,96 @@
+import threading
+
+from django.test import SimpleTestCase
+
+from profiles.services.card_browser import READY_SIGNAL, CardBrowserBusy, CardBrowserPool, _RenderJob
+
+
+class _FakeContext:
+    def __init__(self):
+        self.cookies = []
+
+    def clear_cookies(self):
+        self.cookies = []
+
+    def add_cookies(self, cookies):
+        self.cookies.extend(cookies)
+
+
+class _FakePage:
+    def __init__(self, gate=None):
+        self.context = _FakeContext()
+        self.gate = gate
+        self.visited = []
+        self.waited_for = []
+
+    def goto(self, url, wait_until=None, timeout=None):
+        if self.gate is not None:
+            self.gate.wait()
+        self.visited.append(url)
+
+    def wait_for_function(self, expression, timeout=None):
+        self.waited_for.append(expression)
+
+    def screenshot(self, full_page=False):
+        return b'png:' + self.visited[-1].encode()
+
+
+class _FakeBrowser:
+    def close(self):
+        pass
+
+
+class _FakePlaywright:
+    def stop(self):
+        pass
+
+
+class CardBrowserPoolTests(SimpleTestCase):
+    def _pool(self, gate=None, **kwargs):
+        self.launches = []
+
+        def launch(viewport):
+            page = _FakePage(gate)
+            self.launches.append(page)
+            return _FakePlaywright(), _FakeBrowser(), page
+
+        pool = CardBrowserPool(launch=launch, **kwargs)
+        self.addCleanup(pool.shutdown)
+        return pool
+
+    def test_render_waits_for_ready_signal_and_reuses_browser(self):
+        pool = self._pool(recycle_after=10)
+
+        self.assertEqual(pool.render('http://card/1'), b'png:http://card/1')
+        self.assertEqual(pool.render('http://card/2'), b'png:http://card/2')
+
+        self.assertEqual(len(self.launches), 1)
+        self.assertEqual(self.launches[0].waited_for, [READY_SIGNAL, READY_SIGNAL])
+
+    def test_browser_is_recycled_after_n_renders(self):
+        pool = self._pool(recycle_after=2)
+
+        for idx in range(5):
+            pool.render(f'http://card/{idx}')
+
+        self.assertEqual(len(self.launches), 3)
+
+    def test_cookies_do_not_leak_between_jobs(self):
+        pool = self._pool()
+
+        pool.render('http://card/1', cookies=[{'name': 'sessionid', 'value': 'a', 'url': 'http://card'}])
+        pool.render('http://card/2')
+
+        self.assertEqual(self.launches[0].context.cookies, [])
+
+    def test_full_queue_and_timeout_raise_busy(self):
+        gate = threading.Event()
+        self.addCleanup(gate.set)
+        pool = self._pool(gate=gate, queue_max=1, job_timeout=0.2)
+
+        with self.assertRaises(CardBrowserBusy):
+            pool.render('http://card/slow')  # occupies the only render thread
+        pool._queue.put_nowait(_RenderJob('http://card/filler', []))  # fill the queue behind it
+
+        with self.assertRaises(CardBrowserBusy):
+            pool.render('http://card/queued')
@@ -0,0 +1,48 @@
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+
+from profiles.utils import card_image
+from profiles.utils.card_image import ICON_IMG_SIZE, MAP_THUMB_SIZE
+
+
+class AssetCacheTests(SimpleTestCase):
+    def setUp(self):
+        card_image._asset_cache.clear()
+
+    def test_local_icon_is_decoded_once_per_size(self):
+        url = '/static/profiles/images/agents/Jett.png'
+        size = (ICON_IMG_SIZE, ICON_IMG_SIZE)
+
+        with patch.object(card_image.Image, 'open', wraps=card_image.Image.open) as opened:
+            first = card_image._load_image_from_url_or_path(url, size=size)
+            second = card_image._load_image_from_url_or_path(url, size=size)
+            other = card_image._load_image_from_url_or_path(url, size=MAP_THUMB_SIZE)
+
+        self.assertIs(first, second)
+        self.assertEqual(first.size, size)
+        self.assertEqual(other.size, MAP_THUMB_SIZE)
+        self.assertEqual(opened.call_count, 2)
+
+    def test_cache_evicts_least_recently_used_beyond_budget(self):
+        cache = card_image._AssetCache(max_bytes=3 * 10 * 10 * 4)
+        images = [card_image.Image.new('RGBA', (10, 10)) for _ in range(4)]
+        for idx, img in enumerate(images[:3]):
+            cache.put(idx, img)
+        cache.get(0)          # 1 is now the least recently used
+
+        cache.put(3, images[3])
+
+        self.assertIsNone(cache.get(1))
+        self.assertIs(cache.get(0), images[0])
+        self.assertIs(cache.get(3), images[3])
+
+    def test_warm_up_loads_bundled_assets(self):
+        loaded = card_image.warm_asset_cache()
+
+        self.assertGreater(loaded, len(card_image._CARD_FONTS))
+        self.assertIsNotNone(card_image._asset_cache.get((
+            str(card_image._local_path_for('/static/profiles/images/maps/Ascent.png')),
+            card_image._local_path_for('/static/profiles/images/maps/Ascent.png').stat().st_mtime,
+            MAP_THUMB_SIZE,
+        )))
@@ -0,0 +1,141 @@
+import io
+import importlib.util
+from unittest import skipUnless
+from unittest.mock import patch
+
+from PIL import Image, ImageChops, ImageStat
+from django.contrib.staticfiles.testing import StaticLiveServerTestCase
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from profiles.models import Agent, Map, Profile, Role, Team
+from profiles.utils.card_image import CARD_H, CARD_W
+from profiles.utils.card_render import (
+    BACKEND_PILLOW,
+    BACKEND_PLAYWRIGHT,
+    render_card_png,
+)
+
+HAS_PLAYWRIGHT = importlib.util.find_spec('playwright') is not None
+
+# Mean absolute per-channel difference (0-255) tolerated between the two
+# backends. The HTML card animates its gradient and uses web fonts, so the
+# renders are close but never byte-identical.
+PARITY_MEAN_TOLERANCE = 40
+
+
+def _make_profile():
+    duelist = Role.objects.create(name='Duelist', icon_url='/static/profiles/images/roles/Duelist.png')
+    jett = Agent.objects.create(name='Jett', role=duelist, icon_url='/static/profiles/images/agents/Jett.png')
+    ascent = Map.objects.create(name='Ascent', icon_url='/static/profiles/images/maps/Ascent.png')
+    team = Team.objects.create(name='House of Tyloo')
+
+    profile = Profile.objects.create(in_game_name='Tyloo', riot_id='Tyloo', riot_tag='#NA1', team=team)
+    profile.agents.set([jett])
+    profile.roles.set([duelist])
+    profile.maps.set([ascent])
+    Profile.objects.create(in_game_name='Mate', riot_id='Mate', riot_tag='#NA2', team=team)
+    return profile
+
+
+def _decode(png):
+    return Image.open(io.BytesIO(png)).convert('RGB')
+
+
+@override_settings(CARD_RENDER_BACKEND=BACKEND_PILLOW, CARD_CACHE_ALIAS='default')
+class PillowCardDownloadTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_download_serves_pillow_png(self):
+        profile = _make_profile()
+
+        response = self.client.get(reverse('card_download', args=[profile.id]))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'image/png')
+        self.assertIn(f'playercard_{profile.id}.png', response['Content-Disposition'])
+        self.assertEqual(_decode(response.content).size, (CARD_W, CARD_H))
+
+    @override_settings(CARD_RENDER_BACKEND='imagemagick')
+    def test_unknown_backend_returns_error(self):
+        profile = _make_profile()
+
+        with self.assertLogs('profiles.views', 'ERROR'):
+            response = self.client.get(reverse('card_download', args=[profile.id]))
+
+        self.assertEqual(response.status_code, 500)
+
+    def test_download_webp(self):
+        profile = _make_profile()
+
+        response = self.client.get(reverse('card_download', args=[profile.id]), {'format': 'webp'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'image/webp')
+        self.assertEqual(Image.open(io.BytesIO(response.content)).format, 'WEBP')
+
+
+@override_settings(CARD_RENDER_BACKEND=BACKEND_PILLOW, CARD_CACHE_ALIAS='default')
+class CardCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.profile = _make_profile()
+        self.url = reverse('card_download', args=[self.profile.id])
+
+    def test_repeat_download_is_served_from_cache(self):
+        first = self.client.get(self.url)
+
+        with patch('profiles.views.render_card') as render:
+            second = self.client.get(self.url)
+
+        render.assert_not_called()
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second['ETag'], first['ETag'])
+
+    def test_matching_etag_returns_304(self):
+        first = self.client.get(self.url)
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=first['ETag'])
+
+        self.assertEqual(response.status_code, 304)
+
+    def test_profile_and_selection_changes_change_etag(self):
+        etag = self.client.get(self.url)['ETag']
+
+        self.profile.maps.clear()
+        after_m2m = self.client.get(self.url)['ETag']
+        self.assertNotEqual(after_m2m, etag)
+
+        self.profile.bio = 'new bio'
+        self.profile.save()
+        self.assertNotEqual(self.client.get(self.url)['ETag'], after_m2m)
+
+    def test_teammate_and_catalog_changes_change_etag(self):
+        etag = self.client.get(self.url)['ETag']
+
+        Profile.objects.filter(team=self.profile.team).exclude(id=self.profile.id).get().delete()
+        after_teammate = self.client.get(self.url)['ETag']
+        self.assertNotEqual(after_teammate, etag)
+
+        jett = Agent.objects.get(name='Jett')
+        jett.icon_url = '/static/profiles/images/agents/Neon.png'
+        jett.save()
+        self.assertNotEqual(self.client.get(self.url)['ETag'], after_teammate)
+
+
+@skipUnless(HAS_PLAYWRIGHT, 'playwright is not installed')
+class CardBackendParityTests(StaticLiveServerTestCase):
+    def test_pillow_matches_playwright_within_tolerance(self):
+        profile = _make_profile()
+        teammates = Profile.objects.filter(team=profile.team).exclude(id=profile.id)
+
+        with override_settings(CARD_RENDER_BASE_URL=self.live_server_url):
+            reference = _decode(render_card_png(profile, teammates, backend=BACKEND_PLAYWRIGHT))
+        candidate = _decode(render_card_png(profile, teammates, backend=BACKEND_PILLOW))
+
+        self.assertEqual(reference.size, candidate.size)
+        diff = ImageStat.Stat(ImageChops.difference(reference, candidate))
+        for channel_mean in diff.mean:
+            self.assertLessEqual(channel_mean, PARITY_MEAN_TOLERANCE)
@@ -0,0 +1,121 @@
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from profiles.catalog import (
+    VERSION_KEY,
+    AgentRecord,
+    bump_catalog_version,
+    get_catalog,
+    profile_selections,
+)
+from profiles.models import Agent, Map, Profile, Role, Team
+
+
+@override_settings(CATALOG_VERSION_CHECK_INTERVAL=0)
+class CatalogIconRegistryTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        bump_catalog_version()
+        self.role = Role.objects.create(
+            name='Duelist', icon='roles/duelist.png', icon_url='/static/profiles/images/roles/Duelist.png',
+        )
+
+    def test_icon_is_resolved_once(self):
+        with patch('profiles.catalog.os.path.exists', return_value=True) as exists:
+            urls = {Role.objects.get(pk=self.role.pk).get_icon_url() for _ in range(5)}
+
+        self.assertEqual(urls, {'/media/roles/duelist.png'})
+        exists.assert_called_once()
+
+    def test_missing_upload_falls_back_to_icon_url(self):
+        self.assertEqual(self.role.get_icon_url(), '/static/profiles/images/roles/Duelist.png')
+
+    def test_admin_edit_is_picked_up(self):
+        with patch('profiles.catalog.os.path.exists', return_value=True):
+            self.assertEqual(self.role.get_icon_url(), '/media/roles/duelist.png')
+
+        self.role.icon = None
+        self.role.save()
+
+        self.assertEqual(self.role.get_icon_url(), '/static/profiles/images/roles/Duelist.png')
+
+    def test_version_bump_from_another_process_clears_registry(self):
+        with patch('profiles.catalog.os.path.exists', return_value=True):
+            self.role.get_icon_url()
+        # The upload disappears and another process bumps the shared version
+        cache.set(VERSION_KEY, 1, None)
+
+        with patch('profiles.catalog.os.path.exists', return_value=False):
+            self.assertEqual(self.role.get_icon_url(), '/static/profiles/images/roles/Duelist.png')
+
+    def test_all_catalog_models_share_the_implementation(self):
+        jett = Agent.objects.create(name='Jett', role=self.role, icon_url='/a.png')
+        ascent = Map.objects.create(name='Ascent', icon_url='/m.png')
+        team = Team.objects.create(name='House of Tyloo', icon_url='/t.png')
+
+        self.assertEqual([jett.get_icon_url(), ascent.get_icon_url(), team.get_icon_url()],
+                         ['/a.png', '/m.png', '/t.png'])
+
+
+def _catalog_queries(queries):
+    tables = ('profiles_agent', 'profiles_role', 'profiles_team', 'profiles_map')
+    return [q['sql'] for q in queries if any(f'FROM "{t}"' in q['sql'] for t in tables)]
+
+
+@override_settings(CATALOG_VERSION_CHECK_INTERVAL=0)
+class CatalogSnapshotTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.duelist = Role.objects.create(name='Duelist', icon_url='/r.png')
+        self.jett = Agent.objects.create(name='Jett', role=self.duelist, icon_url='/a.png')
+        self.team = Team.objects.create(name='House of Tyloo', icon_url='/t.png')
+        self.ascent = Map.objects.create(name='Ascent', icon_url='/m.png')
+
+    def test_snapshot_records_mirror_the_catalog(self):
+        catalog = get_catalog()
+
+        agent = catalog.get('agents', self.jett.pk)
+        self.assertEqual((agent.name, agent.get_icon_url(), agent.role.name), ('Jett', '/a.png', 'Duelist'))
+        self.assertEqual([t.name for t in catalog.teams], ['House of Tyloo'])
+        self.assertIs(get_catalog(), catalog)
+
+    def test_catalog_edit_rebuilds_snapshot(self):
+        before = get_catalog()
+
+        Map.objects.create(name='Bind', icon_url='/b.png')
+
+        after = get_catalog()
+        self.assertIsNot(after, before)
+        self.assertEqual([m.name for m in after.maps], ['Ascent', 'Bind'])
+
+    def test_profile_form_renders_without_catalog_queries(self):
+        user = User.objects.create_user(username='captain', password='StrongPass123!')
+        self.client.force_login(user)
+        get_catalog()
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('input_profile'))
+
+        self.assertContains(response, 'House of Tyloo')
+        self.assertEqual(_catalog_queries(ctx.captured_queries), [])
+
+    def test_profile_selections_use_snapshot_records(self):
+        profile = Profile.objects.create(in_game_name='Tyloo', riot_id='Tyloo', riot_tag='#NA1')
+        profile.agents.set([self.jett])
+        profile.maps.set([self.ascent])
+        get_catalog()
+
+        with CaptureQueriesContext(connection) as ctx:
+            agents, roles, maps = profile_selections(profile)
+            profile_selections(profile)
+
+        self.assertEqual([a.name for a in agents], ['Jett'])
+        self.assertEqual((roles, [m.name for m in maps]), ([], ['Ascent']))
+        self.assertIsInstance(agents[0], AgentRecord)
+        self.assertEqual(len(ctx.captured_queries), 3)
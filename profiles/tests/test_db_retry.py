@@ -0,0 +1,62 @@
+from unittest.mock import patch
+
+from django.db import OperationalError, connection, transaction
+from django.test import TestCase, override_settings
+
+from profiles.utils.db_retry import retry_on_locked
+
+
+class ConnectionPragmaTests(TestCase):
+    def test_init_command_pragmas_are_applied(self):
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA synchronous')
+            self.assertEqual(cursor.fetchone()[0], 1)  # NORMAL
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertGreater(cursor.fetchone()[0], 0)
+
+
+@override_settings(SQLITE_LOCK_RETRIES=3, SQLITE_LOCK_RETRY_DELAY=0)
+class RetryOnLockedTests(TestCase):
+    def _flaky(self, failures, message='database is locked'):
+        calls = []
+
+        @retry_on_locked
+        def write():
+            calls.append(1)
+            if len(calls) <= failures:
+                raise OperationalError(message)
+            return 'ok'
+        return write, calls
+
+    def _outside_atomic(self):
+        # TestCase wraps each test in a transaction; pretend we are its owner
+        return patch.object(connection, 'in_atomic_block', False)
+
+    def test_retries_until_the_lock_is_free(self):
+        write, calls = self._flaky(failures=2)
+
+        with self._outside_atomic(), self.assertLogs('profiles.utils.db_retry', 'INFO'):
+            self.assertEqual(write(), 'ok')
+        self.assertEqual(len(calls), 3)
+
+    def test_gives_up_after_the_configured_attempts(self):
+        write, calls = self._flaky(failures=5)
+
+        with self._outside_atomic(), self.assertLogs('profiles.utils.db_retry', 'INFO'):
+            with self.assertRaises(OperationalError):
+                write()
+        self.assertEqual(len(calls), 3)
+
+    def test_other_errors_are_not_retried(self):
+        write, calls = self._flaky(failures=1, message='no such table: nowhere')
+
+        with self._outside_atomic(), self.assertRaises(OperationalError):
+            write()
+        self.assertEqual(len(calls), 1)
+
+    def test_not_retried_inside_an_enclosing_transaction(self):
+        write, calls = self._flaky(failures=1)
+
+        with transaction.atomic(), self.assertRaises(OperationalError):
+            write()
+        self.assertEqual(len(calls), 1)
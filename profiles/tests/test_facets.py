@@ -0,0 +1,129 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from profiles.catalog import get_catalog
+from profiles.models import Agent, Map, Profile, Role, Team
+from profiles.services.search import rebuild_search_index
+from profiles.utils.ranks import rank_tier
+
+
+class RankTierTests(TestCase):
+    def test_display_strings_map_to_ordinals(self):
+        self.assertEqual(rank_tier('Iron 1'), 1)
+        self.assertEqual(rank_tier('immortal 3'), 8)
+        self.assertEqual(rank_tier('Radiant'), 9)
+        self.assertEqual(rank_tier(''), 0)
+        self.assertEqual(rank_tier('Unrated'), 0)
+
+    def test_saving_a_profile_stores_its_tier(self):
+        profile = Profile.objects.create(in_game_name='A', riot_id='A', riot_tag='#NA1', peak_rank='Gold 2')
+        profile.peak_rank = 'Diamond 1'
+        profile.save(update_fields=['peak_rank'])
+
+        profile.refresh_from_db()
+        self.assertEqual(profile.peak_rank_tier, 6)
+
+
+class FacetedFilterTests(TestCase):
+    def setUp(self):
+        self.team = Team.objects.create(name='House of Tyloo')
+        self.duelist = Role.objects.create(name='Duelist')
+        self.sentinel = Role.objects.create(name='Sentinel')
+        self.jett = Agent.objects.create(name='Jett', role=self.duelist)
+        self.sage = Agent.objects.create(name='Sage', role=self.sentinel)
+        self.ascent = Map.objects.create(name='Ascent')
+        self.bind = Map.objects.create(name='Bind')
+
+        self.ace = self._profile('Ace', 'Immortal 1', self.team, [self.duelist], [self.jett], [self.ascent])
+        self.bee = self._profile('Bee', 'Gold 3', self.team, [self.sentinel], [self.sage], [self.bind])
+        self.cat = self._profile('Cat', 'Diamond 2', None, [self.duelist, self.sentinel],
+                                 [self.jett, self.sage], [self.ascent, self.bind])
+        self.dog = self._profile('Dog', '', None, [self.sentinel], [self.sage], [])
+
+    def _profile(self, name, rank, team, roles, agents, maps):
+        profile = Profile.objects.create(in_game_name=name, riot_id=name, riot_tag='#NA1',
+                                         peak_rank=rank, team=team)
+        profile.roles.set(roles)
+        profile.agents.set(agents)
+        profile.maps.set(maps)
+        return profile
+
+    def _get(self, params):
+        return self.client.get(reverse('profile_list'), params)
+
+    def _names(self, response):
+        return sorted(p.in_game_name for p in response.context['profiles'])
+
+    def _counts(self, chips):
+        return {record.name: count for record, count, _ in chips}
+
+    def test_values_within_a_facet_are_ored(self):
+        response = self._get({'team': ['free_agent', str(self.team.id)], 'map': [self.ascent.id, self.bind.id]})
+
+        self.assertEqual(self._names(response), ['Ace', 'Bee', 'Cat'])
+
+    def test_facets_are_anded(self):
+        response = self._get({'role': self.duelist.id, 'team': 'free_agent'})
+
+        self.assertEqual(self._names(response), ['Cat'])
+
+    def test_rank_range_excludes_unranked(self):
+        response = self._get({'rank_min': 6, 'rank_max': 9})
+        self.assertEqual(self._names(response), ['Ace', 'Cat'])
+
+        response = self._get({'rank_max': 4})
+        self.assertEqual(self._names(response), ['Bee'])
+
+    def test_counts_ignore_their_own_facet_only(self):
+        response = self._get({'role': self.duelist.id})
+
+        # Role counts are unaffected by the role selection ...
+        self.assertEqual(self._counts(response.context['role_chips']), {'Duelist': 2, 'Sentinel': 3})
+        # ... while every other facet is narrowed to the duelists (Ace, Cat)
+        self.assertEqual(self._counts(response.context['agent_chips']), {'Jett': 2, 'Sage': 1})
+        self.assertEqual(self._counts(response.context['team_chips']), {'House of Tyloo': 1})
+        self.assertEqual(response.context['free_agent_count'], 1)
+        ranks = {name: count for _, name, count in response.context['rank_options']}
+        self.assertEqual((ranks['Diamond'], ranks['Immortal'], ranks['Gold']), (1, 1, 0))
+
+    def test_counts_come_from_one_query(self):
+        get_catalog()
+        params = {'role': self.duelist.id, 'agent': self.jett.id, 'map': self.ascent.id,
+                  'team': 'free_agent', 'rank_min': 2}
+
+        # One for the page, one for all five facets' counts
+        with self.assertNumQueries(2):
+            self._get(params)
+
+    def test_search_counts_every_match_from_the_fts_subquery(self):
+        Profile.objects.bulk_create(Profile(in_game_name=f'Sage fan {i}', riot_id=f'Fan{i}') for i in range(30))
+        rebuild_search_index()
+        get_catalog()
+
+        with CaptureQueriesContext(connection) as queries, self.settings(PROFILE_LIST_PAGE_SIZE=2):
+            response = self._get({'q': 'sage'})
+
+        self.assertEqual(self._counts(response.context['role_chips']), {'Duelist': 1, 'Sentinel': 3})
+        self.assertEqual(response.context['free_agent_count'], 32)
+        counts_sql = queries[-1]['sql']
+        self.assertIn('UNION ALL', counts_sql)
+        self.assertEqual(counts_sql.count(' MATCH '), 5)  # once per facet, no id lists
+
+    def test_malformed_values_are_ignored(self):
+        too_big = '9' * 23
+        for params in ({'role': '²'}, {'team': '²'}, {'rank_min': '²'}, {'rank_max': '٣'},
+                       {'role': too_big}, {'team': too_big}, {'map': str(2 ** 63)}):
+            with self.subTest(params=params):
+                response = self._get(params)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(self._names(response), ['Ace', 'Bee', 'Cat', 'Dog'])
+
+    def test_selections_carry_into_next_page(self):
+        with self.settings(PROFILE_LIST_PAGE_SIZE=1):
+            response = self._get({'agent': [self.sage.id], 'team': 'free_agent'})
+
+        next_query = response.context['next_page_query']
+        self.assertIn(f'agent={self.sage.id}', next_query)
+        self.assertIn('team=free_agent', next_query)
@@ -0,0 +1,120 @@
+import json
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import OperationalError, connection
+from django.db.models.query import QuerySet
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from profiles.models import Job, Profile
+from profiles.services import jobs
+from profiles.tasks import TRACKER_FETCH
+
+
+@override_settings(JOBS_INPROCESS_WORKERS=0, CARD_CACHE_ALIAS='default', CARD_RENDER_BACKEND='pillow')
+class JobQueueTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='captain', password='StrongPass123!')
+        self.client.force_login(self.user)
+
+    def test_identical_in_flight_jobs_are_deduplicated(self):
+        payload = {'riot_id': 'Tyloo', 'riot_tag': '#NA1'}
+        first = jobs.enqueue(TRACKER_FETCH, payload, dedup_key='tracker:tyloo#na1')
+        second = jobs.enqueue(TRACKER_FETCH, payload, dedup_key='tracker:tyloo#na1')
+
+        self.assertEqual(first.id, second.id)
+        self.assertEqual(Job.objects.count(), 1)
+
+    @patch('profiles.tasks.fetch_tracker_profile')
+    def test_failed_job_reports_user_facing_error(self, mock_fetch):
+        mock_fetch.side_effect = ValueError("Player 'Nobody#NA1' was not found on tracker.gg.")
+        job = jobs.enqueue(TRACKER_FETCH, {'riot_id': 'Nobody', 'riot_tag': '#NA1'})
+
+        self.assertEqual(jobs.run_pending(), 1)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.STATUS_FAILED)
+        self.assertIn('was not found', job.error)
+
+    @patch('profiles.tasks.fetch_tracker_profile')
+    def test_async_tracker_fetch_is_polled_to_completion(self, mock_fetch):
+        mock_fetch.return_value = {'peak_rank': 'Gold 2', 'peak_rank_icon': 'https://example.com/gold.png'}
+
+        response = self.client.post(
+            reverse('fetch_tracker_stats'),
+            data=json.dumps({'riot_id': 'Tyloo', 'riot_tag': '#NA1', 'async': True}),
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 202)
+        status_url = response.json()['status_url']
+        self.assertEqual(self.client.get(status_url).json()['job']['status'], 'queued')
+
+        jobs.run_pending()
+
+        body = self.client.get(status_url).json()
+        self.assertEqual(body['job']['status'], 'done')
+        self.assertEqual(body['job']['result']['peak_rank'], 'Gold 2')
+        self.assertEqual(self.client.session['tracker_autofill_profile']['peak_rank'], 'Gold 2')
+
+    @override_settings(SQLITE_LOCK_RETRIES=3, SQLITE_LOCK_RETRY_DELAY=0)
+    @patch('profiles.tasks.fetch_tracker_profile')
+    def test_outcome_is_saved_after_a_locked_database(self, mock_fetch):
+        mock_fetch.return_value = {'peak_rank': 'Gold 2'}
+        jobs.enqueue(TRACKER_FETCH, {'riot_id': 'Tyloo', 'riot_tag': '#NA1'})
+        job = jobs.claim_next()
+        original_update = QuerySet.update
+        calls = []
+
+        def update(queryset, **kwargs):
+            calls.append(kwargs)
+            if len(calls) == 1:
+                raise OperationalError('database is locked')
+            return original_update(queryset, **kwargs)
+
+        # TestCase wraps each test in a transaction; pretend we are its owner
+        with patch.object(QuerySet, 'update', update), patch.object(connection, 'in_atomic_block', False), \
+                self.assertLogs('profiles.utils.db_retry', 'INFO'):
+            jobs.run_job(job)
+
+        job.refresh_from_db()
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(job.status, Job.STATUS_DONE)
+        self.assertEqual(job.result, {'peak_rank': 'Gold 2'})
+
+    def test_jobs_are_private_to_their_owner(self):
+        job = jobs.enqueue(TRACKER_FETCH, {'riot_id': 'Tyloo', 'riot_tag': '#NA1'}, user=self.user)
+        other = User.objects.create_user(username='other', password='StrongPass123!')
+        self.client.force_login(other)
+
+        response = self.client.get(reverse('job_status', args=[job.id]))
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_same_lookup_by_another_user_gets_its_own_job(self):
+        body = json.dumps({'riot_id': 'Tyloo', 'riot_tag': '#NA1', 'async': True})
+        first = self.client.post(reverse('fetch_tracker_stats'), data=body, content_type='application/json')
+        self.client.force_login(User.objects.create_user(username='other', password='StrongPass123!'))
+        second = self.client.post(reverse('fetch_tracker_stats'), data=body, content_type='application/json')
+
+        self.assertNotEqual(first.json()['job']['id'], second.json()['job']['id'])
+        self.assertEqual(self.client.get(second.json()['status_url']).status_code, 200)
+
+    def test_async_card_download_renders_into_cache(self):
+        profile = Profile.objects.create(in_game_name='Tyloo', riot_id='Tyloo', riot_tag='#NA1')
+        url = reverse('card_download', args=[profile.id])
+
+        queued = self.client.get(url, {'async': '1'})
+        self.assertEqual(queued.status_code, 202)
+
+        jobs.run_pending()
+
+        done = self.client.get(queued.json()['status_url']).json()['job']
+        self.assertEqual(done['status'], 'done')
+        with patch('profiles.views.render_card') as render:
+            download = self.client.get(done['result']['download_url'])
+        render.assert_not_called()
+        self.assertEqual(download['Content-Type'], 'image/png')
+        self.assertEqual(self.client.get(url, {'async': '1'}).json()['job']['status'], 'done')
@@ -0,0 +1,109 @@
+import io
+import shutil
+import tempfile
+from unittest.mock import patch
+
+from PIL import Image
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+
+from profiles.models import Profile
+from profiles.utils import card_image
+from profiles.utils.card_image import GLITCH_OFFSET, PFP_DIAMETER
+from profiles.utils.pfp_derivatives import LIST_THUMB_SIZE, TEAMMATE_THUMB_D
+
+
+def _upload(name='avatar.png', size=(800, 600)):
+    buffer = io.BytesIO()
+    Image.new('RGB', size, 'red').save(buffer, format='PNG')
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/png')
+
+
+class ProfilePictureDerivativeTests(TestCase):
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=media, CARD_CACHE_ALIAS='default')
+        override.enable()
+        self.addCleanup(override.disable)
+        cache.clear()
+
+    def _save(self, profile=None, **fields):
+        # Derivatives are built once the saving transaction commits
+        with self.captureOnCommitCallbacks(execute=True):
+            if profile is None:
+                profile = Profile.objects.create(**fields)
+            else:
+                profile.save()
+        profile.refresh_from_db()
+        return profile
+
+    def _open(self, field):
+        with field.open('rb') as fh:
+            return Image.open(io.BytesIO(fh.read()))
+
+    def test_upload_generates_card_thumb_and_list_derivatives(self):
+        profile = self._save(in_game_name='Tyloo', riot_id='Tyloo', profile_picture=_upload())
+
+        self.assertEqual(self._open(profile.pfp_card).size, (PFP_DIAMETER + 2 * GLITCH_OFFSET, PFP_DIAMETER))
+        self.assertEqual(self._open(profile.pfp_thumb).size, (TEAMMATE_THUMB_D, TEAMMATE_THUMB_D))
+        list_thumb = self._open(profile.pfp_list)
+        self.assertEqual(list_thumb.format, 'WEBP')
+        self.assertEqual(list_thumb.size, (LIST_THUMB_SIZE, LIST_THUMB_SIZE))
+        self.assertEqual(profile.get_list_thumb_url(), profile.pfp_list.url)
+
+    def test_unrelated_save_does_not_regenerate(self):
+        profile = self._save(in_game_name='Tyloo', riot_id='Tyloo', profile_picture=_upload())
+        card_name = profile.pfp_card.name
+
+        profile.bio = 'changed'
+        profile = self._save(profile)
+
+        self.assertEqual(profile.pfp_card.name, card_name)
+
+    def test_removing_picture_clears_derivatives(self):
+        profile = self._save(in_game_name='Tyloo', riot_id='Tyloo', profile_picture=_upload())
+
+        profile.profile_picture = None
+        profile = self._save(profile)
+
+        self.assertFalse(profile.pfp_card)
+        self.assertEqual(profile.pfp_source, '')
+        self.assertEqual(profile.get_teammate_thumb_url(), '')
+
+    def test_derivative_of_another_picture_is_not_served(self):
+        profile = self._save(in_game_name='Tyloo', riot_id='Tyloo', profile_picture=_upload())
+
+        profile.profile_picture = None
+        profile.profile_picture_url = 'https://example.com/new.png'
+
+        self.assertEqual(profile.get_card_pfp_url(), 'https://example.com/new.png')
+
+    @patch('profiles.utils.pfp_derivatives._load_image_from_url_or_path')
+    def test_card_uses_only_a_current_derivative(self, load):
+        load.return_value = Image.new('RGB', (400, 400), 'blue')
+        profile = self._save(in_game_name='Tyloo', riot_id='Tyloo', profile_picture_url='https://example.com/old.png')
+        mate = self._save(in_game_name='Mate', riot_id='Mate', profile_picture_url='https://example.com/mate.png')
+
+        # A current derivative is drawn instead of the original, so the original is not prefetched
+        self.assertEqual(card_image._remote_urls(profile, [mate]), [])
+
+        profile.profile_picture_url = 'https://example.com/new.png'  # rebuild not run yet
+        self.assertEqual(card_image._remote_urls(profile, [mate]), ['https://example.com/new.png'])
+        base = Image.new('RGBA', (1600, 900))
+        with patch.object(card_image, '_open_field_image') as open_field, \
+                patch.object(card_image, '_fetch_url', return_value=None) as fetch:
+            card_image._draw_pfp(base, profile)
+        open_field.assert_not_called()
+        fetch.assert_called_once_with('https://example.com/new.png')
+
+    @patch('profiles.utils.pfp_derivatives._load_image_from_url_or_path', return_value=None)
+    def test_unloadable_picture_is_not_refetched_on_every_save(self, load):
+        profile = self._save(in_game_name='Tyloo', riot_id='Tyloo', profile_picture_url='https://example.com/gone.png')
+        profile.bio = 'changed'
+        profile = self._save(profile)
+
+        load.assert_called_once()
+        self.assertEqual(profile.pfp_source, '')
+        self.assertEqual(profile.get_card_pfp_url(), 'https://example.com/gone.png')
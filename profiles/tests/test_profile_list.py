@@ -0,0 +1,71 @@
+import base64
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from profiles.catalog import get_catalog
+from profiles.models import Profile, Role, Team
+
+
+@override_settings(PROFILE_LIST_PAGE_SIZE=3)
+class ProfileListPaginationTests(TestCase):
+    def setUp(self):
+        self.team = Team.objects.create(name='House of Tyloo')
+        self.duelist = Role.objects.create(name='Duelist')
+        self.sentinel = Role.objects.create(name='Sentinel')
+        for i in range(7):
+            profile = Profile.objects.create(
+                in_game_name=f'Player{i}', riot_id=f'Player{i}', riot_tag='#NA1',
+                team=self.team if i % 2 == 0 else None,
+            )
+            profile.roles.set([self.duelist, self.sentinel])
+        # Identical timestamps must still page deterministically via the id tiebreak
+        first = Profile.objects.order_by('pk').first()
+        Profile.objects.update(created_at=first.created_at)
+
+    def _walk(self, params=None):
+        url = reverse('profile_list')
+        query = params or {}
+        names = []
+        while True:
+            response = self.client.get(url, query)
+            names.extend(p.in_game_name for p in response.context['profiles'])
+            next_query = response.context['next_page_query']
+            if not next_query:
+                return names
+            url = f"{reverse('profile_list')}?{next_query}"
+            query = {}
+
+    def test_pages_cover_every_profile_once(self):
+        names = self._walk()
+
+        self.assertEqual(len(names), 7)
+        self.assertEqual(len(set(names)), 7)
+
+    def test_filters_carry_across_pages_without_duplicates(self):
+        names = self._walk({'role': self.duelist.id, 'team': self.team.id})
+
+        self.assertEqual(sorted(names), ['Player0', 'Player2', 'Player4', 'Player6'])
+
+    def test_query_count_does_not_grow_with_rows(self):
+        get_catalog()  # the worker's catalog snapshot supplies the filter chips
+
+        # One for the page, one for every facet count
+        with self.assertNumQueries(2):
+            self.client.get(reverse('profile_list'))
+
+    def test_bad_cursor_and_filters_fall_back_to_first_page(self):
+        response = self.client.get(reverse('profile_list'), {'cursor': 'not-a-cursor', 'team': 'abc'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['profiles']), 3)
+
+    def test_out_of_range_cursor_id_falls_back_to_first_page(self):
+        created_at = Profile.objects.first().created_at.isoformat()
+        for pk in ('9' * 30, str(2 ** 63), '0'):
+            with self.subTest(pk=pk):
+                cursor = base64.urlsafe_b64encode(f'{created_at}|{pk}'.encode()).decode().rstrip('=')
+                response = self.client.get(reverse('profile_list'), {'cursor': cursor})
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual([p.in_game_name for p in response.context['profiles']],
+                                 ['Player6', 'Player5', 'Player4'])
@@ -0,0 +1,83 @@
+import re
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from profiles.catalog import get_catalog
+from profiles.models import Agent, Map, Profile, Role, Team
+
+# "SCAN <table>" with no "USING ..." is a full table scan
+FULL_SCAN = re.compile(r'^SCAN (\w+)$')
+PROFILE_TABLES = re.compile(r'\bprofiles_profile\w*')
+
+
+@skipUnless(connection.vendor == 'sqlite', 'EXPLAIN QUERY PLAN output is SQLite-specific')
+class QueryPlanTests(TestCase):
+    """Every profile query behind the roster and profile pages must use an index."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.team = Team.objects.create(name='House of Tyloo')
+        cls.duelist = Role.objects.create(name='Duelist')
+        cls.jett = Agent.objects.create(name='Jett', role=cls.duelist)
+        cls.ascent = Map.objects.create(name='Ascent')
+        for i in range(12):
+            profile = Profile.objects.create(
+                in_game_name=f'Player{i}', riot_id=f'Player{i}', riot_tag='#NA1',
+                team=cls.team if i % 2 else None, peak_rank='Gold 1',
+            )
+            profile.roles.set([cls.duelist])
+            profile.agents.set([cls.jett])
+            profile.maps.set([cls.ascent])
+        cls.profile = profile
+
+    def setUp(self):
+        get_catalog()
+
+    def _plans(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+
+        plans = []
+        for query in ctx.captured_queries:
+            sql = query['sql']
+            if not sql.startswith('SELECT') or not PROFILE_TABLES.search(sql):
+                continue
+            with connection.cursor() as cursor:
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+                plans.append((sql, [row[-1] for row in cursor.fetchall()]))
+        return plans
+
+    def assertNoFullScans(self, url):
+        for sql, plan in self._plans(url):
+            for step in plan:
+                self.assertIsNone(FULL_SCAN.match(step), f'full scan for {url}:\n{sql}\n' + '\n'.join(plan))
+
+    def test_roster_pages(self):
+        roster = reverse('profile_list')
+        for query in (
+            '',
+            f'team={self.team.id}',
+            'team=free_agent',
+            f'role={self.duelist.id}&agent={self.jett.id}&map={self.ascent.id}',
+            'rank_min=3&rank_max=6',
+            'q=player',
+            f'q=player&team={self.team.id}&agent={self.jett.id}',
+        ):
+            with self.subTest(query=query):
+                self.assertNoFullScans(f'{roster}?{query}')
+
+    def test_roster_page_is_read_in_index_order(self):
+        for query in ('', f'team={self.team.id}', 'team=free_agent'):
+            with self.subTest(query=query):
+                _, plan = self._plans(f"{reverse('profile_list')}?{query}")[0]
+                self.assertNotIn('USE TEMP B-TREE FOR ORDER BY', plan)
+
+    def test_profile_and_card_pages(self):
+        for name in ('display_profile', 'card_profile'):
+            with self.subTest(view=name):
+                self.assertNoFullScans(reverse(name, args=[self.profile.id]))
@@ -0,0 +1,138 @@
+import json
+import tempfile
+import time
+from datetime import timedelta
+from io import StringIO
+from pathlib import Path
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from profiles.models import Profile, TrackerSnapshot
+from profiles.services import tracker_api
+from profiles.services.tracker_api import TrackerNotFound, TrackerRateLimited
+from profiles.utils.ranks import rank_tier
+from profiles.utils import tracker_views
+
+
+def _views(handle, peak_rank):
+    return tracker_views.parse_views({'data': {
+        'platformInfo': {'platformUserHandle': handle, 'avatarUrl': ''},
+        'metadata': {'activeShard': 'na'},
+        'segments': [{
+            'type': 'peak-rating',
+            'attributes': {'playlist': 'competitive'},
+            'metadata': {},
+            'stats': {'peakRating': {'displayValue': peak_rank, 'metadata': {'iconUrl': 'peak.png'}}},
+        }],
+    }})
+
+
+@override_settings(TRACKER_CACHE_ALIAS='default', TRACKER_SNAPSHOT_FRESH_SECONDS=3600, TRACKER_UPSTREAM_RPM=600)
+class RefreshTrackerRanksTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.checkpoint = Path(tmp.name) / 'checkpoint.json'
+
+        self.players = {}
+        for name in ('Alpha', 'Bravo', 'Charlie'):
+            user = User.objects.create_user(username=name.lower(), password='StrongPass123!')
+            self.players[name] = Profile.objects.create(
+                in_game_name=name, riot_id=name, riot_tag='#NA1', user=user, peak_rank='Gold 1',
+            )
+        Profile.objects.create(in_game_name='Unclaimed', riot_id='Unclaimed', riot_tag='#NA1')
+        Profile.objects.create(in_game_name='NoRiotId', user=User.objects.create_user(username='noid'))
+
+    def _run(self, *args):
+        out = StringIO()
+        call_command('refresh_tracker_ranks', '--checkpoint', str(self.checkpoint), '--backoff', '0.01',
+                     *args, stdout=out, stderr=StringIO())
+        return out.getvalue()
+
+    def _upstream(self, ranks, calls=None):
+        def fetch(riot_id, riot_tag):
+            if calls is not None:
+                calls.append(riot_id)
+            rank = ranks[riot_id]
+            if isinstance(rank, Exception):
+                raise rank
+            return _views(f'{riot_id}{riot_tag}', rank)
+        return patch.object(tracker_api, '_fetch_upstream', side_effect=fetch)
+
+    def test_updates_peak_ranks_and_derived_tier(self):
+        ranks = {'Alpha': 'Immortal 2', 'Bravo': 'Gold 1', 'Charlie': TrackerNotFound('gone')}
+        with self._upstream(ranks) as upstream:
+            out = self._run('--workers', '2')
+
+        self.assertEqual(upstream.call_count, 3)  # only claimed profiles with a Riot ID
+        alpha = Profile.objects.get(pk=self.players['Alpha'].pk)
+        self.assertEqual((alpha.peak_rank, alpha.peak_rank_icon, alpha.peak_rank_tier), ('Immortal 2', 'peak.png', rank_tier('Immortal 2')))
+        self.assertEqual(Profile.objects.get(pk=self.players['Bravo'].pk).peak_rank_icon, 'peak.png')
+        self.assertEqual(TrackerSnapshot.objects.count(), 2)
+        self.assertIn('2 peak rank(s) updated', out)
+        self.assertIn('1 not found', out)
+        self.assertFalse(self.checkpoint.exists())
+
+    def test_oldest_snapshot_first_and_fresh_ones_skipped(self):
+        now = timezone.now()
+        TrackerSnapshot.objects.create(profile=self.players['Alpha'], fetched_at=now - timedelta(days=2),
+                                       data=_views('Alpha#NA1', 'Gold 1'))
+        TrackerSnapshot.objects.create(profile=self.players['Charlie'], fetched_at=now - timedelta(minutes=5),
+                                       data=_views('Charlie#NA1', 'Gold 1'))
+        calls = []
+        with self._upstream({'Alpha': 'Gold 2', 'Bravo': 'Gold 3'}, calls):
+            self._run('--workers', '1')
+
+        self.assertEqual(calls, ['Bravo', 'Alpha'])  # never fetched, then oldest; Charlie is fresh
+
+    def test_backs_off_on_429_and_retries(self):
+        responses = {'Alpha': [TrackerRateLimited('Rate limited', retry_after=0), 'Silver 2']}
+
+        def fetch(riot_id, riot_tag):
+            queue = responses.get(riot_id, ['Gold 1'])
+            result = queue.pop(0) if len(queue) > 1 else queue[0]
+            if isinstance(result, Exception):
+                raise result
+            return _views(f'{riot_id}{riot_tag}', result)
+
+        with patch.object(tracker_api, '_fetch_upstream', side_effect=fetch):
+            out = self._run('--workers', '1')
+
+        self.assertEqual(Profile.objects.get(pk=self.players['Alpha'].pk).peak_rank, 'Silver 2')
+        self.assertIn('1 rate-limit backoff(s)', out)
+
+    def test_stale_cache_entry_is_refetched_in_the_budget(self):
+        cache.set(tracker_api.tracker_cache_key('Alpha', '#NA1'),
+                  {'data': _views('Alpha#NA1', 'Gold 1'), 'fetched_at': time.time() - 1200}, 3600)
+        calls = []
+        with self._upstream({'Alpha': 'Diamond 1', 'Bravo': 'Gold 2', 'Charlie': 'Gold 3'}, calls), \
+                patch.object(tracker_api, '_revalidate_in_background') as revalidate:
+            self._run()
+
+        revalidate.assert_not_called()
+        self.assertIn('Alpha', calls)
+        self.assertEqual(Profile.objects.get(pk=self.players['Alpha'].pk).peak_rank, 'Diamond 1')
+
+    def test_resumes_from_checkpoint(self):
+        self.checkpoint.write_text(json.dumps({'done': [self.players['Alpha'].pk]}))
+        calls = []
+        with self._upstream({'Bravo': 'Gold 2', 'Charlie': 'Gold 3'}, calls):
+            out = self._run()
+
+        self.assertEqual(sorted(calls), ['Bravo', 'Charlie'])
+        self.assertIn('Resuming: 1 profile(s)', out)
+
+    def test_dry_run_makes_no_requests_or_writes(self):
+        with self._upstream({}) as upstream:
+            out = self._run('--dry-run')
+
+        upstream.assert_not_called()
+        self.assertIn('Dry run: 3 profile(s) to refresh', out)
+        self.assertFalse(TrackerSnapshot.objects.exists())
+        self.assertFalse(self.checkpoint.exists())
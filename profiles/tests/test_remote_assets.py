@@ -0,0 +1,129 @@
+import io
+import os
+import tempfile
+import threading
+import time
+from unittest.mock import patch
+
+from PIL import Image
+from django.test import SimpleTestCase, override_settings
+
+from profiles.utils import remote_assets
+
+
+def _png_bytes():
+    buffer = io.BytesIO()
+    Image.new('RGB', (4, 4), 'red').save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+class _FakeResponse:
+    def __init__(self, status=200, body=b'', headers=None, delay=0):
+        self.status_code = status
+        self.body = body
+        self.headers = headers or {}
+        self.delay = delay
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise OSError(f'HTTP {self.status_code}')
+
+    def iter_content(self, chunk_size):
+        if self.delay:
+            time.sleep(self.delay)
+        for idx in range(0, len(self.body), chunk_size):
+            yield self.body[idx: idx + chunk_size]
+
+
+class _FakeSession:
+    def __init__(self, responses):
+        self.responses = responses
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def get(self, url, headers=None, timeout=None, stream=False):
+        with self.lock:
+            self.calls.append((url, dict(headers or {})))
+        response = self.responses[url]
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+class FetchRemoteAssetsTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        override = override_settings(CARD_REMOTE_CACHE_DIR=tmp.name, CARD_REMOTE_FRESH_SECONDS=0)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def _fetch(self, responses, urls, **kwargs):
+        session = _FakeSession(responses)
+        with patch.object(remote_assets, '_get_session', return_value=session):
+            return remote_assets.fetch_remote_assets(urls, **kwargs), session
+
+    def test_fetches_concurrently_and_drops_slow_urls_at_deadline(self):
+        png = _png_bytes()
+        responses = {
+            'https://cdn/fast.png': _FakeResponse(body=png),
+            'https://cdn/slow.png': _FakeResponse(body=png, delay=2),
+        }
+
+        start = time.monotonic()
+        results, _ = self._fetch(responses, list(responses), deadline=0.5)
+
+        self.assertLess(time.monotonic() - start, 1.5)
+        self.assertEqual(results['https://cdn/fast.png'].read_bytes(), png)
+        self.assertIsNone(results['https://cdn/slow.png'])
+
+    def test_oversized_body_is_rejected(self):
+        with override_settings(CARD_REMOTE_MAX_BYTES=10):
+            results, _ = self._fetch({'https://cdn/big.png': _FakeResponse(body=_png_bytes())},
+                                     ['https://cdn/big.png'])
+
+        self.assertIsNone(results['https://cdn/big.png'])
+
+    def test_revalidates_with_etag_and_keeps_stale_copy_on_failure(self):
+        url = 'https://cdn/avatar.png'
+        png = _png_bytes()
+        self._fetch({url: _FakeResponse(body=png, headers={'ETag': '"v1"'})}, [url])
+
+        results, session = self._fetch({url: _FakeResponse(status=304)}, [url])
+        self.assertEqual(session.calls[0][1].get('If-None-Match'), '"v1"')
+        self.assertEqual(results[url].read_bytes(), png)
+
+        results, _ = self._fetch({url: ConnectionError('down')}, [url])
+        self.assertEqual(results[url].read_bytes(), png)
+
+    def test_fresh_copy_skips_the_network(self):
+        url = 'https://cdn/avatar.png'
+        self._fetch({url: _FakeResponse(body=_png_bytes())}, [url])
+
+        with override_settings(CARD_REMOTE_FRESH_SECONDS=3600):
+            results, session = self._fetch({}, [url])
+
+        self.assertEqual(session.calls, [])
+        self.assertIsNotNone(results[url])
+
+    def test_least_recently_used_originals_are_pruned_past_the_cap(self):
+        urls = [f'https://cdn/{name}.png' for name in 'abcd']
+        responses = {url: _FakeResponse(body=_png_bytes()) for url in urls}
+        with override_settings(CARD_REMOTE_CACHE_MAX_ENTRIES=3):
+            paths = {url: self._fetch(responses, [url])[0][url] for url in urls[:3]}
+            for age, url in enumerate(urls[:3]):
+                os.utime(paths[url].with_suffix('.json'), (1000 + age, 1000 + age))
+
+            with override_settings(CARD_REMOTE_FRESH_SECONDS=3600):
+                self._fetch({}, [urls[0]])  # a hit counts as a use
+            paths[urls[3]] = self._fetch(responses, [urls[3]])[0][urls[3]]
+
+        kept = sorted(url for url, path in paths.items() if path.exists())
+        self.assertEqual(kept, [urls[0], urls[3]])
+        self.assertFalse(paths[urls[1]].with_suffix('.json').exists())
@@ -0,0 +1,98 @@
+from django.contrib.auth.models import User
+from django.db import IntegrityError, transaction
+from django.test import TestCase
+from django.urls import reverse
+
+from profiles.forms import ProfileForm
+from profiles.models import Profile, UserProfile
+
+
+class NormalizedRiotIdTests(TestCase):
+    def setUp(self):
+        self.profile = Profile.objects.create(in_game_name=' Tyloo ', riot_id='Tyloo', riot_tag='#NA1')
+
+    def _form(self, **data):
+        return ProfileForm(data={'in_game_name': 'Fresh', 'riot_id': 'Fresh', 'riot_tag': '#EU1', 'bio': '', **data})
+
+    def test_save_maintains_normalized_columns(self):
+        self.assertEqual(
+            (self.profile.in_game_name_norm, self.profile.riot_id_norm, self.profile.riot_tag_norm),
+            ('tyloo', 'tyloo', 'na1'),
+        )
+
+        self.profile.riot_tag = '#EUW'
+        self.profile.save(update_fields=['riot_tag'])
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.riot_tag_norm, 'euw')
+
+    def test_form_rejects_case_and_whitespace_variants(self):
+        form = self._form(in_game_name='TYLOO')
+        self.assertFalse(form.is_valid())
+        self.assertIn('in_game_name', form.errors)
+
+        form = self._form(riot_id=' tyloo', riot_tag='#na1')
+        self.assertFalse(form.is_valid())
+        self.assertIn('riot_id', form.errors)
+
+        self.assertTrue(self._form(riot_id='tyloo', riot_tag='#NA2').is_valid())
+
+    def test_editing_keeps_own_name(self):
+        form = ProfileForm(
+            data={'in_game_name': 'Tyloo', 'riot_id': 'Tyloo', 'riot_tag': '#NA1', 'bio': 'hi'},
+            instance=self.profile,
+        )
+        self.assertTrue(form.is_valid(), form.errors)
+
+    def test_database_enforces_uniqueness(self):
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Profile.objects.create(in_game_name='tyloo', riot_id='Other', riot_tag='#NA1')
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Profile.objects.create(in_game_name='Other', riot_id='TYLOO', riot_tag='#na1')
+
+    def test_profiles_without_riot_id_do_not_collide(self):
+        Profile.objects.create(in_game_name='Legacy1', riot_id='')
+        Profile.objects.create(in_game_name='Legacy2', riot_id='')
+
+        self.assertEqual(Profile.objects.filter(riot_id_norm='').count(), 2)
+
+    def test_claim_matches_on_normalized_riot_id(self):
+        user = User.objects.create_user('tyloo', password='pw-for-tests-1')
+        UserProfile.objects.create(user=user, riot_id='TYLOO ', riot_tag='#na1')
+        self.client.force_login(user)
+
+        response = self.client.post(reverse('claim_profile', args=[self.profile.id]))
+
+        self.assertRedirects(response, reverse('display_profile', args=[self.profile.id]),
+                             fetch_redirect_response=False)
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.user, user)
+
+    def test_legacy_duplicates_can_be_saved_unclaimed_and_claimed(self):
+        # As migration 0018 leaves a later duplicate: no stored *_norm values
+        legacy = Profile.objects.create(in_game_name='Legacy', riot_id='Legacy', riot_tag='#EU1')
+        Profile.objects.filter(pk=legacy.pk).update(
+            in_game_name='TYLOO', in_game_name_norm=None, riot_id='tyloo', riot_id_norm=None, riot_tag='#na1',
+        )
+        legacy = Profile.objects.get(pk=legacy.pk)
+
+        legacy.bio = 'still here'
+        legacy.save()
+        legacy.refresh_from_db()
+        self.assertEqual((legacy.in_game_name_norm, legacy.riot_id_norm), (None, None))
+
+        user = User.objects.create_user('tyloo', password='pw-for-tests-1')
+        UserProfile.objects.create(user=user, riot_id='Tyloo', riot_tag='#NA1')
+        self.assertTrue(user.userprofile.matches_profile(legacy))
+        self.client.force_login(user)
+        self.client.post(reverse('claim_profile', args=[legacy.id]))
+        response = self.client.post(reverse('unclaim_profile'))
+
+        self.assertRedirects(response, reverse('display_profile', args=[legacy.id]), fetch_redirect_response=False)
+        legacy.refresh_from_db()
+        self.assertIsNone(legacy.user)
+
+        # Once renamed, the row gets its normalised values back
+        legacy.in_game_name = 'Tyloo Classic'
+        legacy.save()
+        legacy.refresh_from_db()
+        self.assertEqual(legacy.in_game_name_norm, 'tyloo classic')
@@ -0,0 +1,196 @@
+import base64
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from profiles.models import Agent, Map, Profile, Role, Team
+from profiles.services.search import SEARCH_TABLE, build_match_query, rebuild_search_index, search_profiles
+from profiles.services.suggest import bump_suggest_version
+
+
+def _ids(text):
+    return [pk for pk, _ in search_profiles(text)]
+
+
+class ProfileSearchIndexTests(TestCase):
+    def setUp(self):
+        # The index is written once the saving transaction commits
+        with self.captureOnCommitCallbacks(execute=True):
+            self.team = Team.objects.create(name='House of Tyloo')
+            duelist = Role.objects.create(name='Duelist')
+            self.jett = Agent.objects.create(name='Jett', role=duelist)
+            self.ascent = Map.objects.create(name='Ascent')
+            self.tyloo = Profile.objects.create(
+                in_game_name='Tyloo', riot_id='TylooMain', riot_tag='#NA1', team=self.team,
+            )
+            self.fan = Profile.objects.create(
+                in_game_name='Wells', riot_id='Wells', riot_tag='#EU9', bio='Big fan of Tyloo',
+            )
+
+    def test_matches_every_indexed_field_by_prefix(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.tyloo.agents.set([self.jett])
+            self.tyloo.maps.set([self.ascent])
+
+        self.assertEqual(_ids('tyloomai'), [self.tyloo.pk])
+        self.assertEqual(_ids('na1'), [self.tyloo.pk])
+        self.assertEqual(_ids('house'), [self.tyloo.pk])
+        self.assertEqual(_ids('jet asc'), [self.tyloo.pk])
+        self.assertEqual(_ids('big fan'), [self.fan.pk])
+
+    def test_name_matches_rank_above_bio_matches(self):
+        self.assertEqual(_ids('tyloo'), [self.tyloo.pk, self.fan.pk])
+
+    def test_index_follows_relation_changes(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.tyloo.maps.set([self.ascent])
+        self.assertEqual(_ids('ascent'), [self.tyloo.pk])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.ascent.player_profiles.clear()
+        self.assertEqual(_ids('ascent'), [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.team.name = 'Den of Tyloo'
+            self.team.save()
+        self.assertEqual(_ids('den'), [self.tyloo.pk])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.tyloo.delete()
+        self.assertEqual(_ids('den'), [])
+
+    def test_index_waits_for_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.tyloo.in_game_name = 'Renamed'
+            self.tyloo.save()
+            self.assertEqual(_ids('renamed'), [])
+
+        for callback in callbacks:
+            callback()
+        self.assertEqual(_ids('renamed'), [self.tyloo.pk])
+
+    def test_user_input_never_reaches_fts_syntax(self):
+        self.assertEqual(build_match_query('ty" OR *'), '"ty"* "or"*')
+        self.assertEqual(build_match_query('"*'), '')
+        self.assertEqual(search_profiles('NEAR(ty'), [])
+
+    @override_settings(PROFILE_SEARCH_RANK_LIMIT=1)
+    def test_broad_queries_list_newest_first(self):
+        self.assertEqual(_ids('tyloo'), [self.fan.pk, self.tyloo.pk])
+
+    def test_rebuild_command_repopulates_the_index(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {SEARCH_TABLE}')
+        self.assertEqual(_ids('tyloo'), [])
+
+        call_command('rebuild_search_index', stdout=StringIO())
+
+        self.assertEqual(_ids('tyloo'), [self.tyloo.pk, self.fan.pk])
+
+
+@override_settings(PROFILE_LIST_PAGE_SIZE=2)
+class ProfileListSearchTests(TestCase):
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.team = Team.objects.create(name='House of Tyloo')
+            for i in range(5):
+                Profile.objects.create(in_game_name=f'Tyloo{i}', riot_id=f'T{i}', riot_tag='#NA1',
+                                       team=self.team if i % 2 == 0 else None)
+            Profile.objects.create(in_game_name='Other', riot_id='Other', riot_tag='#NA1', bio='tyloo fan')
+
+    def _walk(self, params):
+        names, query = [], params
+        url = reverse('profile_list')
+        while True:
+            response = self.client.get(url, query)
+            names.extend(p.in_game_name for p in response.context['profiles'])
+            if not response.context['next_page_query']:
+                return names
+            url, query = f"{reverse('profile_list')}?{response.context['next_page_query']}", {}
+
+    def test_search_pages_in_rank_order(self):
+        names = self._walk({'q': 'tyloo'})
+
+        self.assertEqual(len(names), 6)
+        self.assertEqual(names[-1], 'Other')
+
+    def test_search_combines_with_filters(self):
+        names = self._walk({'q': 'tyl', 'team': self.team.id})
+
+        self.assertEqual(sorted(names), ['Tyloo0', 'Tyloo2', 'Tyloo4'])
+
+    def test_filtered_search_pages_through_every_match(self):
+        # Newer matches than the team's players, so a newest-first cut before filtering would lose them
+        Profile.objects.bulk_create(Profile(in_game_name=f'Tyloo fan {i}', riot_id=f'Fan{i}') for i in range(30))
+        rebuild_search_index()
+
+        for rank_limit in (10000, 3):  # bm25 ranking, then the newest-first mode for broad queries
+            with self.subTest(rank_limit=rank_limit), override_settings(PROFILE_SEARCH_RANK_LIMIT=rank_limit):
+                names = self._walk({'q': 'tyloo'})
+                self.assertEqual(len(names), 36)
+                self.assertEqual(len(set(names)), 36)
+                self.assertEqual(sorted(self._walk({'q': 'tyloo', 'team': self.team.id})),
+                                 ['Tyloo0', 'Tyloo2', 'Tyloo4'])
+
+
+    def test_bad_cursor_falls_back_to_first_page(self):
+        def names(params):
+            response = self.client.get(reverse('profile_list'), params)
+            self.assertEqual(response.status_code, 200)
+            return [p.in_game_name for p in response.context['profiles']]
+
+        first_page = names({'q': 'tyloo'})
+        for raw in ('0.0|' + '9' * 30, f'0.0|{2 ** 63}', '0.0|0', 'nan|1', 'inf|1', '0.0|x'):
+            with self.subTest(cursor=raw):
+                cursor = base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+                self.assertEqual(names({'q': 'tyloo', 'cursor': cursor}), first_page)
+
+
+class SearchSuggestTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        bump_suggest_version()
+        self.team = Team.objects.create(name='House of Tyloo')
+        self.tyloo = Profile.objects.create(in_game_name='Tyloo', riot_id='Welly', riot_tag='#NA1', team=self.team)
+        Profile.objects.create(in_game_name='Tyler', riot_id='Tyler', riot_tag='#EU9')
+        self.url = reverse('search_suggest')
+
+    def test_prefix_matches_players_riot_ids_and_team_words(self):
+        results = self.client.get(self.url, {'q': 'TYL'}).json()['results']
+
+        self.assertEqual(
+            [(r['type'], r['label']) for r in results],
+            [('player', 'Tyler'), ('riot_id', 'Tyler#EU9'), ('player', 'Tyloo'), ('team', 'House of Tyloo')],
+        )
+        self.assertEqual(results[2]['url'], reverse('display_profile', args=[self.tyloo.pk]))
+        self.assertEqual(results[3]['url'], f"{reverse('profile_list')}?team={self.team.pk}")
+
+        welly = self.client.get(self.url, {'q': 'welly#n'}).json()['results']
+        self.assertEqual([r['label'] for r in welly], ['Welly#NA1'])
+
+    def test_limit_and_empty_query(self):
+        self.assertEqual(len(self.client.get(self.url, {'q': 'ty', 'limit': 2}).json()['results']), 2)
+        self.assertEqual(self.client.get(self.url, {'q': ' '}).json()['results'], [])
+
+    def test_responses_are_cacheable_and_revalidate(self):
+        first = self.client.get(self.url, {'q': 'ty'})
+        self.assertIn('max-age=', first['Cache-Control'])
+
+        repeat = self.client.get(self.url, {'q': 'ty'}, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(repeat.status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Profile.objects.create(in_game_name='Tyrant', riot_id='Tyrant', riot_tag='#NA2')
+        changed = self.client.get(self.url, {'q': 'ty'}, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(changed.status_code, 200)
+        self.assertIn('Tyrant', [r['label'] for r in changed.json()['results']])
+
+    def test_lookups_do_not_query_the_database(self):
+        self.client.get(self.url, {'q': 'ty'})
+
+        with self.assertNumQueries(0):
+            self.client.get(self.url, {'q': 'tyl'})
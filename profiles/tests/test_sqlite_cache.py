@@ -0,0 +1,82 @@
+import multiprocessing
+import tempfile
+import time
+from pathlib import Path
+
+from django.test import SimpleTestCase
+
+from profiles.sqlite_cache import SQLiteCache
+
+
+def _hammer(path, count):
+    cache = SQLiteCache(path, {})
+    for _ in range(count):
+        cache.incr('hits')
+
+
+class SQLiteCacheTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = str(Path(tmp.name) / 'cache.sqlite3')
+        self.cache = SQLiteCache(self.path, {'OPTIONS': {'MAX_ENTRIES': 10, 'CULL_EVERY': 5}})
+
+    def test_round_trips_values(self):
+        self.cache.set('n', 3)
+        self.cache.set('obj', {'rank': 'Gold 2', 'ids': [1, 2]})
+        self.cache.set('flag', True)
+
+        self.assertEqual(self.cache.get('n'), 3)
+        self.assertEqual(self.cache.get('obj'), {'rank': 'Gold 2', 'ids': [1, 2]})
+        self.assertIs(self.cache.get('flag'), True)
+        self.assertEqual(self.cache.get_many(['n', 'missing']), {'n': 3})
+        self.assertIsNone(self.cache.get('missing'))
+
+    def test_add_only_replaces_expired_entries(self):
+        self.assertTrue(self.cache.add('k', 1, timeout=60))
+        self.assertFalse(self.cache.add('k', 2, timeout=60))
+        self.assertEqual(self.cache.get('k'), 1)
+
+        self.cache.set('old', 'stale', timeout=0.01)
+        time.sleep(0.02)
+        self.assertIsNone(self.cache.get('old'))
+        self.assertTrue(self.cache.add('old', 'fresh'))
+        self.assertEqual(self.cache.get('old'), 'fresh')
+
+    def test_incr_and_decr(self):
+        self.cache.set('count', 1)
+
+        self.assertEqual(self.cache.incr('count', 5), 6)
+        self.assertEqual(self.cache.decr('count'), 5)
+        with self.assertRaises(ValueError):
+            self.cache.incr('absent')
+
+    def test_incr_is_atomic_across_processes(self):
+        self.cache.set('hits', 0)
+        ctx = multiprocessing.get_context('fork')
+        procs = [ctx.Process(target=_hammer, args=(self.path, 200)) for _ in range(4)]
+        for proc in procs:
+            proc.start()
+        for proc in procs:
+            proc.join()
+
+        self.assertEqual(self.cache.get('hits'), 800)
+
+    def test_touch_delete_and_has_key(self):
+        self.cache.set('k', 'v', timeout=0.05)
+        self.assertTrue(self.cache.touch('k', timeout=60))
+        time.sleep(0.06)
+        self.assertTrue(self.cache.has_key('k'))
+
+        self.assertTrue(self.cache.delete('k'))
+        self.assertFalse(self.cache.has_key('k'))
+
+    def test_culls_to_max_entries(self):
+        for i in range(30):
+            self.cache.set(f'k{i}', i, timeout=60 + i)
+
+        with self.cache._connection() as conn:
+            remaining = conn.execute('SELECT COUNT(*) FROM cache_entry').fetchone()[0]
+        self.assertLessEqual(remaining, 10)
+        # The latest-expiring entries survive
+        self.assertEqual(self.cache.get('k29'), 29)
@@ -0,0 +1,287 @@
+import json
+import threading
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from django.test import SimpleTestCase, override_settings
+
+from profiles.services import tracker_api
+from profiles.services.tracker_api import IMPERSONATE_OPTIONS, TrackerUnavailable
+from profiles.utils import tracker_views
+
+TRACKER_JSON = {
+    'data': {
+        'platformInfo': {'platformUserHandle': 'Tyloo#NA1', 'avatarUrl': ''},
+        'metadata': {'activeShard': 'na'},
+        'segments': [],
+    }
+}
+
+
+class FakeResponse:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+    @property
+    def content(self):
+        return json.dumps(TRACKER_JSON).encode()
+
+
+class FakeUpstream:
+    """Stands in for curl_cffi: one session per impersonation profile, scripted statuses."""
+
+    def __init__(self, statuses):
+        self.statuses = statuses    # {impersonate: status}, default 200
+        self.sessions = []
+        self.calls = []
+        self.closed = []
+        self.errors = set()   # impersonation profiles whose get() raises
+
+    def module(self):
+        upstream = self
+
+        class Session:
+            def __init__(self, impersonate):
+                self.impersonate = impersonate
+                upstream.sessions.append(impersonate)
+
+            def get(self, url, headers=None, timeout=None):
+                upstream.calls.append(self.impersonate)
+                if self.impersonate in upstream.errors:
+                    raise ConnectionError('reset')
+                return FakeResponse(upstream.statuses.get(self.impersonate, 200))
+
+            def close(self):
+                upstream.closed.append(self.impersonate)
+
+        return SimpleNamespace(Session=Session)
+
+
+@override_settings(TRACKER_BREAKER_THRESHOLD=2, TRACKER_BREAKER_COOLDOWN=60)
+class TrackerTransportTests(SimpleTestCase):
+    def setUp(self):
+        for name, value in (
+            ('_breaker', tracker_api._CircuitBreaker()),
+            ('_impersonation_stats', {}),
+            ('_preferred_impersonation', None),
+            ('_local', threading.local()),
+            ('_idle_sessions', {}),
+        ):
+            patcher = patch.object(tracker_api, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _use(self, upstream):
+        patcher = patch.object(tracker_api, '_cffi', upstream.module)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_sessions_are_reused_across_lookups(self):
+        upstream = FakeUpstream({})
+        self._use(upstream)
+
+        for _ in range(3):
+            tracker_api._fetch_upstream('Tyloo', '#NA1')
+
+        self.assertEqual(upstream.sessions, [IMPERSONATE_OPTIONS[0]])
+        self.assertEqual(len(upstream.calls), 3)
+
+    def test_sessions_are_shared_across_threads(self):
+        upstream = FakeUpstream({})
+        self._use(upstream)
+
+        for _ in range(3):  # short-lived workers, like revalidation or batch pool threads
+            worker = threading.Thread(target=tracker_api._fetch_upstream, args=('Tyloo', '#NA1'))
+            worker.start()
+            worker.join()
+
+        self.assertEqual(upstream.sessions, [IMPERSONATE_OPTIONS[0]])
+        self.assertEqual(len(upstream.calls), 3)
+
+    def test_failed_session_is_closed_not_pooled(self):
+        first = IMPERSONATE_OPTIONS[0]
+        upstream = FakeUpstream({})
+        upstream.errors.add(first)
+        self._use(upstream)
+
+        tracker_api._fetch_upstream('Tyloo', '#NA1')
+
+        self.assertEqual(upstream.closed, [first])
+        self.assertEqual(tracker_api._idle_sessions[first], [])
+        self.assertEqual(len(tracker_api._idle_sessions[IMPERSONATE_OPTIONS[1]]), 1)
+
+    def test_last_successful_profile_is_tried_first(self):
+        first, second = IMPERSONATE_OPTIONS[:2]
+        upstream = FakeUpstream({first: 403})
+        self._use(upstream)
+
+        tracker_api._fetch_upstream('Tyloo', '#NA1')
+        upstream.calls.clear()
+        tracker_api._fetch_upstream('Tyloo', '#NA1')
+
+        self.assertEqual(upstream.calls, [second])
+        stats = tracker_api.impersonation_stats()
+        self.assertEqual(stats['preferred'], second)
+        self.assertEqual(stats['profiles'][first]['failure'], 1)
+        self.assertEqual(stats['profiles'][second]['success'], 2)
+
+    def test_breaker_opens_after_consecutive_refusals(self):
+        upstream = FakeUpstream({name: 429 for name in IMPERSONATE_OPTIONS})
+        self._use(upstream)
+
+        with self.assertLogs('profiles.services.tracker_api', 'WARNING'):
+            for _ in range(2):
+                with self.assertRaisesMessage(ValueError, 'Rate limited'):
+                    tracker_api._fetch_upstream('Tyloo', '#NA1')
+        upstream.calls.clear()
+
+        with self.assertRaises(TrackerUnavailable):
+            tracker_api._fetch_upstream('Tyloo', '#NA1')
+        self.assertEqual(upstream.calls, [])
+
+    def test_breaker_closes_after_successful_trial(self):
+        upstream = FakeUpstream({name: 401 for name in IMPERSONATE_OPTIONS})
+        self._use(upstream)
+        with self.assertLogs('profiles.services.tracker_api', 'WARNING'):
+            for _ in range(2):
+                with self.assertRaises(ValueError):
+                    tracker_api._fetch_upstream('Tyloo', '#NA1')
+
+        tracker_api._breaker.open_until = 0.0   # cooldown elapsed
+        upstream.statuses = {}
+        self.assertEqual(tracker_api._fetch_upstream('Tyloo', '#NA1')['riot_id'], 'Tyloo')
+        self.assertEqual(tracker_api._breaker.failures, 0)
+        tracker_api._fetch_upstream('Tyloo', '#NA1')
+
+    def test_trial_without_a_verdict_does_not_leave_breaker_stuck(self):
+        upstream = FakeUpstream({name: 403 for name in IMPERSONATE_OPTIONS})
+        self._use(upstream)
+        with self.assertLogs('profiles.services.tracker_api', 'WARNING'):
+            for _ in range(2):
+                with self.assertRaises(ValueError):
+                    tracker_api._fetch_upstream('Tyloo', '#NA1')
+
+        tracker_api._breaker.open_until = 0.0   # cooldown elapsed
+        upstream.statuses = {name: 502 for name in IMPERSONATE_OPTIONS}
+        with self.assertRaisesMessage(ValueError, 'last HTTP status: 502'):
+            tracker_api._fetch_upstream('Tyloo', '#NA1')
+
+        # The next call is a new trial instead of waiting out another cooldown
+        upstream.statuses = {}
+        self.assertEqual(tracker_api._fetch_upstream('Tyloo', '#NA1')['riot_id'], 'Tyloo')
+        self.assertEqual(tracker_api._breaker.failures, 0)
+
+
+def _segment(seg_type, stats=None, **attributes):
+    return {'type': seg_type, 'attributes': attributes, 'metadata': {}, 'stats': stats or {}}
+
+
+def _stat(value, display=None, **metadata):
+    return {'value': value, 'displayValue': display or str(value), 'metadata': metadata}
+
+
+class TrackerParseTests(SimpleTestCase):
+    def _payload(self, segments, **metadata):
+        return {'data': {
+            'platformInfo': {'platformUserHandle': 'Tyloo#NA1', 'avatarUrl': ''},
+            'metadata': {'activeShard': 'na', **metadata},
+            'segments': segments,
+        }}
+
+    def test_decode_json_accepts_bytes_and_str(self):
+        body = json.dumps(TRACKER_JSON)
+        self.assertEqual(tracker_api.decode_json(body), TRACKER_JSON)
+        self.assertEqual(tracker_api.decode_json(body.encode()), TRACKER_JSON)
+
+    def test_requested_season_then_playlist_fallback(self):
+        data = self._payload([
+            _segment('season', {'matchesWon': _stat(1)}, playlist='competitive', seasonId='old'),
+            _segment('season', {'matchesWon': _stat(7)}, playlist='competitive', seasonId='act2'),
+            _segment('season', {'matchesWon': _stat(3)}, playlist='unrated', seasonId='act2'),
+        ], defaultSeason='act2')
+        self.assertEqual(tracker_views.parse_profile(data)['wins'], '7')
+        self.assertEqual(tracker_views.parse_profile(data, season_id='missing')['wins'], '1')
+        self.assertEqual(tracker_views.parse_profile(data, playlist='unrated')['wins'], '3')
+
+    def test_peak_rank_falls_back_to_season_segment(self):
+        season = _segment('season', {
+            'rank': _stat(20, 'Diamond 2', tierName='Diamond 2', iconUrl='d2.png'),
+            'peakRank': _stat(22, 'Ascendant 1', actName='E9A1'),
+        }, playlist='competitive')
+        parsed = tracker_views.parse_profile(self._payload([season]))
+        self.assertEqual((parsed['peak_rank'], parsed['peak_act']), ('Ascendant 1', 'E9A1'))
+        self.assertEqual(parsed['peak_rank_icon'], 'd2.png')
+
+        peak = _segment('peak-rating', {'peakRating': _stat(25, 'Immortal 1', iconUrl='i1.png')},
+                        playlist='competitive')
+        parsed = tracker_views.parse_profile(self._payload([season, peak]))
+        self.assertEqual((parsed['peak_rank'], parsed['peak_rank_icon']), ('Immortal 1', 'i1.png'))
+
+    def test_top_agents_ordered_by_matches_played(self):
+        agents = [
+            _segment('agent', {'matchesPlayed': _stat(played)}, playlist='competitive', agentName=name)
+            for name, played in (('Sage', 4), ('Jett', 30), ('Omen', 12), ('Sova', 1),
+                                 ('Raze', 12), ('Fade', 9), ('Yoru', 2))
+        ]
+        names = [a['name'] for a in tracker_views.parse_profile(self._payload(agents))['top_agents']]
+        self.assertEqual(names, ['Jett', 'Omen', 'Raze', 'Fade', 'Sage'])
+
+    def test_every_playlist_and_season_becomes_a_view(self):
+        act1 = _segment('season', {'matchesWon': _stat(1)}, playlist='competitive', seasonId='act1')
+        act1['metadata'] = {'name': 'E9: A1'}
+        data = self._payload([
+            act1,
+            _segment('season', {'matchesWon': _stat(7)}, playlist='competitive', seasonId='act2'),
+            _segment('season', {'matchesWon': _stat(3)}, playlist='unrated', seasonId='act2'),
+            _segment('agent', {'matchesPlayed': _stat(9)}, playlist='deathmatch', agentName='Jett'),
+        ], defaultSeason='act2')
+
+        parsed = tracker_views.parse_views(data)
+
+        self.assertEqual(list(parsed['views']), ['competitive', 'unrated', 'deathmatch'])
+        self.assertEqual(list(parsed['views']['competitive']), ['act1', 'act2'])
+        self.assertEqual(parsed['views']['unrated']['act2']['wins'], '3')
+        self.assertEqual(parsed['views']['deathmatch']['']['top_agents'][0]['name'], 'Jett')
+        self.assertEqual(parsed['seasons'], {'act1': 'E9: A1', 'act2': 'act2'})
+        json.dumps(parsed)  # cached and returned to the widget as-is
+
+        view = tracker_views.select_view(parsed, playlist='Competitive', season_id='act1')
+        self.assertEqual((view['playlist'], view['season_id'], view['wins']), ('competitive', 'act1', '1'))
+
+
+@override_settings(TRACKER_CACHE_ALIAS='default')
+class UpstreamBudgetTests(SimpleTestCase):
+    def test_batch_callers_wait_for_the_next_window(self):
+        clock = [6000.0]
+        slept = []
+
+        def sleep(seconds):
+            slept.append(seconds)
+            clock[0] += seconds
+
+        patcher = patch.object(tracker_api, '_local', threading.local())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        with patch.object(tracker_api.time, 'time', lambda: clock[0]), \
+                patch.object(tracker_api.time, 'sleep', sleep):
+            tracker_api._cache().clear()
+            tracker_api._spend_budget()  # an interactive lookup: counted, never waits
+            with tracker_api.upstream_budget(2):
+                self.assertEqual(tracker_api._spend_budget(), 2)
+                self.assertEqual(tracker_api._spend_budget(), 1)  # third call this minute waited
+            self.assertEqual(slept, [60.0])
+            self.assertEqual(tracker_api.upstream_calls_this_minute(), 1)
+
+    def test_stop_event_ends_the_wait(self):
+        patcher = patch.object(tracker_api, '_local', threading.local())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        stop = threading.Event()
+        tracker_api._cache().clear()
+        with patch.object(tracker_api.time, 'sleep', side_effect=AssertionError('slept past the stop event')):
+            with tracker_api.upstream_budget(1, stop=stop):
+                tracker_api._spend_budget()
+                stop.set()
+                with self.assertRaises(tracker_api.BudgetInterrupted):
+                    tracker_api._spend_budget()
@@ -0,0 +1,171 @@
+import json
+import threading
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from profiles.models import Profile, TrackerSnapshot
+from profiles.services import tracker_api
+from profiles.services.tracker_api import TrackerNotFound
+from profiles.utils import tracker_views
+from profiles.views_tracker import tracker_lookup
+
+
+def _views(handle, peak_rank):
+    return tracker_views.parse_views({'data': {
+        'platformInfo': {'platformUserHandle': handle, 'avatarUrl': ''},
+        'metadata': {'activeShard': 'na'},
+        'segments': [{
+            'type': 'peak-rating',
+            'attributes': {'playlist': 'competitive'},
+            'metadata': {},
+            'stats': {'peakRating': {'displayValue': peak_rank, 'metadata': {'iconUrl': ''}}},
+        }],
+    }})
+
+
+@override_settings(TRACKER_CACHE_ALIAS='default', TRACKER_SNAPSHOT_FRESH_SECONDS=3600,
+                   TRACKER_BATCH_MAX=5, TRACKER_BATCH_WORKERS=4)
+class TrackerBatchTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(User.objects.create_user(username='captain', password='StrongPass123!'))
+
+    def _post(self, players):
+        return self.client.post(reverse('fetch_tracker_batch'), data=json.dumps({'players': players}),
+                                content_type='application/json')
+
+    def _lines(self, response):
+        return [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+
+    def test_players_are_looked_up_concurrently(self):
+        # Each lookup waits for the other: a serial loop would break the barrier
+        barrier = threading.Barrier(2, timeout=5)
+
+        def fetch(riot_id, riot_tag):
+            barrier.wait()
+            return _views(f'{riot_id}{riot_tag}', 'Gold 2')
+
+        with patch.object(tracker_api, '_fetch_upstream', side_effect=fetch):
+            response = self._post([
+                'Tyloo#NA1',
+                {'tracker_url': 'https://tracker.gg/valorant/profile/riot/Mate%23EU2/overview'},
+                'not a riot id',
+                '#NA1',
+            ])
+            self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+            lines = {line['index']: line for line in self._lines(response)}
+
+        self.assertEqual(sorted(lines), [0, 1, 2, 3])
+        self.assertEqual(lines[0]['data']['riot_id'], 'Tyloo')
+        self.assertEqual(lines[1]['data']['peak_rank'], 'Gold 2')
+        self.assertFalse(lines[2]['ok'] or lines[3]['ok'])
+
+    def test_results_stream_as_they_complete(self):
+        release = threading.Event()
+
+        def fetch(riot_id, riot_tag):
+            if riot_id == 'Slow':
+                release.wait(5)
+            return _views(f'{riot_id}{riot_tag}', 'Silver 1')
+
+        with patch.object(tracker_api, '_fetch_upstream', side_effect=fetch):
+            stream = iter(self._post(['Slow#NA1', 'Fast#NA1']).streaming_content)
+            first = json.loads(next(stream))
+            release.set()
+            second = json.loads(next(stream))
+
+        self.assertEqual((first['index'], second['index']), (1, 0))
+
+    def test_snapshots_are_used_and_recorded(self):
+        fresh = Profile.objects.create(in_game_name='Fresh', riot_id='Fresh', riot_tag='#NA1')
+        TrackerSnapshot.objects.create(profile=fresh, fetched_at=timezone.now() - timedelta(minutes=5),
+                                       data=_views('Fresh#NA1', 'Diamond 1'))
+        stale = Profile.objects.create(in_game_name='Stale', riot_id='Stale', riot_tag='#NA1')
+        ranks = {'Stale': 'Platinum 3', 'Gone': TrackerNotFound("Player 'Gone#NA1' was not found on tracker.gg.")}
+
+        def fetch(riot_id, riot_tag):
+            if isinstance(ranks[riot_id], Exception):
+                raise ranks[riot_id]
+            return _views(f'{riot_id}{riot_tag}', ranks[riot_id])
+
+        with patch.object(tracker_api, '_fetch_upstream', side_effect=fetch) as upstream:
+            lines = self._lines(self._post(['Fresh#NA1', 'Stale#NA1', 'stale#na1', 'Gone#NA1']))
+
+        self.assertEqual(upstream.call_count, 2)  # fresh snapshot and repeated player cost nothing
+        by_index = {line['index']: line for line in lines}
+        self.assertEqual(by_index[0]['data']['peak_rank'], 'Diamond 1')
+        self.assertEqual(by_index[1]['data']['peak_rank'], 'Platinum 3')
+        self.assertEqual(by_index[2]['data']['peak_rank'], 'Platinum 3')
+        self.assertIn('was not found', by_index[3]['error'])
+        self.assertEqual(stale.tracker_snapshots.count(), 1)
+
+    def test_malformed_entries_fail_alone(self):
+        def fetch(riot_id, riot_tag):
+            return _views(f'{riot_id}{riot_tag}', 'Gold 2')
+
+        with patch.object(tracker_api, '_fetch_upstream', side_effect=fetch) as upstream:
+            lines = self._lines(self._post([
+                {'riot_id': 123, 'riot_tag': '#NA1'},
+                {'riot_id': ' ', 'riot_tag': ['#NA1']},
+                {'riot_id': 'Tyloo', 'riot_tag': 'NA1'},
+                'Tyloo#N A1',
+                {'riot_id': ' Tyloo ', 'riot_tag': '#NA1'},
+            ]))
+
+        by_index = {line['index']: line for line in lines}
+        self.assertEqual(sorted(by_index), [0, 1, 2, 3, 4])
+        for index in range(3):
+            self.assertIn("both 'riot_id' and 'riot_tag'", by_index[index]['error'])
+        self.assertIn("a Riot ID like 'Name#TAG'", by_index[3]['error'])
+        self.assertEqual(by_index[4]['data']['peak_rank'], 'Gold 2')
+        upstream.assert_called_once_with('Tyloo', '#NA1')
+
+        response = self.client.post(reverse('fetch_tracker_stats'), content_type='application/json',
+                                    data=json.dumps({'riot_id': None, 'riot_tag': '#NA1'}))
+        self.assertEqual(response.status_code, 400)
+
+    def test_tags_follow_the_profile_form_rule(self):
+        self.assertIsNone(tracker_lookup({'riot_id': 'Tyloo', 'riot_tag': '#NA1'})[1])
+        for entry in ({'riot_id': 'Tyloo', 'riot_tag': '#A'}, {'riot_id': 'Tyloo', 'riot_tag': '#ü'},
+                      {'riot_id': 'Tyloo', 'riot_tag': '#NA123X'}, 'Tyloo#ü'):
+            with self.subTest(entry=entry):
+                self.assertIsNotNone(tracker_lookup(entry)[1])
+
+    def test_single_endpoint_takes_only_an_object(self):
+        for body in ('Tyloo#NA1', 'https://tracker.gg/valorant/profile/riot/Tyloo%23NA1/overview', ['Tyloo#NA1']):
+            with self.subTest(body=body):
+                response = self.client.post(reverse('fetch_tracker_stats'), data=json.dumps(body),
+                                            content_type='application/json')
+                self.assertEqual(response.status_code, 400)
+
+    def test_each_player_is_charged_to_the_lookup_rate_limit(self):
+        def fetch(riot_id, riot_tag):
+            return _views(f'{riot_id}{riot_tag}', 'Gold 2')
+
+        with patch.object(tracker_api, '_fetch_upstream', side_effect=fetch) as upstream:
+            self._lines(self._post([f'First{i}#NA1' for i in range(5)]))
+            self._lines(self._post([f'Second{i}#NA1' for i in range(3)] + ['not a riot id']))
+            lines = self._lines(self._post([f'Third{i}#NA1' for i in range(5)]))
+
+            self.assertEqual(upstream.call_count, 10)  # 10/m, the single endpoint's allowance
+            by_index = {line['index']: line for line in lines}
+            self.assertTrue(by_index[0]['ok'] and by_index[1]['ok'])
+            for index in (2, 3, 4):
+                self.assertIn('Too many tracker requests', by_index[index]['error'])
+
+            single = self.client.post(reverse('fetch_tracker_stats'), content_type='application/json',
+                                      data=json.dumps({'riot_id': 'Single', 'riot_tag': '#NA1'}))
+            self.assertEqual(single.status_code, 429)
+
+    def test_rejects_oversized_and_anonymous_batches(self):
+        self.assertEqual(self._post(['A#1'] * 6).status_code, 400)
+        self.assertEqual(self._post([]).status_code, 400)
+
+        self.client.logout()
+        self.assertEqual(self._post(['A#1']).status_code, 401)
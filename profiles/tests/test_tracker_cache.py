@@ -0,0 +1,118 @@
+import threading
+import time
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from profiles.services import tracker_api
+from profiles.services.tracker_api import TrackerNotFound, fetch_tracker_profile, tracker_cache_key
+
+
+def _views(peak_rank):
+    return {
+        'riot_id': 'Tyloo', 'riot_tag': '#NA1', 'in_game_name': 'Tyloo', 'avatar_url': '', 'region': 'NA',
+        'default_playlist': 'competitive', 'default_season': 'act2',
+        'seasons': {'act1': 'E9: A1', 'act2': 'E9: A2'},
+        'views': {
+            'competitive': {'act1': {'peak_rank': 'Silver 1'}, 'act2': {'peak_rank': peak_rank}},
+            'unrated': {'act2': {'peak_rank': ''}},
+        },
+    }
+
+
+PROFILE = _views('Gold 2')
+
+
+@override_settings(TRACKER_CACHE_ALIAS='default', TRACKER_CACHE_TTL=600,
+                   TRACKER_CACHE_STALE_SECONDS=3600, TRACKER_NOT_FOUND_TTL=120)
+class TrackerCacheTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    @patch('profiles.services.tracker_api._fetch_upstream', return_value=PROFILE)
+    def test_repeat_lookup_is_served_from_cache(self, upstream):
+        first = fetch_tracker_profile('Tyloo', '#NA1')
+        second = fetch_tracker_profile('tyloo', '#na1')
+
+        self.assertEqual(first, second)
+        self.assertEqual(first['peak_rank'], 'Gold 2')
+        upstream.assert_called_once()
+
+    @patch('profiles.services.tracker_api._fetch_upstream', return_value=PROFILE)
+    def test_playlists_and_seasons_share_one_entry(self, upstream):
+        default = fetch_tracker_profile('Tyloo', '#NA1')
+        unrated = fetch_tracker_profile('Tyloo', '#NA1', playlist='unrated')
+        older = fetch_tracker_profile('Tyloo', '#NA1', season_id='act1')
+
+        upstream.assert_called_once()
+        self.assertEqual((default['playlist'], default['season_id']), ('competitive', 'act2'))
+        self.assertEqual((unrated['playlist'], unrated['season_id']), ('unrated', 'act2'))
+        self.assertEqual(older['peak_rank'], 'Silver 1')
+        self.assertEqual(default['views'], PROFILE['views'])
+
+    @patch('profiles.services.tracker_api._fetch_upstream')
+    def test_not_found_is_negatively_cached(self, upstream):
+        upstream.side_effect = TrackerNotFound("Player 'Nobody#NA1' was not found on tracker.gg.")
+
+        for _ in range(2):
+            with self.assertRaisesMessage(ValueError, 'was not found'):
+                fetch_tracker_profile('Nobody', '#NA1')
+
+        upstream.assert_called_once()
+
+    @patch('profiles.services.tracker_api._fetch_upstream')
+    def test_other_errors_are_not_cached(self, upstream):
+        upstream.side_effect = ValueError('Rate limited by tracker.gg.')
+
+        for _ in range(2):
+            with self.assertRaises(ValueError):
+                fetch_tracker_profile('Tyloo', '#NA1')
+
+        self.assertEqual(upstream.call_count, 2)
+
+    @patch('profiles.services.tracker_api._revalidate_in_background')
+    @patch('profiles.services.tracker_api._fetch_upstream')
+    def test_stale_entry_is_served_while_revalidating(self, upstream, revalidate):
+        key = tracker_cache_key('Tyloo', '#NA1')
+        cache.set(key, {'data': PROFILE, 'fetched_at': time.time() - 900})
+
+        self.assertEqual(fetch_tracker_profile('Tyloo', '#NA1')['peak_rank'], 'Gold 2')
+
+        upstream.assert_not_called()
+        revalidate.assert_called_once()
+
+    @patch('profiles.services.tracker_api._fetch_upstream', return_value=PROFILE)
+    def test_expired_entry_is_refetched(self, upstream):
+        key = tracker_cache_key('Tyloo', '#NA1')
+        cache.set(key, {'data': _views('Iron 1'), 'fetched_at': time.time() - 5000})
+
+        self.assertEqual(fetch_tracker_profile('Tyloo', '#NA1')['peak_rank'], 'Gold 2')
+        upstream.assert_called_once()
+
+    def test_concurrent_misses_share_one_upstream_call(self):
+        release = threading.Event()
+        calls = []
+
+        def slow_upstream(*args, **kwargs):
+            calls.append(args)
+            release.wait(5)
+            return PROFILE
+
+        results = []
+        with patch.object(tracker_api, '_fetch_upstream', side_effect=slow_upstream):
+            threads = [
+                threading.Thread(target=lambda: results.append(fetch_tracker_profile('Tyloo', '#NA1')))
+                for _ in range(5)
+            ]
+            for thread in threads:
+                thread.start()
+            while not calls:
+                time.sleep(0.01)
+            time.sleep(0.05)
+            release.set()
+            for thread in threads:
+                thread.join(5)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual([result['peak_rank'] for result in results], ['Gold 2'] * 5)
@@ -0,0 +1,148 @@
+import json
+import time
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from profiles.models import Profile, TrackerSnapshot, UserProfile
+from profiles.services import tracker_api
+from profiles.services.tracker_snapshots import fetch_tracker_profile, record_snapshot
+from profiles.utils import tracker_views
+
+
+def _views(current_rank='Diamond 2', fetched_at=None):
+    views = tracker_views.parse_views({'data': {
+        'platformInfo': {'platformUserHandle': 'Tyloo#NA1', 'avatarUrl': ''},
+        'metadata': {'activeShard': 'na', 'defaultSeason': 'act2'},
+        'segments': [{
+            'type': 'season',
+            'attributes': {'playlist': 'competitive', 'seasonId': 'act2'},
+            'metadata': {'name': 'E9: A2'},
+            'stats': {
+                'rank': {'metadata': {'tierName': current_rank, 'iconUrl': ''}},
+                'kDRatio': {'value': 1.2, 'displayValue': '1.20'},
+            },
+        }],
+    }})
+    views['fetched_at'] = fetched_at or time.time()
+    return views
+
+
+@override_settings(TRACKER_CACHE_ALIAS='default', TRACKER_SNAPSHOT_FRESH_SECONDS=3600,
+                   TRACKER_SNAPSHOT_KEEP=3, TRACKER_SNAPSHOT_RETENTION_DAYS=30)
+class TrackerSnapshotTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.profile = Profile.objects.create(in_game_name='Tyloo', riot_id='Tyloo', riot_tag='#NA1')
+
+    def _snapshot(self, age, current_rank='Diamond 2'):
+        return TrackerSnapshot.objects.create(
+            profile=self.profile, fetched_at=timezone.now() - age, data=_views(current_rank),
+        )
+
+    @patch('profiles.services.tracker_api._fetch_upstream')
+    def test_fresh_snapshot_answers_without_upstream(self, upstream):
+        self._snapshot(timedelta(minutes=5))
+
+        data = fetch_tracker_profile('tyloo', '#na1')
+
+        upstream.assert_not_called()
+        self.assertEqual(data['current_rank'], 'Diamond 2')
+        self.assertIn('competitive', data['views'])
+
+    @patch('profiles.services.tracker_api._fetch_upstream')
+    def test_stale_snapshot_is_refreshed_and_recorded(self, upstream):
+        upstream.return_value = _views('Ascendant 1')
+        self._snapshot(timedelta(hours=2))
+
+        data = fetch_tracker_profile('Tyloo', '#NA1')
+
+        upstream.assert_called_once()
+        self.assertEqual(data['current_rank'], 'Ascendant 1')
+        self.assertEqual(self.profile.tracker_snapshots.count(), 2)
+        self.assertEqual(self.profile.tracker_snapshots.first().view()['current_rank'], 'Ascendant 1')
+
+    def test_the_same_fetch_is_recorded_once(self):
+        views = _views()
+        record_snapshot(self.profile, views)
+        record_snapshot(Profile.objects.get(pk=self.profile.pk), views)
+
+        self.assertEqual(self.profile.tracker_snapshots.count(), 1)
+
+    def test_retention_keeps_newest_rows_and_never_the_last_one(self):
+        for days in (200, 100, 20, 10, 5):
+            self._snapshot(timedelta(days=days))
+        record_snapshot(self.profile, _views('Immortal 1'))
+
+        ages = [(timezone.now() - s.fetched_at).days for s in self.profile.tracker_snapshots.all()]
+        self.assertEqual(ages, [0, 5, 10])
+
+        # A profile that is never refreshed again keeps its last snapshot, however old
+        other = Profile.objects.create(in_game_name='Mate', riot_id='Mate', riot_tag='#NA2')
+        TrackerSnapshot.objects.create(profile=other, fetched_at=timezone.now() - timedelta(days=400),
+                                       data=_views())
+        record_snapshot(other, _views(fetched_at=time.time() - 300 * 86400))
+        self.assertEqual(other.tracker_snapshots.count(), 1)
+
+    @patch('profiles.services.tracker_api._fetch_upstream')
+    def test_fetch_endpoint_uses_fresh_snapshot(self, upstream):
+        self._snapshot(timedelta(minutes=5))
+        self.client.force_login(User.objects.create_user(username='captain', password='StrongPass123!'))
+
+        response = self.client.post(
+            reverse('fetch_tracker_stats'),
+            data=json.dumps({'riot_id': 'Tyloo', 'riot_tag': '#NA1', 'async': True}),
+            content_type='application/json',
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['data']['current_rank'], 'Diamond 2')
+        upstream.assert_not_called()
+
+    def test_saved_peak_rank_is_the_view_the_widget_applied(self):
+        def peak(playlist, rank):
+            return {'type': 'peak-rating', 'attributes': {'playlist': playlist}, 'metadata': {},
+                    'stats': {'peakRating': {'displayValue': rank, 'metadata': {'iconUrl': f'{playlist}.png'}}}}
+
+        views = tracker_views.parse_views({'data': {
+            'platformInfo': {'platformUserHandle': 'Tyloo#NA1', 'avatarUrl': ''},
+            'metadata': {'activeShard': 'na'},
+            'segments': [peak('competitive', 'Diamond 3'), peak('premier', 'Immortal 1')],
+        }})
+        TrackerSnapshot.objects.create(profile=self.profile, fetched_at=timezone.now(), data=views)
+        user = User.objects.create_user(username='captain', password='StrongPass123!')
+        UserProfile.objects.create(user=user, riot_id='Tyloo', riot_tag='#NA1')
+        Profile.objects.filter(pk=self.profile.pk).update(user=user)
+        self.client.force_login(user)
+
+        self.client.post(reverse('fetch_tracker_stats'),
+                         data=json.dumps({'riot_id': 'Tyloo', 'riot_tag': '#NA1'}),
+                         content_type='application/json')
+        self.client.post(reverse('edit_profile', args=[self.profile.id]), {
+            'in_game_name': 'Tyloo', 'riot_id': 'Tyloo', 'riot_tag': '#NA1',
+            'tracker_playlist': 'premier', 'tracker_season': '',
+        })
+
+        self.profile.refresh_from_db()
+        self.assertEqual((self.profile.peak_rank, self.profile.peak_rank_icon), ('Immortal 1', 'premier.png'))
+
+    def test_display_page_reads_latest_snapshot(self):
+        self._snapshot(timedelta(days=3), 'Gold 1')
+        self._snapshot(timedelta(hours=1), 'Platinum 3')
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('display_profile', args=[self.profile.id]))
+
+        snapshot_queries = [q for q in queries if 'profiles_trackersnapshot' in q['sql']]
+        self.assertEqual(len(snapshot_queries), 1)
+
+        self.assertContains(response, 'Current: Platinum 3')
+        self.assertContains(response, 'K/D 1.20')
+        self.assertNotContains(response, 'Gold 1')
@@ -1,6 +1,8 @@
 from django.urls import path
 from . import views
-from .views_tracker import fetch_tracker_stats
+from .views_jobs import job_status_view
+from .views_search import search_suggest
+from .views_tracker import fetch_tracker_batch, fetch_tracker_stats
 
 urlpatterns = [
     path('', views.profile_list, name='profile_list'),
@@ -18,4 +20,9 @@ urlpatterns = [
     path('accounts/unclaim/', views.unclaim_profile_view, name='unclaim_profile'),
     # Tracker.gg auto-fill API
     path('api/fetch-tracker/', fetch_tracker_stats, name='fetch_tracker_stats'),
+    path('api/fetch-tracker/batch/', fetch_tracker_batch, name='fetch_tracker_batch'),
+    # Search typeahead
+    path('api/search/suggest/', search_suggest, name='search_suggest'),
+    # Background jobs
+    path('api/jobs/<uuid:job_id>/', job_status_view, name='job_status'),
 ]
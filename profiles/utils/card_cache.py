@@ -0,0 +1,114 @@
+"""Content-addressed cache of rendered player cards.
+
+A card's cache key is a SHA-256 over everything that shows up on it: the
+profile fields and ``updated_at``, its agent/role/map selections, the team,
+each teammate's name and picture, the render backend/format, the renderer
+version and a catalog epoch. The same key doubles as the download's ETag.
+
+Entries live in the Django cache named by ``settings.CARD_CACHE_ALIAS``.
+Signal handlers in ``profiles.signals`` drop a profile's entries when it or
+its selections change, and bump the catalog epoch when an Agent, Role, Map
+or Team is edited, so icon swaps re-render every card.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+from ..catalog import profile_selections
+from .card_render import RENDERER_VERSION
+
+EPOCH_KEY = 'card:epoch'
+
+
+def _cache():
+    return caches[getattr(settings, 'CARD_CACHE_ALIAS', 'default')]
+
+
+def _timeout():
+    return getattr(settings, 'CARD_CACHE_TIMEOUT', 7 * 24 * 3600)
+
+
+def _entry_key(key: str) -> str:
+    return f'card:entry:{key}'
+
+
+def _profile_index_key(profile_id) -> str:
+    return f'card:profile:{profile_id}'
+
+
+def catalog_epoch() -> int:
+    """Return the current catalog epoch (0 until the catalog is first edited)."""
+    return _cache().get(EPOCH_KEY, 0)
+
+
+def bump_catalog_epoch() -> None:
+    """Invalidate every cached card by moving to a new catalog epoch."""
+    _cache().set(EPOCH_KEY, time.time_ns(), None)
+
+
+def card_cache_key(profile, teammates, backend: str, fmt: str) -> str:
+    """Return the content hash identifying the rendered card for *profile*."""
+    team = profile.team
+    agents, roles, maps = profile_selections(profile)
+    snapshot = profile.latest_tracker_snapshot
+    fingerprint = {
+        'v': RENDERER_VERSION,
+        'epoch': catalog_epoch(),
+        'backend': backend,
+        'fmt': fmt,
+        'profile': [
+            profile.id,
+            profile.updated_at.isoformat() if profile.updated_at else '',
+            profile.in_game_name,
+            profile.riot_id,
+            profile.riot_tag or '',
+            profile.get_profile_picture_url(),
+            profile.peak_rank,
+            profile.peak_rank_icon,
+        ],
+        'tracker': snapshot.pk if snapshot else None,
+        'agents': sorted(obj.pk for obj in agents),
+        'roles': sorted(obj.pk for obj in roles),
+        'maps': sorted(obj.pk for obj in maps),
+        'team': [team.id, team.name] if team else None,
+        'teammates': [
+            [tm.id, tm.in_game_name, tm.get_profile_picture_url()]
+            for tm in (teammates or [])
+        ],
+    }
+    raw = json.dumps(fingerprint, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def get_card(key: str):
+    """Return the cached ``{'body', 'rendered_at'}`` entry for *key*, or None."""
+    return _cache().get(_entry_key(key))
+
+
+def store_card(key: str, body: bytes, profile_id) -> dict:
+    """Cache *body* under *key* and remember it on the profile's index."""
+    cache = _cache()
+    entry = {'body': body, 'rendered_at': time.time()}
+    cache.set(_entry_key(key), entry, _timeout())
+
+    index_key = _profile_index_key(profile_id)
+    keys = cache.get(index_key) or []
+    if key not in keys:
+        keys = keys[-15:] + [key]
+        cache.set(index_key, keys, _timeout())
+    return entry
+
+
+def invalidate_profile_cards(*profile_ids) -> None:
+    """Drop every cached card rendered for the given profiles."""
+    cache = _cache()
+    for profile_id in profile_ids:
+        index_key = _profile_index_key(profile_id)
+        keys = cache.get(index_key) or []
+        cache.delete_many([_entry_key(key) for key in keys] + [index_key])
@@ -6,17 +6,22 @@ Call ``build_card_image(profile, teammates)`` to get a PIL.Image ready for savin
 
 from __future__ import annotations
 
-import io
 import math
+import threading
+from collections import OrderedDict
+from contextvars import ContextVar
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional
 
-import requests
 from PIL import Image, ImageDraw, ImageFont
 
 from django.conf import settings
 from django.contrib.staticfiles import finders as static_finders
 
+from ..catalog import profile_selections
+from .remote_assets import fetch_remote_assets
+
 # ---------------------------------------------------------------------------
 # Canvas geometry
 # ---------------------------------------------------------------------------
@@ -32,6 +37,10 @@ PFP_DIAMETER = 350
 PFP_RADIUS   = PFP_DIAMETER // 2
 PFP_CX, PFP_CY = CARD_W // 2, CARD_H // 2
 
+ICON_BOX_SIZE  = 65                             # agent/role tile
+ICON_IMG_SIZE  = int(ICON_BOX_SIZE * 0.8)       # 52px icon inside the tile
+MAP_THUMB_SIZE = (108, 58)
+
 # ---------------------------------------------------------------------------
 # Colours
 # ---------------------------------------------------------------------------
@@ -52,52 +61,143 @@ FONT_DIR = Path(settings.BASE_DIR) / 'profiles' / 'static' / 'profiles' / 'fonts
 def _load_font(filename: str, size: int) -> ImageFont.FreeTypeFont:
     path = FONT_DIR / filename
     try:
-        return ImageFont.truetype(str(path), size)
+        mtime = path.stat().st_mtime
+    except OSError:
+        return ImageFont.load_default()
+    return _load_font_cached(str(path), mtime, size)
+
+
+@lru_cache(maxsize=32)
+def _load_font_cached(path: str, mtime: float, size: int) -> ImageFont.FreeTypeFont:
+    try:
+        return ImageFont.truetype(path, size)
     except (IOError, OSError):
         return ImageFont.load_default()
 
 
+# ---------------------------------------------------------------------------
+# Decoded-asset cache
+# ---------------------------------------------------------------------------
+
+class _AssetCache:
+    """Process-wide LRU of decoded RGBA images, bounded by total pixel bytes.
+
+    Keys are ``(source, mtime, size)`` so an edited file or a different
+    target size never returns a stale entry. Cached images are shared —
+    callers must treat them as read-only.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _cost(img: Image.Image) -> int:
+        return img.width * img.height * 4
+
+    def get(self, key):
+        with self._lock:
+            img = self._entries.get(key)
+            if img is not None:
+                self._entries.move_to_end(key)
+            return img
+
+    def put(self, key, img: Image.Image) -> None:
+        cost = self._cost(img)
+        if cost > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= self._cost(old)
+            self._entries[key] = img
+            self._bytes += cost
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= self._cost(evicted)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+
+_asset_cache = _AssetCache(getattr(settings, 'CARD_ASSET_CACHE_BYTES', 64 * 1024 * 1024))
+
+# url -> local path for the remote assets fetched up front by build_card_image
+_prefetched_remote: ContextVar[Optional[dict]] = ContextVar('card_prefetched_remote', default=None)
+
+
+@lru_cache(maxsize=512)
+def _find_static(relative: str) -> Optional[str]:
+    """Memoised staticfiles lookup — the finders walk every app directory."""
+    return static_finders.find(relative)
+
+
+def _is_remote(url: str) -> bool:
+    return url.startswith('http://') or url.startswith('https://')
+
+
+def _remote_asset_path(url: str) -> Optional[Path]:
+    """Return the on-disk copy of a remote image, preferring this render's prefetch."""
+    prefetched = _prefetched_remote.get()
+    if prefetched is not None and url in prefetched:
+        return prefetched[url]
+    return fetch_remote_assets([url]).get(url)
+
+
+def _local_path_for(url: str) -> Optional[Path]:
+    """Map a /static/, /media/, http(s) or bare filesystem URL to an existing local file."""
+    if url.startswith('/static/'):
+        found = _find_static(url[len('/static/'):])
+        return Path(found) if found else None
+    if url.startswith('/media/'):
+        local_path = Path(settings.MEDIA_ROOT) / url[len('/media/'):]
+        return local_path if local_path.exists() else None
+    if _is_remote(url):
+        return _remote_asset_path(url)
+    p = Path(url)
+    return p if p.exists() else None
+
+
+def _resize(img: Image.Image, size) -> Image.Image:
+    if size is None or img.size == tuple(size):
+        return img
+    return img.resize(tuple(size), Image.LANCZOS)
+
+
 # ---------------------------------------------------------------------------
 # Image helpers
 # ---------------------------------------------------------------------------
 
-def _load_image_from_url_or_path(url: str) -> Optional[Image.Image]:
+def _load_image_from_url_or_path(url: str, size=None) -> Optional[Image.Image]:
     """Resolve *url* to a PIL Image, handling relative /static/, /media/, and
     absolute http(s) URLs.
 
     Resolution order:
     1. Relative ``/static/...``  → locate via Django's staticfiles finders
     2. Relative ``/media/...``   → resolve against MEDIA_ROOT
-    3. Absolute ``http(s)://``   → fetch with requests
+    3. Absolute ``http(s)://``   → on-disk copy from ``remote_assets``
     4. Bare filesystem path      → open directly
+
+    When *size* is given the image is resized to ``(w, h)``. Decoded images
+    are served from the asset cache; the result must not be mutated.
     """
     if not url:
         return None
     try:
-        if url.startswith('/static/'):
-            # Strip the leading /static/ prefix and ask the staticfiles finder
-            relative = url[len('/static/'):]
-            local_path = static_finders.find(relative)
-            if local_path:
-                return Image.open(local_path).convert('RGBA')
-            return None
-
-        if url.startswith('/media/'):
-            relative = url[len('/media/'):]
-            local_path = Path(settings.MEDIA_ROOT) / relative
-            if local_path.exists():
-                return Image.open(str(local_path)).convert('RGBA')
+        local_path = _local_path_for(url)
+        if local_path is None:
             return None
-
-        if url.startswith('http://') or url.startswith('https://'):
-            r = requests.get(url, timeout=10)
-            r.raise_for_status()
-            return Image.open(io.BytesIO(r.content)).convert('RGBA')
-
-        # Last resort: treat as a bare filesystem path
-        p = Path(url)
-        if p.exists():
-            return Image.open(str(p)).convert('RGBA')
+        key = (str(local_path), local_path.stat().st_mtime, tuple(size) if size else None)
+        img = _asset_cache.get(key)
+        if img is None:
+            with Image.open(str(local_path)) as src:
+                img = _resize(src.convert('RGBA'), size)
+            _asset_cache.put(key, img)
+        return img
 
     except Exception:
         pass
@@ -109,33 +209,39 @@ def _fetch_url(url: str) -> Optional[Image.Image]:
     return _load_image_from_url_or_path(url)
 
 
-def _open_field_image(field) -> Optional[Image.Image]:
+def _open_field_image(field, size=None) -> Optional[Image.Image]:
     """Open a Django ImageField — local path first, then URL fallback."""
     if not field:
         return None
     try:
-        return Image.open(field.path).convert('RGBA')
-    except (ValueError, AttributeError, FileNotFoundError, NotImplementedError):
-        try:
-            return _load_image_from_url_or_path(field.url)
-        except Exception:
-            return None
+        path = field.path
+    except (ValueError, AttributeError, NotImplementedError):
+        path = None
+    if path and Path(path).exists():
+        img = _load_image_from_url_or_path(path, size=size)
+        if img is not None:
+            return img
+    try:
+        return _load_image_from_url_or_path(field.url, size=size)
+    except Exception:
+        return None
 
 
-def _get_icon(obj) -> Optional[Image.Image]:
+def _get_icon(obj, size=None) -> Optional[Image.Image]:
     """Return icon image for a Role / Agent / Map / Team model instance.
 
     Uses the model's own ``get_icon_url()`` method so the resolution logic
     (uploaded file first, then icon_url fallback) stays in one place.
+    *size* pre-resizes the icon so the cached copy is the one that gets drawn.
     """
     url = obj.get_icon_url()
     if url:
-        img = _load_image_from_url_or_path(url)
+        img = _load_image_from_url_or_path(url, size=size)
         if img:
             return img
     # Secondary fallback: try the raw ImageField path if icon_url resolved to nothing
     if obj.icon:
-        return _open_field_image(obj.icon)
+        return _open_field_image(obj.icon, size=size)
     return None
 
 
@@ -150,10 +256,20 @@ def _circle_crop(img: Image.Image, diameter: int) -> Image.Image:
 
 
 def _composite_over(base: Image.Image, overlay: Image.Image, x: int, y: int) -> None:
-    """Alpha-composite overlay onto base at position (x, y)."""
-    tmp = Image.new('RGBA', base.size, (0, 0, 0, 0))
-    tmp.paste(overlay.convert('RGBA'), (x, y))
-    base.alpha_composite(tmp)
+    """Alpha-composite overlay onto base at position (x, y).
+
+    Only the overlapping region is blended; parts of *overlay* that fall
+    outside *base* are clipped.
+    """
+    if overlay.mode != 'RGBA':
+        overlay = overlay.convert('RGBA')
+    left, top = max(x, 0), max(y, 0)
+    right = min(x + overlay.width, base.width)
+    bottom = min(y + overlay.height, base.height)
+    if right <= left or bottom <= top:
+        return
+    base.alpha_composite(overlay, dest=(left, top),
+                         source=(left - x, top - y, right - x, bottom - y))
 
 
 def _paste_centered(base: Image.Image, overlay: Image.Image, cx: int, cy: int) -> None:
@@ -166,24 +282,33 @@ def _paste_centered(base: Image.Image, overlay: Image.Image, cx: int, cy: int) -
 # Background gradient
 # ---------------------------------------------------------------------------
 
-def _draw_gradient(img: Image.Image) -> None:
-    """Fill img with a #171d3b→#a67963 diagonal (top-left→bottom-right) gradient."""
-    draw = ImageDraw.Draw(img)
+@lru_cache(maxsize=1)
+def _gradient_background() -> Image.Image:
+    """Return the cached #171d3b→#a67963 diagonal gradient canvas (read-only).
+
+    The colour only depends on ``x + y``, so a one-pixel strip holding every
+    anti-diagonal's colour is sheared across the canvas with a single affine
+    transform instead of drawing ~3000 lines.
+    """
     total = CARD_W + CARD_H
-    for i in range(total + 2):
-        t = i / total
-        color = (
-            round(C_NAVY[0] + (C_TAN[0] - C_NAVY[0]) * t),
-            round(C_NAVY[1] + (C_TAN[1] - C_NAVY[1]) * t),
-            round(C_NAVY[2] + (C_TAN[2] - C_NAVY[2]) * t),
+    strip = Image.new('RGBA', (total + 1, 1))
+    strip.putdata([
+        (
+            round(C_NAVY[0] + (C_TAN[0] - C_NAVY[0]) * i / total),
+            round(C_NAVY[1] + (C_TAN[1] - C_NAVY[1]) * i / total),
+            round(C_NAVY[2] + (C_TAN[2] - C_NAVY[2]) * i / total),
             255,
         )
-        # Anti-diagonal line strip that produces the true diagonal gradient
-        x1 = min(i, CARD_W - 1)
-        y1 = i - x1
-        x2 = i - min(i, CARD_H - 1)
-        y2 = min(i, CARD_H - 1)
-        draw.line([(x1, y1), (x2, y2)], fill=color, width=2)
+        for i in range(total + 1)
+    ])
+    # Output pixel (x, y) samples strip pixel (x + y, 0)
+    return strip.transform((CARD_W, CARD_H), Image.AFFINE, (1, 1, 0, 0, 0, 0),
+                           resample=Image.NEAREST)
+
+
+def _draw_gradient(img: Image.Image) -> None:
+    """Fill img with a #171d3b→#a67963 diagonal (top-left→bottom-right) gradient."""
+    img.paste(_gradient_background())
 
 
 # ---------------------------------------------------------------------------
@@ -193,14 +318,19 @@ def _draw_gradient(img: Image.Image) -> None:
 def _draw_watermark(img: Image.Image, text: str) -> None:
     """Draw large ghost watermark of the player name at ~5% opacity."""
     font = _load_font('Oswald-Bold.ttf', 400)
-    layer = Image.new('RGBA', img.size, (0, 0, 0, 0))
-    draw = ImageDraw.Draw(layer)
+    draw = ImageDraw.Draw(img)
     bbox = draw.textbbox((0, 0), text, font=font)
     tw, th = bbox[2] - bbox[0], bbox[3] - bbox[1]
     tx = (CARD_W - tw) // 2
     ty = (CARD_H - th) // 2
-    draw.text((tx, ty), text, font=font, fill=(255, 255, 255, 13))  # 13/255 ≈ 5%
-    img.alpha_composite(layer)
+    # Blend through a layer that only covers the glyphs, not the whole canvas
+    left, top, right, bottom = draw.textbbox((tx, ty), text, font=font)
+    if right <= left or bottom <= top:
+        return
+    layer = Image.new('RGBA', (right - left, bottom - top), (0, 0, 0, 0))
+    ImageDraw.Draw(layer).text((tx - left, ty - top), text, font=font,
+                               fill=(255, 255, 255, 13))  # 13/255 ≈ 5%
+    _composite_over(img, layer, left, top)
 
 
 # ---------------------------------------------------------------------------
@@ -240,16 +370,15 @@ def _draw_left_panel(base: Image.Image, profile) -> None:
     font_title = _load_font('Oswald-Regular.ttf', 24)
     font_map   = _load_font('Oswald-Regular.ttf', 24)
 
-    ICON_SIZE  = 65
+    ICON_SIZE  = ICON_BOX_SIZE
     ICON_GAP   = 14
     ROW_GAP    = 16          # extra vertical gap between icon rows
     RIGHT_EDGE = LEFT_END - PANEL_PAD   # content right-aligns to here
     MAX_W      = RIGHT_EDGE             # maximum content width
 
-    agents_list = list(profile.agents.all())
-    maps_list   = list(profile.maps.all())
+    agents_list, _, maps_list = profile_selections(profile)
 
-    MAP_IMG_W, MAP_IMG_H = 108, 58
+    MAP_IMG_W, MAP_IMG_H = MAP_THUMB_SIZE
     MAP_CARD_PAD = 10       # vertical padding inside each map card
     MAP_CARD_H   = MAP_IMG_H + MAP_CARD_PAD * 2
     MAP_ROW_GAP  = 12       # gap between consecutive map rows
@@ -284,10 +413,9 @@ def _draw_left_panel(base: Image.Image, profile) -> None:
             for agent in row:
                 draw.rectangle([rx, y, rx + ICON_SIZE - 1, y + ICON_SIZE - 1],
                                 fill=C_DARK, outline=C_BORDER)
-                icon_img = _get_icon(agent)
+                icon_img = _get_icon(agent, size=(ICON_IMG_SIZE, ICON_IMG_SIZE))
                 if icon_img:
-                    sz = int(ICON_SIZE * 0.8)
-                    icon_img = icon_img.resize((sz, sz), Image.LANCZOS)
+                    sz = ICON_IMG_SIZE
                     px = rx + (ICON_SIZE - sz) // 2
                     py = y  + (ICON_SIZE - sz) // 2
                     _composite_over(base, icon_img, px, py)
@@ -310,9 +438,8 @@ def _draw_left_panel(base: Image.Image, profile) -> None:
             card_y2 = y + MAP_CARD_H
             draw.rectangle([card_x, card_y1, RIGHT_EDGE, card_y2],
                             fill=C_DARK, outline=C_BORDER)
-            map_img = _get_icon(map_obj)
+            map_img = _get_icon(map_obj, size=MAP_THUMB_SIZE)
             if map_img:
-                map_img = map_img.resize((MAP_IMG_W, MAP_IMG_H), Image.LANCZOS).convert('RGBA')
                 _composite_over(base, map_img, card_x + 5, y + MAP_CARD_PAD)
             name_text = map_obj.name.upper()
             nbbox = draw.textbbox((0, 0), name_text, font=font_map)
@@ -326,6 +453,43 @@ def _draw_left_panel(base: Image.Image, profile) -> None:
 # Centre: Profile picture
 # ---------------------------------------------------------------------------
 
+GLITCH_OFFSET = 3
+
+
+def compose_glitch_pfp(img: Image.Image) -> Image.Image:
+    """Circle-crop *img* and stack the glitch layers the centre PFP is drawn with.
+
+    Returns a transparent ``(PFP_DIAMETER + 6) × PFP_DIAMETER`` image that is
+    pasted centred on (PFP_CX, PFP_CY). Compositing is associative, so the
+    pre-stacked result matches drawing the three layers onto the card.
+    """
+    cropped = _circle_crop(img, PFP_DIAMETER)
+    out = Image.new('RGBA', (PFP_DIAMETER + 2 * GLITCH_OFFSET, PFP_DIAMETER), (0, 0, 0, 0))
+
+    # Glitch layer B: red-shifted, nudged right, 30% opacity
+    r, g, b_ch, a = cropped.split()
+    b_layer = Image.merge('RGBA', (r, g, b_ch, a.point(lambda v: int(v * 0.30))))
+    _composite_over(out, b_layer, 2 * GLITCH_OFFSET, 0)
+
+    # Glitch layer S: cyan-shifted, nudged left, 40% opacity
+    s_layer = Image.merge('RGBA', (b_ch, g, r, a.point(lambda v: int(v * 0.40))))
+    _composite_over(out, s_layer, 0, 0)
+
+    # Main layer
+    _composite_over(out, cropped, GLITCH_OFFSET, 0)
+    return out
+
+
+def _current_derivative(profile, field_name: str):
+    """The *field_name* derivative if it was built from the picture currently set, else None."""
+    # Same check as Profile._derivative_url: the on-commit rebuild may not have run yet
+    field = getattr(profile, field_name, None)
+    source = getattr(profile, 'pfp_source', '')
+    if field and source and source == getattr(profile, 'picture_source', None):
+        return field
+    return None
+
+
 def _draw_pfp(base: Image.Image, profile) -> None:
     draw = ImageDraw.Draw(base)
 
@@ -334,26 +498,22 @@ def _draw_pfp(base: Image.Image, profile) -> None:
     draw.ellipse([PFP_CX - glow, PFP_CY - glow, PFP_CX + glow, PFP_CY + glow],
                  outline=(255, 255, 255, 50), width=3)
 
-    pfp_img = None
-    if profile.profile_picture:
-        pfp_img = _open_field_image(profile.profile_picture)
-    if pfp_img is None and profile.profile_picture_url:
-        pfp_img = _fetch_url(profile.profile_picture_url)
-
-    if pfp_img:
-        cropped = _circle_crop(pfp_img, PFP_DIAMETER)
-
-        # Glitch layer B: red-shifted, nudged right, 30% opacity
-        r, g, b_ch, a = cropped.split()
-        b_layer = Image.merge('RGBA', (r, g, b_ch, a.point(lambda v: int(v * 0.30))))
-        _paste_centered(base, b_layer, PFP_CX + 3, PFP_CY)
-
-        # Glitch layer S: cyan-shifted, nudged left, 40% opacity
-        s_layer = Image.merge('RGBA', (b_ch, g, r, a.point(lambda v: int(v * 0.40))))
-        _paste_centered(base, s_layer, PFP_CX - 3, PFP_CY)
+    card_pfp = None
+    derivative = _current_derivative(profile, 'pfp_card')
+    if derivative:
+        card_pfp = _open_field_image(derivative)
 
-        # Main layer
-        _paste_centered(base, cropped, PFP_CX, PFP_CY)
+    pfp_img = None
+    if card_pfp is None:
+        if profile.profile_picture:
+            pfp_img = _open_field_image(profile.profile_picture)
+        if pfp_img is None and profile.profile_picture_url:
+            pfp_img = _fetch_url(profile.profile_picture_url)
+        if pfp_img:
+            card_pfp = compose_glitch_pfp(pfp_img)
+
+    if card_pfp:
+        _paste_centered(base, card_pfp, PFP_CX, PFP_CY)
     else:
         # Placeholder circle with "?"
         draw.ellipse([PFP_CX - PFP_RADIUS, PFP_CY - PFP_RADIUS,
@@ -369,16 +529,29 @@ def _draw_pfp(base: Image.Image, profile) -> None:
 # Right panel: Player identity, roles, teammates
 # ---------------------------------------------------------------------------
 
+def _tracker_line(profile) -> str:
+    """'CURRENT DIAMOND 2 // K/D 1.21' from the latest tracker snapshot, or ''."""
+    snapshot = profile.latest_tracker_snapshot
+    if snapshot is None:
+        return ''
+    view = snapshot.view()
+    line = f"CURRENT {(view['current_rank'] or 'Unranked').upper()}"
+    if view['kd_ratio']:
+        line += f" // K/D {view['kd_ratio']}"
+    return line
+
+
 def _draw_right_panel(base: Image.Image, profile, teammates) -> None:
     draw = ImageDraw.Draw(base)
 
     font_team     = _load_font('Arimo-Bold.ttf',    26)
     font_name     = _load_font('Oswald-Bold.ttf',   90)
     font_tag      = _load_font('Oswald-Regular.ttf', 26)
+    font_stats    = _load_font('Oswald-Regular.ttf', 22)
     font_section  = _load_font('Oswald-Regular.ttf', 24)
     font_teammate = _load_font('Oswald-Regular.ttf', 22)
 
-    ICON_SIZE  = 65
+    ICON_SIZE  = ICON_BOX_SIZE
     ICON_GAP   = 14
     THUMB_D    = 60
     THUMB_PAD  = 10          # vertical padding inside each teammate row
@@ -387,7 +560,7 @@ def _draw_right_panel(base: Image.Image, profile, teammates) -> None:
     LEFT_EDGE  = RIGHT_START + PANEL_PAD
     GAP        = int(0.05 * CARD_H)   # gap between sections (~54px)
 
-    roles_list = list(profile.roles.all())
+    _, roles_list, _ = profile_selections(profile)
     tm_list    = list(teammates) if teammates else []
 
     # ---- Pre-measure heights using bbox[3] for accurate full-extent ----
@@ -395,12 +568,16 @@ def _draw_right_panel(base: Image.Image, profile, teammates) -> None:
     b_team = draw.textbbox((0, 0), team_text,                    font=font_team)
     b_name = draw.textbbox((0, 0), profile.in_game_name.upper(), font=font_name)
     b_tag  = draw.textbbox((0, 0), profile.riot_tag or '',        font=font_tag)
+    tracker_text = _tracker_line(profile)
+    b_stats = draw.textbbox((0, 0), tracker_text, font=font_stats)
 
     # Use bbox[3] (full anchor→bottom extent) as the y-advancement amount so
     # the next element always starts below the actual bottom pixel of glyphs.
     identity_h = b_team[3] + 14 + b_name[3] + 14
     if profile.riot_tag:
         identity_h += b_tag[3] + 10
+    if tracker_text:
+        identity_h += b_stats[3] + 10
 
     total_h = identity_h
     if roles_list:
@@ -424,6 +601,10 @@ def _draw_right_panel(base: Image.Image, profile, teammates) -> None:
         draw.text((LEFT_EDGE, y), profile.riot_tag, font=font_tag, fill=C_GREY)
         y += b_tag[3] + 10
 
+    if tracker_text:
+        draw.text((LEFT_EDGE, y), tracker_text, font=font_stats, fill=C_GREY)
+        y += b_stats[3] + 10
+
     # ---- Roles ----
     if roles_list:
         y += GAP
@@ -433,10 +614,9 @@ def _draw_right_panel(base: Image.Image, profile, teammates) -> None:
         for role in roles_list:
             draw.rectangle([rx, y, rx + ICON_SIZE - 1, y + ICON_SIZE - 1],
                             fill=C_DARK, outline=C_BORDER)
-            icon_img = _get_icon(role)
+            icon_img = _get_icon(role, size=(ICON_IMG_SIZE, ICON_IMG_SIZE))
             if icon_img:
-                sz = int(ICON_SIZE * 0.8)
-                icon_img = icon_img.resize((sz, sz), Image.LANCZOS)
+                sz = ICON_IMG_SIZE
                 px = rx + (ICON_SIZE - sz) // 2
                 py = y  + (ICON_SIZE - sz) // 2
                 _composite_over(base, icon_img, px, py)
@@ -453,13 +633,19 @@ def _draw_right_panel(base: Image.Image, profile, teammates) -> None:
             draw.rectangle([LEFT_EDGE - 5, y, card_right, y + TM_ROW_H],
                             fill=C_DARK, outline=C_BORDER)
 
-            tm_img = _open_field_image(tm.profile_picture) if tm.profile_picture else None
-            if tm_img is None and getattr(tm, 'profile_picture_url', None):
-                tm_img = _load_image_from_url_or_path(tm.profile_picture_url)
+            circ = None
+            derivative = _current_derivative(tm, 'pfp_thumb')
+            if derivative:
+                circ = _open_field_image(derivative)
+            if circ is None:
+                tm_img = _open_field_image(tm.profile_picture) if tm.profile_picture else None
+                if tm_img is None and getattr(tm, 'profile_picture_url', None):
+                    tm_img = _load_image_from_url_or_path(tm.profile_picture_url)
+                if tm_img:
+                    circ = _circle_crop(tm_img, THUMB_D)
 
             circle_y = y + THUMB_PAD
-            if tm_img:
-                circ = _circle_crop(tm_img, THUMB_D)
+            if circ:
                 _composite_over(base, circ, LEFT_EDGE, circle_y)
             else:
                 draw.ellipse([LEFT_EDGE, circle_y, LEFT_EDGE + THUMB_D, circle_y + THUMB_D],
@@ -477,6 +663,18 @@ def _draw_right_panel(base: Image.Image, profile, teammates) -> None:
 # Public entry point
 # ---------------------------------------------------------------------------
 
+def _remote_urls(profile, teammates) -> list:
+    """Collect every http(s) image the card will draw, so they can be fetched at once."""
+    agents, roles, maps = profile_selections(profile)
+    urls = [obj.get_icon_url() for obj in (*agents, *roles, *maps)]
+    # Originals are only drawn when there is no current derivative to use instead
+    if not _current_derivative(profile, 'pfp_card'):
+        urls.append(profile.profile_picture_url or '')
+    urls.extend(getattr(tm, 'profile_picture_url', '') or '' for tm in teammates
+                if not _current_derivative(tm, 'pfp_thumb'))
+    return [url for url in urls if url and _is_remote(url)]
+
+
 def build_card_image(profile, teammates) -> Image.Image:
     """Composite a 1920×1080 card image for the given profile.
 
@@ -487,10 +685,57 @@ def build_card_image(profile, teammates) -> Image.Image:
     Returns:
         PIL.Image.Image in RGBA mode.
     """
-    img = Image.new('RGBA', (CARD_W, CARD_H), (*C_DARK, 255))
-    _draw_gradient(img)
-    _draw_watermark(img, profile.in_game_name)
-    _draw_pfp(img, profile)
-    _draw_left_panel(img, profile)
-    _draw_right_panel(img, profile, teammates)
+    teammates = list(teammates) if teammates else []
+    token = _prefetched_remote.set(fetch_remote_assets(_remote_urls(profile, teammates)))
+    try:
+        img = _gradient_background().copy()
+        _draw_watermark(img, profile.in_game_name)
+        _draw_pfp(img, profile)
+        _draw_left_panel(img, profile)
+        _draw_right_panel(img, profile, teammates)
+    finally:
+        _prefetched_remote.reset(token)
     return img
+
+
+# ---------------------------------------------------------------------------
+# Worker warm-up
+# ---------------------------------------------------------------------------
+
+# (file, size) pairs requested by the panels above
+_CARD_FONTS = (
+    ('Oswald-Bold.ttf', 400), ('Oswald-Bold.ttf', 160), ('Oswald-Bold.ttf', 90),
+    ('Oswald-Regular.ttf', 26), ('Oswald-Regular.ttf', 24), ('Oswald-Regular.ttf', 22),
+    ('Arimo-Bold.ttf', 26),
+)
+
+# static image directory -> pre-resized size used on the card
+_CARD_ICON_DIRS = (
+    ('profiles/images/agents', (ICON_IMG_SIZE, ICON_IMG_SIZE)),
+    ('profiles/images/roles', (ICON_IMG_SIZE, ICON_IMG_SIZE)),
+    ('profiles/images/maps', MAP_THUMB_SIZE),
+)
+
+
+def warm_asset_cache() -> int:
+    """Decode the bundled fonts and catalog icons into the asset caches.
+
+    Intended to run once per worker at startup so the first card rendered
+    after a deploy does not pay for every decode. Returns the number of
+    assets loaded.
+    """
+    loaded = 0
+    for filename, size in _CARD_FONTS:
+        _load_font(filename, size)
+        loaded += 1
+    for relative_dir, size in _CARD_ICON_DIRS:
+        local_dir = _find_static(relative_dir)
+        if not local_dir:
+            continue
+        for path in sorted(Path(local_dir).glob('*.png')):
+            url = f'{settings.STATIC_URL.rstrip("/")}/{relative_dir}/{path.name}'
+            if not url.startswith('/'):
+                url = '/' + url
+            if _load_image_from_url_or_path(url, size=size) is not None:
+                loaded += 1
+    return loaded
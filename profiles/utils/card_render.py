@@ -0,0 +1,97 @@
+"""Player card rendering backends.
+
+``render_card(profile, teammates, request, fmt=...)`` returns the encoded
+PNG/WebP bytes for a card using the backend selected by
+``settings.CARD_RENDER_BACKEND``:
+
+* ``pillow``     — composites the card in-process via ``card_image`` (default).
+* ``playwright`` — screenshots ``card_profile.html`` on a warm headless
+  Chromium pool (``services.card_browser``) for pixel-perfect CSS fidelity.
+"""
+
+from __future__ import annotations
+
+import io
+
+from PIL import Image
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.urls import reverse
+
+from .card_image import build_card_image
+
+BACKEND_PILLOW = 'pillow'
+BACKEND_PLAYWRIGHT = 'playwright'
+RENDER_BACKENDS = (BACKEND_PILLOW, BACKEND_PLAYWRIGHT)
+
+# Bump whenever the card layout changes so cached renders are not reused.
+RENDERER_VERSION = 2
+
+# Download format -> response content type
+CARD_FORMATS = {
+    'png': 'image/png',
+    'webp': 'image/webp',
+}
+
+
+def get_render_backend() -> str:
+    """Return the configured backend name, validating it against RENDER_BACKENDS."""
+    backend = (getattr(settings, 'CARD_RENDER_BACKEND', BACKEND_PILLOW) or BACKEND_PILLOW).strip().lower()
+    if backend not in RENDER_BACKENDS:
+        raise ImproperlyConfigured(
+            f"CARD_RENDER_BACKEND must be one of {', '.join(RENDER_BACKENDS)} (got '{backend}')."
+        )
+    return backend
+
+
+def render_card_pillow(profile, teammates, fmt='png') -> bytes:
+    """Composite the card with Pillow and encode it as *fmt*."""
+    img = build_card_image(profile, teammates)
+    buffer = io.BytesIO()
+    if fmt == 'webp':
+        img.save(buffer, format='WEBP', quality=90, method=4)
+    else:
+        img.save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def render_card_playwright(profile, request=None) -> bytes:
+    """Screenshot the card page at 1920x1080 on the worker's warm Chromium pool.
+
+    The page is loaded over loopback from ``settings.CARD_RENDER_BASE_URL``;
+    the caller's session cookies are forwarded so the page renders the same
+    way it would for them.
+    """
+    from ..services.card_browser import get_card_browser_pool
+
+    base_url = getattr(settings, 'CARD_RENDER_BASE_URL', 'http://127.0.0.1:8000').rstrip('/')
+    internal_url = f"{base_url}{reverse('card_profile', args=[profile.id])}?screenshot=1"
+
+    cookies = []
+    if request is not None:
+        for name in ('sessionid', 'csrftoken'):
+            value = request.COOKIES.get(name)
+            if value:
+                cookies.append({"name": name, "value": value, "url": base_url})
+
+    return get_card_browser_pool().render(internal_url, cookies=cookies)
+
+
+def render_card(profile, teammates, request=None, backend=None, fmt='png') -> bytes:
+    """Render the card for *profile* with the selected backend, encoded as *fmt*."""
+    if fmt not in CARD_FORMATS:
+        raise ValueError(f"Unsupported card format '{fmt}'.")
+    backend = backend or get_render_backend()
+    if backend == BACKEND_PLAYWRIGHT:
+        png = render_card_playwright(profile, request=request)
+        if fmt == 'png':
+            return png
+        buffer = io.BytesIO()
+        Image.open(io.BytesIO(png)).save(buffer, format='WEBP', quality=90, method=4)
+        return buffer.getvalue()
+    return render_card_pillow(profile, teammates, fmt=fmt)
+
+
+def render_card_png(profile, teammates, request=None, backend=None) -> bytes:
+    """Render the card for *profile* as PNG bytes using the selected backend."""
+    return render_card(profile, teammates, request=request, backend=backend, fmt='png')
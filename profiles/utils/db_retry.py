@@ -0,0 +1,56 @@
+"""Retry short write transactions that lose the SQLite writer lock.
+
+Every gunicorn worker writes to the same database file. With WAL and
+IMMEDIATE transactions (see DATABASES in settings) a writer waits up to the
+busy timeout for the lock; under a burst it can still give up with
+"database is locked". ``@retry_on_locked`` re-runs the decorated function a
+few more times, sleeping a random ("full jitter") slice of an exponentially
+growing delay so the retries of competing workers spread out.
+
+The decorated function must own its transaction (open ``transaction.atomic``
+itself). Inside an enclosing atomic block the error is re-raised at once:
+the outer transaction is already broken and only its owner can start over.
+"""
+
+import functools
+import logging
+import random
+import time
+
+from django.conf import settings
+from django.db import OperationalError, transaction
+
+logger = logging.getLogger(__name__)
+
+LOCKED_MESSAGES = ('database is locked', 'database table is locked')
+
+
+def is_locked_error(exc):
+    return isinstance(exc, OperationalError) and any(msg in str(exc) for msg in LOCKED_MESSAGES)
+
+
+def retry_on_locked(func=None, *, attempts=None, base_delay=None, using='default'):
+    """Decorator: retry *func* when SQLite reports the database is locked.
+
+    Usable bare (``@retry_on_locked``) or with arguments. *attempts* and
+    *base_delay* default to SQLITE_LOCK_RETRIES / SQLITE_LOCK_RETRY_DELAY.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            tries = attempts or getattr(settings, 'SQLITE_LOCK_RETRIES', 4)
+            delay = base_delay if base_delay is not None else getattr(settings, 'SQLITE_LOCK_RETRY_DELAY', 0.05)
+            for attempt in range(1, tries + 1):
+                try:
+                    return func(*args, **kwargs)
+                except OperationalError as exc:
+                    if (not is_locked_error(exc) or attempt == tries
+                            or transaction.get_connection(using).in_atomic_block):
+                        raise
+                    pause = random.uniform(0, delay * 2 ** (attempt - 1))
+                    logger.info('%s: database locked (attempt %d/%d), retrying in %.0f ms',
+                                func.__qualname__, attempt, tries, pause * 1000)
+                    time.sleep(pause)
+        return wrapper
+
+    return decorator if func is None else decorator(func)
@@ -0,0 +1,104 @@
+"""Keyset (cursor) pagination for the roster list.
+
+Pages are fetched with ``WHERE (created_at, id) < cursor`` instead of
+OFFSET, so every page costs the same regardless of depth and rows inserted
+while someone is paging never shift or duplicate entries. Search results
+page the same way over ``(score, id)``. Cursors are opaque URL-safe tokens;
+a malformed one is treated as "first page".
+"""
+
+import base64
+import binascii
+import math
+from datetime import datetime
+
+from django.db.models import Q
+
+# SQLite binds integers as signed 64-bit; a larger cursor id would overflow
+_MAX_PK = 2 ** 63 - 1
+
+
+def _pack(*parts):
+    raw = '|'.join(str(part) for part in parts)
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def _unpack(token):
+    raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)).decode('utf-8')
+    return raw.split('|')
+
+
+def _pk(value):
+    pk = int(value)
+    if not 0 < pk <= _MAX_PK:
+        raise ValueError(f'cursor id out of range: {value}')
+    return pk
+
+
+def encode_cursor(obj):
+    return _pack(obj.created_at.isoformat(), obj.pk)
+
+
+def decode_cursor(token):
+    """Return ``(created_at, pk)`` for *token*, or None if it is missing or invalid."""
+    if not token:
+        return None
+    try:
+        created_at, pk = _unpack(token)
+        return datetime.fromisoformat(created_at), _pk(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+
+
+def keyset_page(queryset, cursor, page_size):
+    """Return ``(rows, next_cursor)`` for the page after *cursor*, newest first.
+
+    ``next_cursor`` is None on the last page.
+    """
+    queryset = queryset.order_by('-created_at', '-pk')
+    position = decode_cursor(cursor)
+    if position is not None:
+        created_at, pk = position
+        queryset = queryset.filter(
+            Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lt=pk)
+        )
+
+    rows = list(queryset[:page_size + 1])
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        return rows, encode_cursor(rows[-1])
+    return rows, None
+
+
+def _decode_ranked_cursor(token):
+    if not token:
+        return None
+    try:
+        score, pk = _unpack(token)
+        score = float(score)
+        if not math.isfinite(score):
+            return None
+        return score, _pk(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+
+
+def ranked_page(queryset, search, cursor, page_size):
+    """Page through search hits for the rows of *queryset*.
+
+    ``search(after=..., limit=...)`` returns ``[(pk, score), ...]`` ordered by
+    score ascending, then pk descending, starting after the ``(score, pk)``
+    position *after* (None for the first page) — e.g. ``search_profiles``
+    bound to the query text and *queryset*. Returns ``(rows, next_cursor)``
+    like ``keyset_page``.
+    """
+    hits = search(after=_decode_ranked_cursor(cursor), limit=page_size + 1)
+    has_more = len(hits) > page_size
+    hits = hits[:page_size]
+
+    rows_by_pk = queryset.in_bulk([pk for pk, _ in hits])
+    rows = [rows_by_pk[pk] for pk, _ in hits if pk in rows_by_pk]
+    if has_more and hits:
+        pk, score = hits[-1]
+        return rows, _pack(repr(score), pk)
+    return rows, None
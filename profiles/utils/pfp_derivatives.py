@@ -0,0 +1,123 @@
+"""Profile-picture derivatives, generated once whenever the picture changes.
+
+From the uploaded file (or ``profile_picture_url``) this builds:
+
+* ``pfp_card``  — the 350 px circle crop with the glitch layers pre-stacked,
+  pasted as-is by ``card_image._draw_pfp``;
+* ``pfp_thumb`` — the 60 px circle crop used for teammate rows;
+* ``pfp_list``  — a square WebP thumbnail for the roster list.
+
+``Profile.pfp_source`` records the upload name / URL the files were built
+from, so ``refresh_profile_picture_derivatives`` is a no-op until it changes.
+A picture that cannot be loaded is remembered in the default cache for
+PFP_DERIVATIVE_RETRY_SECONDS, so saves in the meantime do not fetch it again.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from PIL import Image
+
+from .db_retry import retry_on_locked
+
+from .card_image import (
+    _circle_crop,
+    _load_image_from_url_or_path,
+    _open_field_image,
+    compose_glitch_pfp,
+)
+
+logger = logging.getLogger(__name__)
+
+TEAMMATE_THUMB_D = 60
+LIST_THUMB_SIZE = 240          # 2x the 120px .card-pfp on the roster list
+
+DERIVATIVE_FIELDS = ('pfp_card', 'pfp_thumb', 'pfp_list')
+
+
+def _failure_key(source: str) -> str:
+    return 'pfp:failed:' + hashlib.sha256(source.encode()).hexdigest()
+
+
+def derivatives_outdated(profile) -> bool:
+    """True if *profile*'s derivatives do not match its picture and building them may succeed."""
+    source = profile.picture_source
+    if source == profile.pfp_source:
+        return False
+    return not source or cache.get(_failure_key(source)) is None
+
+
+def _load_source(profile):
+    if profile.profile_picture:
+        img = _open_field_image(profile.profile_picture)
+        if img is not None:
+            return img
+    if profile.profile_picture_url:
+        return _load_image_from_url_or_path(profile.profile_picture_url)
+    return None
+
+
+def _encode(img: Image.Image, fmt: str, **params) -> bytes:
+    buffer = io.BytesIO()
+    img.save(buffer, format=fmt, **params)
+    return buffer.getvalue()
+
+
+def _square_thumb(img: Image.Image, size: int) -> Image.Image:
+    side = min(img.width, img.height)
+    left = (img.width - side) // 2
+    top = (img.height - side) // 2
+    return img.crop((left, top, left + side, top + side)).resize((size, size), Image.LANCZOS)
+
+
+def delete_profile_picture_derivatives(profile) -> None:
+    """Remove the derivative files stored for *profile* (the fields are left for the caller)."""
+    for name in DERIVATIVE_FIELDS:
+        field = getattr(profile, name)
+        if field:
+            field.delete(save=False)
+
+
+def refresh_profile_picture_derivatives(profile, force: bool = False) -> bool:
+    """(Re)build the derivatives if the picture changed. Returns True if it ran."""
+    source = profile.picture_source
+    if not force and not derivatives_outdated(profile):
+        return False
+
+    delete_profile_picture_derivatives(profile)
+    profile.pfp_source = ''
+
+    img = _load_source(profile) if source else None
+    if img is not None:
+        stem = f'{profile.pk}'
+        profile.pfp_card.save(f'{stem}_card.png', ContentFile(_encode(compose_glitch_pfp(img), 'PNG')), save=False)
+        profile.pfp_thumb.save(f'{stem}_thumb.png',
+                               ContentFile(_encode(_circle_crop(img, TEAMMATE_THUMB_D), 'PNG')), save=False)
+        profile.pfp_list.save(f'{stem}_list.webp',
+                              ContentFile(_encode(_square_thumb(img, LIST_THUMB_SIZE).convert('RGBA'),
+                                                  'WEBP', quality=82, method=4)),
+                              save=False)
+        profile.pfp_source = source
+    elif source:
+        logger.warning('Could not load profile picture for profile_id=%s; derivatives skipped.', profile.pk)
+        cache.set(_failure_key(source), 1, getattr(settings, 'PFP_DERIVATIVE_RETRY_SECONDS', 3600))
+
+    _store_derivative_fields(profile)
+    return True
+
+
+@retry_on_locked
+def _store_derivative_fields(profile) -> None:
+    # Queryset update: no post_save re-entry and updated_at stays put
+    type(profile).objects.filter(pk=profile.pk).update(
+        pfp_card=profile.pfp_card.name or None,
+        pfp_thumb=profile.pfp_thumb.name or None,
+        pfp_list=profile.pfp_list.name or None,
+        pfp_source=profile.pfp_source,
+    )
@@ -0,0 +1,24 @@
+"""Valorant competitive tiers, as ordinals for range filtering.
+
+``Profile.peak_rank`` holds tracker.gg's display string ("Immortal 2",
+"Radiant", ...). ``rank_tier`` maps it to 1 (Iron) … 9 (Radiant); anything
+unrecognised, including an empty string, is 0 (unranked).
+"""
+
+RANK_TIERS = (
+    'Iron', 'Bronze', 'Silver', 'Gold', 'Platinum',
+    'Diamond', 'Ascendant', 'Immortal', 'Radiant',
+)
+
+UNRANKED = 0
+
+# (ordinal, label) pairs, unranked first
+RANK_TIER_CHOICES = [(UNRANKED, 'Unranked')] + [(i, name) for i, name in enumerate(RANK_TIERS, start=1)]
+
+_TIER_BY_NAME = {name.lower(): i for i, name in enumerate(RANK_TIERS, start=1)}
+
+
+def rank_tier(peak_rank):
+    """Return the tier ordinal for a display string such as ``'Gold 3'``."""
+    words = (peak_rank or '').split()
+    return _TIER_BY_NAME.get(words[0].lower(), UNRANKED) if words else UNRANKED
@@ -0,0 +1,206 @@
+"""Bounded, concurrent fetching of remote images used on player cards.
+
+``fetch_remote_assets(urls)`` downloads every URL in parallel through one
+pooled ``requests.Session`` and returns ``{url: local_path or None}``. The
+whole batch shares a single deadline (``CARD_REMOTE_FETCH_DEADLINE``) and
+each body is capped at ``CARD_REMOTE_MAX_BYTES``; anything slow, oversized
+or broken maps to None so the card draws its placeholder instead.
+
+Originals are kept on disk under ``CARD_REMOTE_CACHE_DIR``. A copy younger
+than ``CARD_REMOTE_FRESH_SECONDS`` is used as-is; older copies are
+revalidated with If-None-Match / If-Modified-Since, and a stale copy is
+still served if the origin is unreachable. Once the directory holds more
+than ``CARD_REMOTE_CACHE_MAX_ENTRIES`` originals, the least recently used
+third is deleted, the same way Django's file cache culls.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+_session = None
+_session_lock = threading.Lock()
+_prune_lock = threading.Lock()
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def _get_session() -> requests.Session:
+    """Return the process-wide pooled session (created on first use)."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                pool = int(_setting('CARD_REMOTE_WORKERS', 8))
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=pool, pool_maxsize=pool, max_retries=0)
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                session.headers['User-Agent'] = 'valo-playercard/1.0'
+                _session = session
+    return _session
+
+
+def _cache_dir() -> Path:
+    return Path(_setting('CARD_REMOTE_CACHE_DIR', Path(settings.BASE_DIR) / 'data' / 'remote_cache'))
+
+
+def _cache_paths(url: str):
+    digest = hashlib.sha256(url.encode('utf-8')).hexdigest()
+    base = _cache_dir() / digest[:2]
+    return base / f'{digest}.bin', base / f'{digest}.json'
+
+
+def _read_meta(meta_path: Path) -> dict:
+    try:
+        return json.loads(meta_path.read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def _last_used(body_path: Path) -> float:
+    # Hits touch the metadata file, never the body: card_image keys its
+    # decoded-image cache on the body's mtime.
+    for path in (body_path.with_suffix('.json'), body_path):
+        try:
+            return path.stat().st_mtime
+        except OSError:
+            continue
+    return 0.0
+
+
+def _prune_cache() -> None:
+    """Delete the least recently used third of the originals once over the cap."""
+    max_entries = int(_setting('CARD_REMOTE_CACHE_MAX_ENTRIES', 2000))
+    if max_entries <= 0 or not _prune_lock.acquire(blocking=False):
+        return
+    try:
+        bodies = list(_cache_dir().glob('*/*.bin'))
+        if len(bodies) <= max_entries:
+            return
+        bodies.sort(key=_last_used)
+        for body_path in bodies[:len(bodies) - max_entries * 2 // 3]:
+            for path in (body_path.with_suffix('.json'), body_path):
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+    finally:
+        _prune_lock.release()
+
+
+def _atomic_write(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as fh:
+            fh.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def _fetch_one(url: str, deadline_at: float) -> Optional[Path]:
+    body_path, meta_path = _cache_paths(url)
+    meta = _read_meta(meta_path) if body_path.exists() else {}
+
+    if meta and time.time() - meta.get('checked_at', 0) < _setting('CARD_REMOTE_FRESH_SECONDS', 3600):
+        try:
+            os.utime(meta_path)
+        except OSError:
+            pass
+        return body_path
+
+    headers = {}
+    if meta.get('etag'):
+        headers['If-None-Match'] = meta['etag']
+    if meta.get('last_modified'):
+        headers['If-Modified-Since'] = meta['last_modified']
+
+    remaining = deadline_at - time.monotonic()
+    if remaining <= 0:
+        return body_path if meta else None
+
+    max_bytes = int(_setting('CARD_REMOTE_MAX_BYTES', 5 * 1024 * 1024))
+    try:
+        with _get_session().get(url, headers=headers, timeout=remaining, stream=True) as resp:
+            if resp.status_code == 304 and meta:
+                meta['checked_at'] = time.time()
+                _atomic_write(meta_path, json.dumps(meta).encode('utf-8'))
+                return body_path
+            resp.raise_for_status()
+
+            declared = resp.headers.get('Content-Length')
+            if declared and declared.isdigit() and int(declared) > max_bytes:
+                raise ValueError(f'{declared} bytes exceeds the {max_bytes} byte limit')
+
+            chunks, size = [], 0
+            for chunk in resp.iter_content(64 * 1024):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise ValueError(f'body exceeds the {max_bytes} byte limit')
+                if time.monotonic() > deadline_at:
+                    raise TimeoutError('fetch deadline exceeded')
+                chunks.append(chunk)
+
+            _atomic_write(body_path, b''.join(chunks))
+            _atomic_write(meta_path, json.dumps({
+                'url': url,
+                'etag': resp.headers.get('ETag', ''),
+                'last_modified': resp.headers.get('Last-Modified', ''),
+                'checked_at': time.time(),
+            }).encode('utf-8'))
+            _prune_cache()
+            return body_path
+    except Exception as exc:
+        logger.info('Remote card asset fetch failed for %s: %s', url, exc)
+        # A stale copy beats a placeholder.
+        return body_path if meta else None
+
+
+def fetch_remote_assets(urls: Iterable[str], deadline: Optional[float] = None) -> Dict[str, Optional[Path]]:
+    """Fetch *urls* concurrently; return ``{url: cached file path or None}``.
+
+    Never blocks longer than *deadline* seconds (default
+    ``CARD_REMOTE_FETCH_DEADLINE``) in total.
+    """
+    unique = list(dict.fromkeys(u for u in urls if u))
+    if not unique:
+        return {}
+
+    deadline = float(deadline if deadline is not None else _setting('CARD_REMOTE_FETCH_DEADLINE', 5.0))
+    deadline_at = time.monotonic() + deadline
+    workers = max(1, min(len(unique), int(_setting('CARD_REMOTE_WORKERS', 8))))
+
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='card-fetch')
+    try:
+        futures = {executor.submit(_fetch_one, url, deadline_at): url for url in unique}
+        done, _ = wait(futures, timeout=deadline)
+        results = {}
+        for future, url in futures.items():
+            results[url] = future.result() if future in done else None
+        return results
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
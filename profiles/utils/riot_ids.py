@@ -0,0 +1,20 @@
+"""Canonical forms of player names and Riot IDs for equality checks.
+
+Riot IDs and in-game names are compared case-insensitively and ignoring
+surrounding whitespace; tags also ignore the leading '#'. The normalised
+values are stored alongside the originals (``*_norm`` columns) so lookups
+and uniqueness are plain indexed equality.
+"""
+
+# What the profile and sign-up forms accept as a Riot tag, e.g. '#NA1'
+RIOT_TAG_REGEX = r'^#[a-zA-Z0-9]{2,5}$'
+
+
+def normalize_name(value):
+    """``'  Tyloo '`` -> ``'tyloo'``; used for in-game names and Riot ID names."""
+    return (value or '').strip().casefold()
+
+
+def normalize_riot_tag(value):
+    """``'#NA1'`` -> ``'na1'``; an empty or missing tag is ``''``."""
+    return (value or '').strip().lstrip('#').casefold()
@@ -0,0 +1,213 @@
+"""
+Parsing of tracker.gg profile responses into playlist/season views.
+
+Pure functions over decoded JSON, with no Django or network access, so the
+fetch service (``services.tracker_api``) and stored snapshots
+(``TrackerSnapshot.view``) read the same shape.
+"""
+
+import heapq
+
+_KD_KEYS = ("kDRatio", "kdRatio", "kd", "killDeathRatio")
+
+
+class SegmentIndex:
+    """
+    A profile's ``segments`` grouped once by (type, playlist, seasonId).
+
+    ``None`` in a lookup matches any value, so ``first("season", "competitive")``
+    is the first competitive season segment of any season. Every lookup is a
+    dict hit; segments keep their API order within each group.
+    """
+
+    __slots__ = ("_groups",)
+
+    def __init__(self, segments):
+        groups = {}
+        for seg in segments:
+            attrs = seg.get("attributes") or {}
+            seg_type, playlist, season_id = seg.get("type"), attrs.get("playlist"), attrs.get("seasonId")
+            for key in {(seg_type, playlist, season_id), (seg_type, playlist, None), (seg_type, None, None)}:
+                groups.setdefault(key, []).append(seg)
+        self._groups = groups
+
+    def all(self, seg_type, playlist=None, season_id=None):
+        return self._groups.get((seg_type, playlist or None, season_id or None), [])
+
+    def first(self, seg_type, playlist=None, season_id=None):
+        found = self.all(seg_type, playlist, season_id)
+        return found[0] if found else None
+
+
+def _display(stats, name):
+    return (stats.get(name) or {}).get("displayValue", "")
+
+
+def _kd(stats):
+    for kd_key in _KD_KEYS:
+        if stats.get(kd_key):
+            return stats[kd_key].get("displayValue", "")
+    return ""
+
+
+def _agent_usage(seg):
+    # API order is not guaranteed to be "top": rank by matches, then time played
+    stats = seg.get("stats", {})
+    return (
+        stats.get("matchesPlayed", {}).get("value", 0),
+        stats.get("timePlayed", {}).get("value", 0),
+    )
+
+
+def _top_agents(agent_segs):
+    top_agents = []
+    for agent in heapq.nlargest(5, agent_segs, key=_agent_usage):
+        meta = agent.get("metadata", {})
+        attrs = agent.get("attributes", {})
+        name = (
+            meta.get("agentName")
+            or meta.get("name")
+            or attrs.get("agentName")
+            or attrs.get("agentId")
+            or "Unknown"
+        )
+        a_stats = agent.get("stats", {})
+        top_agents.append({
+            "name": name,
+            "wins": _display(a_stats, "matchesWon"),
+            "played": _display(a_stats, "matchesPlayed"),
+            "kd": _kd(a_stats),
+        })
+    return top_agents
+
+
+def _build_view(index, season, playlist, season_id):
+    """Stats, ranks and top agents for one (playlist, season); *season* may be None."""
+    season_stats = season["stats"] if season else {}
+
+    rank_meta = season_stats.get("rank", {}).get("metadata", {})
+    current_rank = rank_meta.get("tierName", "")
+    current_rank_icon = rank_meta.get("iconUrl", "")
+
+    # ── Peak rank — PRIMARY: dedicated peak-rating segment ──────────────
+    peak_seg = index.first("peak-rating", playlist)
+    if peak_seg:
+        pr = peak_seg["stats"].get("peakRating", {})
+    else:
+        # FALLBACK: season segment's peakRank (act-scoped only)
+        pr = season_stats.get("peakRank", {})
+    peak_meta = pr.get("metadata", {})
+    # Some tracker responses omit peak icon metadata; use current rank icon as fallback.
+    peak_rank_icon = peak_meta.get("iconUrl", "") or current_rank_icon
+
+    return {
+        "current_rank": current_rank,
+        "current_rank_icon": current_rank_icon,
+        "peak_rank": pr.get("displayValue", ""),
+        "peak_rank_icon": peak_rank_icon,
+        "peak_act": peak_meta.get("actName", ""),
+        "kd_ratio": _kd(season_stats),
+        "wins": _display(season_stats, "matchesWon"),
+        "matches_played": _display(season_stats, "matchesPlayed"),
+        "damage_per_round": _display(season_stats, "damagePerRound"),
+        "headshot_pct": _display(season_stats, "headshotsPercentage"),
+        "top_agents": _top_agents(index.all("agent", playlist, season_id) or index.all("agent")),
+    }
+
+
+_IDENTITY_FIELDS = ("riot_id", "riot_tag", "in_game_name", "avatar_url", "region")
+
+
+def parse_views(data):
+    """
+    Parse the raw tracker.gg API JSON into every (playlist, season) view it holds.
+
+    One response carries segments for all playlists and seasons, so the whole
+    result is cached per player and ``select_view`` picks the requested one::
+
+        {"riot_id": ..., "riot_tag": ..., "in_game_name": ..., "avatar_url": ..., "region": ...,
+         "default_playlist": "competitive", "default_season": "<seasonId>",
+         "seasons": {"<seasonId>": "<name>", ...},
+         "views": {"<playlist>": {"<seasonId>": {stats, ranks, top_agents}, ...}, ...}}
+
+    Playlists and seasons keep API order; a playlist with no season segment
+    gets a single view under the "" season.
+    """
+    platform = data["data"]["platformInfo"]
+    metadata = data["data"].get("metadata", {})
+    handle = platform["platformUserHandle"]
+    if "#" in handle:
+        riot_id, tag = handle.split("#", 1)
+        riot_tag = "#" + tag
+    else:
+        riot_id = handle
+        riot_tag = ""
+
+    index = SegmentIndex(data["data"]["segments"])
+    seasons = {}
+    views = {}
+    for seg in index.all("season"):
+        attrs = seg.get("attributes") or {}
+        playlist, season_id = attrs.get("playlist") or "", attrs.get("seasonId") or ""
+        by_season = views.setdefault(playlist, {})
+        if season_id in by_season:
+            continue  # the first matching segment wins, as in a linear scan
+        by_season[season_id] = _build_view(index, seg, playlist, season_id)
+        if season_id:
+            seasons.setdefault(season_id, (seg.get("metadata") or {}).get("name") or season_id)
+    for seg_type in ("peak-rating", "agent"):
+        for seg in index.all(seg_type):
+            playlist = (seg.get("attributes") or {}).get("playlist") or ""
+            if playlist not in views:
+                views[playlist] = {"": _build_view(index, None, playlist, "")}
+
+    return {
+        "riot_id": riot_id,
+        "riot_tag": riot_tag,
+        "in_game_name": riot_id,
+        "avatar_url": platform.get("avatarUrl", ""),
+        "region": metadata.get("activeShard", "").upper(),
+        "default_playlist": (metadata.get("defaultPlaylist") or "competitive").lower(),
+        "default_season": metadata.get("defaultSeason", ""),
+        "seasons": seasons,
+        "views": views,
+    }
+
+
+def select_view(profile, playlist="competitive", season_id=""):
+    """
+    Flatten one view of a ``parse_views`` result into the profile dict shape.
+
+    An unknown season falls back to the playlist's first season, and an
+    unknown playlist to the first playlist. The chosen ``playlist`` and
+    ``season_id`` are included in the result.
+    """
+    views = profile["views"]
+    playlist = (playlist or profile["default_playlist"]).lower()
+    by_season = views.get(playlist)
+    if by_season is None:
+        playlist, by_season = next(iter(views.items()), (playlist, {}))
+    season_id = season_id or profile["default_season"]
+    if season_id not in by_season:
+        season_id = next(iter(by_season), "")
+    view = by_season.get(season_id) or _build_view(SegmentIndex(()), None, None, "")
+
+    result = {name: profile[name] for name in _IDENTITY_FIELDS}
+    result.update(view, playlist=playlist, season_id=season_id)
+    return result
+
+
+def profile_response(profile, playlist="competitive", season_id=""):
+    """
+    The flat fields of the requested view plus ``seasons`` and ``views``
+    carrying every other one, so clients can switch playlist or season
+    without another request.
+    """
+    result = select_view(profile, playlist=playlist, season_id=season_id)
+    result.update(seasons=profile["seasons"], views=profile["views"], fetched_at=profile.get("fetched_at"))
+    return result
+
+
+def parse_profile(data, playlist="competitive", season_id=""):
+    """Parse the raw tracker.gg API JSON into a flat dict for one playlist and season."""
+    return select_view(parse_views(data), playlist=playlist, season_id=season_id)
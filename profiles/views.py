@@ -1,15 +1,39 @@
 from django.shortcuts import render, redirect, get_object_or_404
+from django.urls import reverse
 from django.contrib import messages
 from django.contrib.auth import login, logout
 from django.contrib.auth.decorators import login_required
-from django.db import transaction
-from django.http import Http404
-from django.utils.http import url_has_allowed_host_and_scheme
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.http import Http404, HttpResponse, JsonResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, url_has_allowed_host_and_scheme
 from django.views.decorators.http import require_POST
 from django_ratelimit.decorators import ratelimit
+import functools
 import logging
-from .models import Profile, Agent, Role, Team, Map, UserProfile
+from .models import Profile, UserProfile
+from .catalog import get_catalog
 from .forms import ProfileForm, SignUpForm, LoginForm
+from .services import jobs
+from .services.card_browser import CardBrowserBusy
+from .services.facets import (
+    FACETS,
+    apply_filters,
+    empty_filters,
+    facet_counts,
+    filters_query,
+    has_active_filters,
+    parse_filters,
+)
+from .services.search import search_filter, search_profiles
+from .services.tracker_snapshots import record_cached_snapshot
+from .tasks import CARD_RENDER
+from .utils.card_cache import card_cache_key, get_card, store_card
+from .utils.card_render import CARD_FORMATS, get_render_backend, render_card
+from .utils.db_retry import retry_on_locked
+from .utils.pagination import keyset_page, ranked_page
+from .utils.ranks import RANK_TIER_CHOICES, UNRANKED
 
 
 logger = logging.getLogger(__name__)
@@ -31,12 +55,40 @@ def _user_has_any_profile(user):
     return Profile.objects.filter(user=user).exists()
 
 
+@retry_on_locked
+def _save_atomically(profile):
+    with transaction.atomic():
+        profile.save()
+
+
+def _save_profile(profile, form):
+    """Save *profile*; if a concurrent save took its name or Riot ID, flag *form* and return False."""
+    try:
+        _save_atomically(profile)
+    except IntegrityError:
+        taken_name = Profile.objects.exclude(pk=profile.pk).filter(
+            in_game_name_norm=profile.in_game_name_norm,
+        ).exists()
+        form.add_error('in_game_name' if taken_name else 'riot_id', 'This was taken a moment ago. Please choose another.')
+        return False
+    return True
+
+
 def _apply_tracker_peak_rank(profile, request):
-    """Apply peak-rank fields captured from the tracker fetch endpoint."""
+    """
+    Apply peak-rank fields captured from the tracker fetch endpoint, taken from
+    the playlist/season view the widget last showed when it is one we fetched.
+    """
     tracker_data = request.session.get('tracker_autofill_profile') or {}
     if tracker_data:
-        profile.peak_rank = tracker_data.get('peak_rank') or ''
-        profile.peak_rank_icon = tracker_data.get('peak_rank_icon') or ''
+        views = tracker_data.get('views') or {}
+        by_season = views.get(request.POST.get('tracker_playlist', '')) or {}
+        chosen = by_season.get(request.POST.get('tracker_season', ''))
+        if chosen:
+            profile.peak_rank, profile.peak_rank_icon = chosen
+        else:
+            profile.peak_rank = tracker_data.get('peak_rank') or ''
+            profile.peak_rank_icon = tracker_data.get('peak_rank_icon') or ''
 
 
 # ---------------------------------------------------------------------------
@@ -113,6 +165,23 @@ def logout_view(request):
 # CLAIM PROFILE VIEW
 # ---------------------------------------------------------------------------
 
+_CLAIMED, _CLAIM_TAKEN, _CLAIM_HAS_PROFILE = 'claimed', 'taken', 'has_profile'
+
+
+@retry_on_locked
+def _claim_profile(profile_id, user):
+    """Attach the profile to *user* in one short write transaction; returns the outcome."""
+    with transaction.atomic():
+        locked_profile = Profile.objects.select_for_update().get(id=profile_id)
+        if locked_profile.is_claimed:
+            return _CLAIM_TAKEN
+        if _user_has_any_profile(user):
+            return _CLAIM_HAS_PROFILE
+        locked_profile.user = user
+        locked_profile.save(update_fields=['user', 'updated_at'])
+    return _CLAIMED
+
+
 @login_required
 def claim_profile_view(request, profile_id):
     profile = get_object_or_404(Profile, id=profile_id)
@@ -131,27 +200,18 @@ def claim_profile_view(request, profile_id):
         messages.error(request, 'Your account has no Riot ID on file. Please contact support.')
         return redirect('display_profile', profile_id=profile_id)
 
-    user_riot_id = user_profile.riot_id.strip().lower()
-    user_riot_tag = (user_profile.riot_tag or '').strip().lower()
-    profile_riot_id = profile.riot_id.strip().lower()
-    profile_riot_tag = (profile.riot_tag or '').strip().lower()
-
-    if user_riot_id == profile_riot_id and user_riot_tag == profile_riot_tag:
+    if user_profile.matches_profile(profile):
         if request.method == 'POST':
             try:
-                with transaction.atomic():
-                    locked_profile = Profile.objects.select_for_update().get(id=profile_id)
-                    if locked_profile.is_claimed:
-                        messages.error(request, 'This profile has already been claimed.')
-                        return redirect('display_profile', profile_id=profile_id)
-                    if _user_has_any_profile(request.user):
-                        messages.error(request, 'You already have a profile — you cannot claim another.')
-                        return redirect('display_profile', profile_id=request.user.profile.id)
-
-                    locked_profile.user = request.user
-                    locked_profile.save()
+                outcome = _claim_profile(profile_id, request.user)
             except Profile.DoesNotExist as exc:
                 raise Http404('Profile not found.') from exc
+            if outcome == _CLAIM_TAKEN:
+                messages.error(request, 'This profile has already been claimed.')
+                return redirect('display_profile', profile_id=profile_id)
+            if outcome == _CLAIM_HAS_PROFILE:
+                messages.error(request, 'You already have a profile — you cannot claim another.')
+                return redirect('display_profile', profile_id=request.user.profile.id)
 
             messages.success(request, f'Profile "{profile.in_game_name}" has been claimed!')
             return redirect('display_profile', profile_id=profile_id)
@@ -231,26 +291,28 @@ def input_profile(request):
                     pass
 
             _apply_tracker_peak_rank(profile, request)
-            profile.save()
-            request.session.pop('tracker_autofill_profile', None)
-
-            agent_ids = request.POST.getlist('agent_id')
-            if agent_ids:
-                profile.agents.set(agent_ids)
-
-            role_ids = request.POST.getlist('role_id')
-            if role_ids:
-                profile.roles.set(role_ids)
-
-            map_ids = request.POST.getlist('map_id')
-            if map_ids:
-                if len(map_ids) > 3:
-                    messages.warning(request, "You can select up to 3 maps. Only the first 3 were saved.")
-                    map_ids = map_ids[:3]
-                profile.maps.set(map_ids)
-
-            messages.success(request, 'Profile created successfully!')
-            return redirect('display_profile', profile_id=profile.id)
+            if _save_profile(profile, profile_form):
+                if request.session.pop('tracker_autofill_profile', None):
+                    # Keep the stats the widget just fetched (from the cache, no new call)
+                    record_cached_snapshot(profile)
+
+                agent_ids = request.POST.getlist('agent_id')
+                if agent_ids:
+                    profile.agents.set(agent_ids)
+
+                role_ids = request.POST.getlist('role_id')
+                if role_ids:
+                    profile.roles.set(role_ids)
+
+                map_ids = request.POST.getlist('map_id')
+                if map_ids:
+                    if len(map_ids) > 3:
+                        messages.warning(request, "You can select up to 3 maps. Only the first 3 were saved.")
+                        map_ids = map_ids[:3]
+                    profile.maps.set(map_ids)
+
+                messages.success(request, 'Profile created successfully!')
+                return redirect('display_profile', profile_id=profile.id)
     else:
         if request.user.is_authenticated:
             try:
@@ -265,12 +327,13 @@ def input_profile(request):
         else:
             profile_form = ProfileForm()
 
+    catalog = get_catalog()
     return render(request, 'profiles/input_form.html', {
         'profile_form': profile_form,
-        'available_agents': Agent.objects.select_related('role').all(),
-        'available_roles': Role.objects.all(),
-        'available_teams': Team.objects.all(),
-        'available_maps': Map.objects.all(),
+        'available_agents': catalog.agents,
+        'available_roles': catalog.roles,
+        'available_teams': catalog.teams,
+        'available_maps': catalog.maps,
         'selected_agent_ids': selected_agent_ids,
         'selected_role_ids': selected_role_ids,
         'selected_map_ids': selected_map_ids,
@@ -288,43 +351,82 @@ def display_profile(request, profile_id):
 
     user_has_profile = _user_has_any_profile(request.user)
 
+    snapshot = profile.latest_tracker_snapshot
     return render(request, 'profiles/display_profile.html', {
         'profile': profile,
         'teammates': teammates,
         'user_has_profile': user_has_profile,
         'is_owner': _user_owns_profile(request.user, profile),
+        'tracker_snapshot': snapshot,
+        'tracker': snapshot.view() if snapshot else None,
     })
 
 
+def _facet_chips(records, counts, selected):
+    return [(record, counts.get(record.id, 0), record.id in selected) for record in records]
+
+
 def profile_list(request):
-    """List all profiles with optional search/filter."""
-    profiles = Profile.objects.all()
+    """List profiles with search and faceted filters, one keyset page at a time.
+
+    ``q`` goes through the full-text index (name, Riot ID, team, bio, agents,
+    maps) where available, otherwise it is an in-game-name substring match.
+    Team (including free agents), role, agent and map filters are multi-select;
+    ``rank_min`` / ``rank_max`` bound the peak rank tier. Every chip shows how
+    many players it would match, all counted in one grouped query.
+    """
+    base = Profile.objects.select_related('team')
 
     q = request.GET.get('q', '').strip()
-    team_filter = request.GET.get('team', '').strip()
-    role_filter = request.GET.get('role', '').strip()
-
-    if q:
-        profiles = profiles.filter(in_game_name__icontains=q)
-    if team_filter == 'free_agent':
-        profiles = profiles.filter(team__isnull=True)
-    elif team_filter:
-        profiles = profiles.filter(team__id=team_filter)
-    if role_filter:
-        profiles = profiles.filter(roles__id=role_filter)
+    filters = parse_filters(request.GET)
+
+    search = search_filter(q) if q else None
+    if q and search is None:
+        base = base.filter(in_game_name__icontains=q)
+    profiles = apply_filters(base, filters)
+
+    page_size = getattr(settings, 'PROFILE_LIST_PAGE_SIZE', 24)
+    if search is not None:
+        # Full-text hits, best match first; the filters run inside the FTS query
+        hits = functools.partial(search_profiles, q, profiles)
+        page, next_cursor = ranked_page(profiles, hits, request.GET.get('cursor'), page_size)
+        # Facets count every match: the MATCH is a subquery of the count statement
+        base = base.filter(search)
+    else:
+        page, next_cursor = keyset_page(profiles, request.GET.get('cursor'), page_size)
+
+    query = filters_query(filters, q)
+    next_query = ''
+    if next_cursor:
+        query['cursor'] = next_cursor
+        next_query = query.urlencode()
+        del query['cursor']
 
     owned_ids = set()
     if request.user.is_authenticated:
         owned_ids = set(Profile.objects.filter(user=request.user).values_list('id', flat=True))
 
+    counts = facet_counts(base, filters)
+    catalog = get_catalog()
+    rank_counts = counts['rank']
     return render(request, 'profiles/profile_list.html', {
-        'profiles': profiles,
+        'profiles': page,
         'owned_ids': owned_ids,
-        'teams': Team.objects.all().order_by('custom_order', 'name'),
-        'roles': Role.objects.all().order_by('name'),
         'q': q,
-        'team_filter': team_filter,
-        'role_filter': role_filter,
+        'filters': filters,
+        'filters_active': has_active_filters(filters),
+        'free_agent_count': counts['team'].get(None, 0),
+        'team_chips': _facet_chips(catalog.teams, counts['team'], filters['teams']),
+        'role_chips': _facet_chips(catalog.roles, counts['role'], filters['role']),
+        'agent_chips': _facet_chips(catalog.agents, counts['agent'], filters['agent']),
+        'map_chips': _facet_chips(catalog.maps, counts['map'], filters['map']),
+        'rank_options': [(tier, name, rank_counts.get(tier, 0)) for tier, name in RANK_TIER_CHOICES if tier],
+        'unranked_count': rank_counts.get(UNRANKED, 0),
+        'clear_query': {facet: filters_query(filters, q, drop=facet).urlencode() for facet in FACETS},
+        'search_query': filters_query(empty_filters(), q).urlencode(),
+        'is_first_page': not request.GET.get('cursor'),
+        'first_page_query': query.urlencode(),
+        'next_page_query': next_query,
     })
 
 
@@ -373,23 +475,25 @@ def edit_profile(request, profile_id):
                 pass
 
             _apply_tracker_peak_rank(profile, request)
-            profile.save()
-            request.session.pop('tracker_autofill_profile', None)
+            if _save_profile(profile, profile_form):
+                if request.session.pop('tracker_autofill_profile', None):
+                    # Keep the stats the widget just fetched (from the cache, no new call)
+                    record_cached_snapshot(profile)
 
-            agent_ids = request.POST.getlist('agent_id')
-            profile.agents.set(agent_ids if agent_ids else [])
+                agent_ids = request.POST.getlist('agent_id')
+                profile.agents.set(agent_ids if agent_ids else [])
 
-            role_ids = request.POST.getlist('role_id')
-            profile.roles.set(role_ids if role_ids else [])
+                role_ids = request.POST.getlist('role_id')
+                profile.roles.set(role_ids if role_ids else [])
 
-            map_ids = request.POST.getlist('map_id')
-            if map_ids and len(map_ids) > 3:
-                messages.warning(request, "You can select up to 3 maps. Selection was truncated.")
-                map_ids = map_ids[:3]
-            profile.maps.set(map_ids if map_ids else [])
+                map_ids = request.POST.getlist('map_id')
+                if map_ids and len(map_ids) > 3:
+                    messages.warning(request, "You can select up to 3 maps. Selection was truncated.")
+                    map_ids = map_ids[:3]
+                profile.maps.set(map_ids if map_ids else [])
 
-            messages.success(request, 'Profile updated successfully!')
-            return redirect('display_profile', profile_id=profile.id)
+                messages.success(request, 'Profile updated successfully!')
+                return redirect('display_profile', profile_id=profile.id)
     else:
         profile_form = ProfileForm(instance=profile)
         _lock_riot_fields(profile_form, request.user)
@@ -397,14 +501,15 @@ def edit_profile(request, profile_id):
         selected_role_ids = list(profile.roles.values_list('id', flat=True))
         selected_map_ids = list(profile.maps.values_list('id', flat=True))
 
+    catalog = get_catalog()
     return render(request, 'profiles/input_form.html', {
         'profile_form': profile_form,
         'profile': profile,
         'is_edit': True,
-        'available_agents': Agent.objects.select_related('role').all(),
-        'available_roles': Role.objects.all(),
-        'available_teams': Team.objects.all(),
-        'available_maps': Map.objects.all(),
+        'available_agents': catalog.agents,
+        'available_roles': catalog.roles,
+        'available_teams': catalog.teams,
+        'available_maps': catalog.maps,
         'selected_agent_ids': selected_agent_ids,
         'selected_role_ids': selected_role_ids,
         'selected_map_ids': selected_map_ids,
@@ -420,53 +525,74 @@ def card_profile(request, profile_id):
     if profile.team:
         teammates = Profile.objects.filter(team=profile.team).exclude(id=profile.id)
 
+    snapshot = profile.latest_tracker_snapshot
     return render(request, 'profiles/card_profile.html', {
         'profile': profile,
         'teammates': teammates,
+        'tracker': snapshot.view() if snapshot else None,
     })
 
 
 def download_card_png(request, profile_id):
-    """Capture the card page at 1920x1080 via Playwright and serve as a PNG download."""
-    from django.http import HttpResponse, JsonResponse
+    """Serve the 1920x1080 card as a PNG (or ``?format=webp``) download.
 
-    get_object_or_404(Profile, id=profile_id)
+    Renders are cached by content hash; the hash is sent as the ETag so a
+    repeat download of an unchanged card is answered with 304.
 
-    session_cookie = request.COOKIES.get('sessionid')
-    csrftoken = request.COOKIES.get('csrftoken')
+    With ``?async=1`` an uncached card is rendered by a background job
+    instead: the response is 202 with a job to poll, and once it is done the
+    plain download URL is served straight from the cache.
+    """
+    profile = get_object_or_404(Profile.objects.select_related('team'), id=profile_id)
 
-    internal_url = f'http://127.0.0.1:8000/profile/{profile_id}/card/?screenshot=1'
+    fmt = request.GET.get('format', 'png').strip().lower()
+    if fmt not in CARD_FORMATS:
+        return JsonResponse({'error': 'Unsupported format. Use png or webp.'}, status=400)
 
-    try:
-        from playwright.sync_api import sync_playwright
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True)
-            context = browser.new_context(viewport={"width": 1920, "height": 1080})
-
-            cookies = []
-            if session_cookie:
-                cookies.append({"name": "sessionid", "value": session_cookie, "domain": "127.0.0.1", "path": "/"})
-            if csrftoken:
-                cookies.append({"name": "csrftoken", "value": csrftoken, "domain": "127.0.0.1", "path": "/"})
-            if cookies:
-                context.add_cookies(cookies)
-
-            page = context.new_page()
-            page.goto(internal_url, wait_until="networkidle")
-            page.wait_for_timeout(2000)
-
-            screenshot = page.screenshot(full_page=False)
-            browser.close()
-
-        response = HttpResponse(screenshot, content_type='image/png')
-        response['Content-Disposition'] = f'attachment; filename="playercard_{profile_id}.png"'
-        return response
+    teammates = []
+    if profile.team:
+        teammates = list(Profile.objects.filter(team=profile.team).exclude(id=profile.id))
 
+    try:
+        backend = get_render_backend()
+        key = card_cache_key(profile, teammates, backend, fmt)
+        entry = get_card(key)
+        if request.GET.get('async'):
+            download_url = f"{reverse('card_download', args=[profile.id])}?format={fmt}"
+            if entry is not None:
+                return JsonResponse({'ok': True, 'job': {'status': 'done', 'result': {
+                    'etag': key, 'download_url': download_url,
+                }}})
+            job = jobs.enqueue(CARD_RENDER, {'profile_id': profile.id, 'fmt': fmt},
+                               dedup_key=f'card:{key}')
+            return JsonResponse({
+                'ok': True,
+                'job': jobs.job_status(job),
+                'status_url': reverse('job_status', args=[job.id]),
+            }, status=202)
+        if entry is None:
+            body = render_card(profile, teammates, request=request, backend=backend, fmt=fmt)
+            entry = store_card(key, body, profile.id)
+    except CardBrowserBusy:
+        logger.warning('Card renderer busy for profile_id=%s', profile_id)
+        return JsonResponse({'error': 'The card renderer is busy. Please try again shortly.'}, status=503)
     except Exception:
         logger.exception('Card PNG generation failed for profile_id=%s', profile_id)
-        from django.http import JsonResponse
         return JsonResponse({'error': 'Failed to generate card image.'}, status=500)
 
+    etag = f'"{key}"'
+    last_modified = int(entry['rendered_at'])
+    not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if not_modified is not None:
+        return not_modified
+
+    response = HttpResponse(entry['body'], content_type=CARD_FORMATS[fmt])
+    response['Content-Disposition'] = f'attachment; filename="playercard_{profile_id}.{fmt}"'
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    response['Cache-Control'] = 'no-cache'
+    return response
+
 
 @require_POST
 def delete_profile(request, profile_id):
@@ -501,7 +627,7 @@ def unclaim_profile_view(request):
         profile = request.user.profile
         profile_id = profile.id
         profile.user = None
-        profile.save()
+        profile.save(update_fields=['user', 'updated_at'])
         messages.success(request, 'Profile unclaimed. You can now claim a different profile.')
         return redirect('display_profile', profile_id=profile_id)
 
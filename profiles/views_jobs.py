@@ -0,0 +1,21 @@
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
+
+from .models import Job
+from .services.jobs import job_status
+from .tasks import TRACKER_FETCH
+from .views_tracker import remember_tracker_autofill
+
+
+@require_GET
+def job_status_view(request, job_id):
+    """Poll the state of a queued background job."""
+    job = Job.objects.filter(id=job_id).first()
+    # Jobs started by a signed-in user are only visible to that user.
+    if job is None or (job.user_id is not None and job.user_id != request.user.id):
+        return JsonResponse({"error": "Job not found."}, status=404)
+
+    if job.kind == TRACKER_FETCH and job.status == Job.STATUS_DONE and job.result:
+        remember_tracker_autofill(request, job.result)
+
+    return JsonResponse({"ok": True, "job": job_status(job)})
@@ -0,0 +1,39 @@
+import hashlib
+
+from django.conf import settings
+from django.http import JsonResponse
+from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.views.decorators.http import require_GET
+
+from .services.suggest import KIND_TEAM, suggest
+
+MAX_SUGGEST_LIMIT = 20
+
+
+@require_GET
+def search_suggest(request):
+    """Typeahead suggestions (players, Riot IDs, teams) for the roster search box."""
+    q = request.GET.get('q', '').strip()[:50]
+    try:
+        limit = min(max(int(request.GET.get('limit', '')), 1), MAX_SUGGEST_LIMIT)
+    except ValueError:
+        limit = getattr(settings, 'SUGGEST_LIMIT', 8)
+
+    version, matches = suggest(q, limit)
+    etag = '"%s"' % hashlib.sha1(f'{version}|{q.lower()}|{limit}'.encode('utf-8')).hexdigest()
+
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        results = []
+        for kind, label, pk in matches:
+            if kind == KIND_TEAM:
+                url = f"{reverse('profile_list')}?team={pk}"
+            else:
+                url = reverse('display_profile', args=[pk])
+            results.append({"type": kind, "label": label, "id": pk, "url": url})
+        response = JsonResponse({"q": q, "results": results})
+
+    response['ETag'] = etag
+    patch_cache_control(response, public=True, max_age=getattr(settings, 'SUGGEST_MAX_AGE', 30))
+    return response
@@ -1,20 +1,97 @@
 import json
+import logging
+import re
 
-from django.http import JsonResponse
+from django.conf import settings
+from django.http import JsonResponse, StreamingHttpResponse
+from django.urls import reverse
 from django.views.decorators.http import require_POST
+from django_ratelimit.core import is_ratelimited
 from django_ratelimit.decorators import ratelimit
 
-from .services.tracker_api import fetch_tracker_profile, parse_tracker_url
+from .services import jobs
+from .services.tracker_api import parse_tracker_url, tracker_cache_key
+from .services.tracker_snapshots import fetch_tracker_profile, fresh_tracker_profile, iter_tracker_profiles
+from .tasks import TRACKER_FETCH
+from .utils.riot_ids import RIOT_TAG_REGEX
+
+logger = logging.getLogger(__name__)
+
+# Player lookups per IP, shared by the single and batch endpoints
+TRACKER_FETCH_GROUP = 'tracker-fetch'
+TRACKER_FETCH_RATE = '10/m'
+TOO_MANY_LOOKUPS = "Too many tracker requests. Please wait about 60 seconds and try again."
+
+
+def remember_tracker_autofill(request, data):
+    """
+    Keep the fetched peak rank in the session so the profile form can apply it,
+    with the peak of every other view the widget can switch to.
+    """
+    request.session['tracker_autofill_profile'] = {
+        'peak_rank': data.get('peak_rank') or '',
+        'peak_rank_icon': data.get('peak_rank_icon') or '',
+        'views': {
+            playlist: {
+                season_id: [view.get('peak_rank') or '', view.get('peak_rank_icon') or '']
+                for season_id, view in by_season.items()
+            }
+            for playlist, by_season in (data.get('views') or {}).items()
+        },
+    }
+
+
+def _riot_id_lookup(riot_id, riot_tag):
+    """``(riot_id, riot_tag)`` stripped, or None unless both are text and the tag is one the profile form accepts."""
+    if not isinstance(riot_id, str) or not isinstance(riot_tag, str):
+        return None
+    riot_id, riot_tag = riot_id.strip(), riot_tag.strip()
+    if not riot_id or not re.match(RIOT_TAG_REGEX, riot_tag):
+        return None
+    return riot_id, riot_tag
+
+
+def tracker_lookup(entry):
+    """
+    Turn a request body (or one batch entry) into ``((riot_id, riot_tag, playlist, season_id), error)``.
+
+    Accepts ``{"tracker_url": ...}`` or ``{"riot_id": ..., "riot_tag": ...}``;
+    batch entries may also be a plain tracker URL or ``"Name#TAG"`` string.
+    The Riot ID must be non-empty text and the tag ``#`` plus 2-5 ASCII
+    letters or digits, as the profile form requires.
+    """
+    if isinstance(entry, str):
+        text = entry.strip()
+        if "://" in text:
+            entry = {"tracker_url": text}
+        else:
+            riot_id, _, riot_tag = text.partition("#")
+            if _riot_id_lookup(riot_id, "#" + riot_tag.strip()):
+                entry = {"riot_id": riot_id, "riot_tag": "#" + riot_tag.strip()}
+
+    if not isinstance(entry, dict):
+        return None, "Expected a tracker.gg URL or a Riot ID like 'Name#TAG'."
+    if "tracker_url" in entry:
+        result = parse_tracker_url(str(entry["tracker_url"]))
+        riot_ids = result and _riot_id_lookup(result["riot_id"], result["riot_tag"])
+        if not riot_ids:
+            return None, "Invalid or unrecognised tracker.gg profile URL."
+        return (
+            *riot_ids,
+            result.get("playlist") or "competitive",
+            result.get("season_id") or "",
+        ), None
+    riot_ids = _riot_id_lookup(entry.get("riot_id"), entry.get("riot_tag"))
+    if riot_ids:
+        return (*riot_ids, "competitive", ""), None
+    return None, "Provide either 'tracker_url' or both 'riot_id' and 'riot_tag'."
 
 
 @require_POST
-@ratelimit(key='ip', rate='10/m', method='POST', block=False)
+@ratelimit(group=TRACKER_FETCH_GROUP, key='ip', rate=TRACKER_FETCH_RATE, method='POST', block=False)
 def fetch_tracker_stats(request):
     if getattr(request, 'limited', False):
-        return JsonResponse(
-            {"error": "Too many tracker requests. Please wait about 60 seconds and try again."},
-            status=429,
-        )
+        return JsonResponse({"error": TOO_MANY_LOOKUPS}, status=429)
 
     if not request.user.is_authenticated:
         return JsonResponse({"error": "Login required."}, status=401)
@@ -23,30 +100,32 @@ def fetch_tracker_stats(request):
         body = json.loads(request.body)
     except (json.JSONDecodeError, ValueError):
         return JsonResponse({"error": "Invalid JSON body."}, status=400)
+    if not isinstance(body, dict):
+        # Plain "Name#TAG" / URL strings are a batch-entry shorthand only
+        return JsonResponse({"error": "Provide either 'tracker_url' or both 'riot_id' and 'riot_tag'."},
+                            status=400)
+
+    lookup, error = tracker_lookup(body)
+    if error:
+        return JsonResponse({"error": error}, status=400)
+    riot_id, riot_tag, playlist, season_id = lookup
+
+    fresh = fresh_tracker_profile(riot_id, riot_tag, playlist=playlist, season_id=season_id)
+    if fresh is not None:
+        # A recent snapshot answers it: no upstream call and no job
+        remember_tracker_autofill(request, fresh)
+        return JsonResponse({"ok": True, "data": fresh})
 
-    riot_id = None
-    riot_tag = None
-    playlist = "competitive"
-    season_id = ""
-
-    if "tracker_url" in body:
-        result = parse_tracker_url(body["tracker_url"])
-        if result is None:
-            return JsonResponse(
-                {"error": "Invalid or unrecognised tracker.gg profile URL."},
-                status=400,
-            )
-        riot_id = result["riot_id"]
-        riot_tag = result["riot_tag"]
-        playlist = result.get("playlist") or "competitive"
-        season_id = result.get("season_id") or ""
-    elif "riot_id" in body and "riot_tag" in body:
-        riot_id = body["riot_id"]
-        riot_tag = body["riot_tag"]
-    else:
+    if body.get("async"):
+        job = jobs.enqueue(
+            TRACKER_FETCH,
+            {"riot_id": riot_id, "riot_tag": riot_tag, "playlist": playlist, "season_id": season_id},
+            dedup_key=f"{tracker_cache_key(riot_id, riot_tag)}|{playlist}|{season_id}",
+            user=request.user,
+        )
         return JsonResponse(
-            {"error": "Provide either 'tracker_url' or both 'riot_id' and 'riot_tag'."},
-            status=400,
+            {"ok": True, "job": jobs.job_status(job), "status_url": reverse('job_status', args=[job.id])},
+            status=202,
         )
 
     try:
@@ -64,9 +143,85 @@ def fetch_tracker_stats(request):
             status=500,
         )
 
-    request.session['tracker_autofill_profile'] = {
-        'peak_rank': data.get('peak_rank') or '',
-        'peak_rank_icon': data.get('peak_rank_icon') or '',
-    }
+    remember_tracker_autofill(request, data)
 
     return JsonResponse({"ok": True, "data": data})
+
+
+def _ndjson(line):
+    return json.dumps(line, separators=(",", ":")) + "\n"
+
+
+def _stream_batch(lookups, indexes, invalid):
+    """One NDJSON line per player: unusable entries first, then lookups as they finish."""
+    for index, error in invalid:
+        yield _ndjson({"index": index, "ok": False, "error": error})
+
+    for position, data, exc in iter_tracker_profiles(
+        lookups, workers=getattr(settings, 'TRACKER_BATCH_WORKERS', 4),
+    ):
+        index = indexes[position]
+        if exc is None:
+            yield _ndjson({"index": index, "ok": True, "data": data})
+        elif isinstance(exc, ValueError):
+            yield _ndjson({"index": index, "ok": False, "error": str(exc)})
+        else:
+            logger.error("Tracker batch lookup failed", exc_info=exc)
+            yield _ndjson({"index": index, "ok": False,
+                           "error": "An internal error occurred while fetching tracker data."})
+
+
+@require_POST
+@ratelimit(key='ip', rate='3/m', method='POST', block=False)
+def fetch_tracker_batch(request):
+    """
+    Look up a whole roster at once: ``{"players": [...]}`` with up to
+    TRACKER_BATCH_MAX entries, each anything ``tracker_lookup`` accepts.
+
+    Streams ``application/x-ndjson``, one ``{"index", "ok", "data" | "error"}``
+    line per player as soon as it resolves; ``index`` is its position in
+    ``players``. The fetched ranks are not kept for the profile form.
+
+    Each usable entry costs one lookup from the same per-IP allowance as
+    ``fetch_tracker_stats``; entries past it fail with the 429 message.
+    """
+    if getattr(request, 'limited', False):
+        return JsonResponse({"error": TOO_MANY_LOOKUPS}, status=429)
+
+    if not request.user.is_authenticated:
+        return JsonResponse({"error": "Login required."}, status=401)
+
+    try:
+        body = json.loads(request.body)
+    except (json.JSONDecodeError, ValueError):
+        return JsonResponse({"error": "Invalid JSON body."}, status=400)
+
+    players = body.get("players") if isinstance(body, dict) else None
+    if not isinstance(players, list) or not players:
+        return JsonResponse({"error": "Provide a non-empty 'players' list."}, status=400)
+    max_players = getattr(settings, 'TRACKER_BATCH_MAX', 10)
+    if len(players) > max_players:
+        return JsonResponse({"error": f"At most {max_players} players per request."}, status=400)
+
+    lookups, indexes, invalid = [], [], []
+    limited = False
+    for index, entry in enumerate(players):
+        lookup, error = tracker_lookup(entry)
+        if not error:
+            limited = limited or is_ratelimited(request, group=TRACKER_FETCH_GROUP, key='ip',
+                                                rate=TRACKER_FETCH_RATE, method='POST', increment=True)
+            if limited:
+                error = TOO_MANY_LOOKUPS
+        if error:
+            invalid.append((index, error))
+        else:
+            lookups.append(lookup)
+            indexes.append(index)
+    if limited and not lookups:
+        return JsonResponse({"error": TOO_MANY_LOOKUPS}, status=429)
+
+    response = StreamingHttpResponse(_stream_batch(lookups, indexes, invalid),
+                                     content_type="application/x-ndjson")
+    response["Cache-Control"] = "no-store"
+    response["X-Accel-Buffering"] = "no"  # let nginx pass each line through as it is written
+    return response
@@ -2,8 +2,11 @@
 # --- Imports first, always ---
 from pathlib import Path
 from urllib.parse import urlparse
+import atexit
 import os
+import shutil
 import sys
+import tempfile
 
 # --- Helper functions ---
 
@@ -83,13 +86,54 @@ TEMPLATES = [
 
 # --- Database ---
 
+# One SQLite file shared by every gunicorn worker. WAL lets readers run
+# alongside the single writer; IMMEDIATE transactions take the write lock at
+# BEGIN, so they queue on busy_timeout instead of failing mid-way when a read
+# lock cannot be upgraded. profiles.utils.db_retry retries whatever still
+# times out.
+SQLITE_BUSY_TIMEOUT = float(os.environ.get('SQLITE_BUSY_TIMEOUT', '5'))          # seconds
+SQLITE_CACHE_SIZE_KB = int(os.environ.get('SQLITE_CACHE_SIZE_KB', '16384'))      # page cache per connection
+SQLITE_MMAP_SIZE = int(os.environ.get('SQLITE_MMAP_SIZE', str(128 * 1024 * 1024)))
+SQLITE_LOCK_RETRIES = int(os.environ.get('SQLITE_LOCK_RETRIES', '4'))
+SQLITE_LOCK_RETRY_DELAY = float(os.environ.get('SQLITE_LOCK_RETRY_DELAY', '0.05'))  # first backoff, seconds
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'data' / 'db.sqlite3',
+        'OPTIONS': {
+            'init_command': ';'.join([
+                'PRAGMA journal_mode=WAL',
+                'PRAGMA synchronous=NORMAL',          # durable at checkpoints; safe with WAL
+                f'PRAGMA busy_timeout={int(SQLITE_BUSY_TIMEOUT * 1000)}',
+                f'PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}',
+                f'PRAGMA mmap_size={SQLITE_MMAP_SIZE}',
+                'PRAGMA temp_store=MEMORY',
+            ]),
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': SQLITE_BUSY_TIMEOUT,
+        },
     }
 }
 
+# --- Caches ---
+
+CACHES = {
+    # Shared by every gunicorn worker (rate-limit counters, tracker results,
+    # catalog / suggest versions) without an external service
+    'default': {
+        'BACKEND': 'profiles.sqlite_cache.SQLiteCache',
+        'LOCATION': os.environ.get('CACHE_SQLITE_PATH', str(BASE_DIR / 'data' / 'cache.sqlite3')),
+        'OPTIONS': {'MAX_ENTRIES': int(os.environ.get('CACHE_MAX_ENTRIES', '20000'))},
+    },
+    # Rendered card PNG/WebP bytes, shared by every gunicorn worker
+    'cards': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'data' / 'card_cache',
+        'OPTIONS': {'MAX_ENTRIES': 2000},
+    },
+}
+
 # --- Password validation ---
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -129,6 +173,9 @@ LOGIN_URL = '/accounts/login/'
 LOGIN_REDIRECT_URL = '/'
 LOGOUT_REDIRECT_URL = '/'
 
+# Database sessions whose writes retry on "database is locked"
+SESSION_ENGINE = 'profiles.sessions'
+
 # --- Security (all tied to DEBUG so they activate automatically in prod) ---
 
 CSRF_COOKIE_SECURE = not DEBUG        # only send CSRF cookie over HTTPS
@@ -160,10 +207,104 @@ SECURE_REFERRER_POLICY = 'strict-origin-when-cross-origin'
 FILE_UPLOAD_MAX_MEMORY_SIZE = 5 * 1024 * 1024
 DATA_UPLOAD_MAX_MEMORY_SIZE = 5 * 1024 * 1024
 
+# --- Catalog (agents / roles / maps / teams) ---
+
+# How often each process checks the shared catalog version for admin edits
+# made elsewhere (profiles/catalog.py).
+CATALOG_VERSION_CHECK_INTERVAL = float(os.environ.get('CATALOG_VERSION_CHECK_INTERVAL', '1'))
+
+# --- Roster list ---
+
+PROFILE_LIST_PAGE_SIZE = int(os.environ.get('PROFILE_LIST_PAGE_SIZE', '24'))
+# Queries matching more profiles than this are listed newest first instead of by bm25
+PROFILE_SEARCH_RANK_LIMIT = int(os.environ.get('PROFILE_SEARCH_RANK_LIMIT', '10000'))
+
+# Typeahead (/api/search/suggest/): results per query, browser cache lifetime,
+# and how often workers check whether their prefix index is stale.
+SUGGEST_LIMIT = int(os.environ.get('SUGGEST_LIMIT', '8'))
+SUGGEST_MAX_AGE = int(os.environ.get('SUGGEST_MAX_AGE', '30'))
+SUGGEST_VERSION_CHECK_INTERVAL = float(os.environ.get('SUGGEST_VERSION_CHECK_INTERVAL', '2'))
+
+# --- Player card rendering ---
+
+# 'pillow' composites the PNG in-process; 'playwright' screenshots card_profile.html
+# in headless Chromium (pixel-perfect CSS, but far slower and heavier per download).
+CARD_RENDER_BACKEND = os.environ.get('CARD_RENDER_BACKEND', 'pillow').strip().lower()
+# Loopback origin the playwright backend loads the card page from
+CARD_RENDER_BASE_URL = os.environ.get('CARD_RENDER_BASE_URL', 'http://127.0.0.1:8000')
+
+# Cache alias and lifetime for rendered cards (see profiles/utils/card_cache.py)
+CARD_CACHE_ALIAS = os.environ.get('CARD_CACHE_ALIAS', 'cards')
+CARD_CACHE_TIMEOUT = int(os.environ.get('CARD_CACHE_TIMEOUT', str(7 * 24 * 3600)))
+
+# Decoded fonts/icons kept per worker by card_image, and whether to preload them at startup
+CARD_ASSET_CACHE_BYTES = int(os.environ.get('CARD_ASSET_CACHE_BYTES', str(64 * 1024 * 1024)))
+CARD_ASSET_WARMUP = _env_bool('CARD_ASSET_WARMUP', default=True)
+
+# Remote images on cards (avatars, URL icons): fetched in parallel under one deadline
+# and kept on disk, revalidated with ETag/Last-Modified once older than the fresh window
+CARD_REMOTE_FETCH_DEADLINE = float(os.environ.get('CARD_REMOTE_FETCH_DEADLINE', '5'))
+CARD_REMOTE_MAX_BYTES = int(os.environ.get('CARD_REMOTE_MAX_BYTES', str(5 * 1024 * 1024)))
+CARD_REMOTE_WORKERS = int(os.environ.get('CARD_REMOTE_WORKERS', '8'))
+CARD_REMOTE_FRESH_SECONDS = int(os.environ.get('CARD_REMOTE_FRESH_SECONDS', '3600'))
+CARD_REMOTE_CACHE_DIR = BASE_DIR / 'data' / 'remote_cache'
+# Originals kept on disk; the least recently used third is culled past this (0 = no cap)
+CARD_REMOTE_CACHE_MAX_ENTRIES = int(os.environ.get('CARD_REMOTE_CACHE_MAX_ENTRIES', '2000'))
+
+# Warm Chromium pool used by the playwright backend (per gunicorn worker)
+CARD_BROWSER_POOL_SIZE = int(os.environ.get('CARD_BROWSER_POOL_SIZE', '1'))
+CARD_BROWSER_QUEUE_MAX = int(os.environ.get('CARD_BROWSER_QUEUE_MAX', '8'))
+CARD_BROWSER_JOB_TIMEOUT = float(os.environ.get('CARD_BROWSER_JOB_TIMEOUT', '20'))
+CARD_BROWSER_RECYCLE_AFTER = int(os.environ.get('CARD_BROWSER_RECYCLE_AFTER', '100'))
+
+# How long a profile picture that could not be loaded is left alone before a
+# save tries to build its derivatives again (see profiles/utils/pfp_derivatives.py)
+PFP_DERIVATIVE_RETRY_SECONDS = int(os.environ.get('PFP_DERIVATIVE_RETRY_SECONDS', '3600'))
+
+# --- Background jobs ---
+
+# Worker threads each web process starts for queued jobs; set to 0 when running
+# dedicated workers with `python manage.py run_jobs`.
+JOBS_INPROCESS_WORKERS = int(os.environ.get('JOBS_INPROCESS_WORKERS', '2'))
+JOBS_POLL_INTERVAL = float(os.environ.get('JOBS_POLL_INTERVAL', '1'))
+JOBS_STALE_SECONDS = int(os.environ.get('JOBS_STALE_SECONDS', '600'))
+JOBS_RETENTION_SECONDS = int(os.environ.get('JOBS_RETENTION_SECONDS', '86400'))
+
 # --- Tracker.GG ---
 
 TRACKER_CF_CLEARANCE = os.environ.get("TRACKER_CF_CLEARANCE", "")
 TRACKER_EXTRA_COOKIES = os.environ.get("TRACKER_EXTRA_COOKIES", "")
+TRACKER_REQUEST_TIMEOUT = float(os.environ.get("TRACKER_REQUEST_TIMEOUT", "15"))
+# Idle curl_cffi sessions kept open per impersonation profile (shared by all threads)
+TRACKER_SESSION_POOL_SIZE = int(os.environ.get("TRACKER_SESSION_POOL_SIZE", "8"))
+
+# Stop calling tracker.gg for COOLDOWN seconds after THRESHOLD consecutive
+# lookups are refused (401/403/429).
+TRACKER_BREAKER_THRESHOLD = int(os.environ.get("TRACKER_BREAKER_THRESHOLD", "3"))
+TRACKER_BREAKER_COOLDOWN = int(os.environ.get("TRACKER_BREAKER_COOLDOWN", "300"))
+
+# Parsed profile cache: fresh for TTL seconds, then served stale (and refreshed
+# in the background) for STALE_SECONDS more. 404s are remembered briefly.
+TRACKER_CACHE_ALIAS = os.environ.get("TRACKER_CACHE_ALIAS", "default")
+TRACKER_CACHE_TTL = int(os.environ.get("TRACKER_CACHE_TTL", "600"))
+TRACKER_CACHE_STALE_SECONDS = int(os.environ.get("TRACKER_CACHE_STALE_SECONDS", "3600"))
+TRACKER_NOT_FOUND_TTL = int(os.environ.get("TRACKER_NOT_FOUND_TTL", "120"))
+
+# Persisted snapshots (one row per refresh): a snapshot younger than
+# FRESH_SECONDS answers lookups without calling tracker.gg. Each profile keeps
+# its newest KEEP rows, dropping any older than RETENTION_DAYS (never the latest).
+TRACKER_SNAPSHOT_FRESH_SECONDS = int(os.environ.get("TRACKER_SNAPSHOT_FRESH_SECONDS", str(6 * 3600)))
+TRACKER_SNAPSHOT_KEEP = int(os.environ.get("TRACKER_SNAPSHOT_KEEP", "10"))
+TRACKER_SNAPSHOT_RETENTION_DAYS = int(os.environ.get("TRACKER_SNAPSHOT_RETENTION_DAYS", "90"))
+
+# Site-wide tracker.gg requests per minute that `manage.py refresh_tracker_ranks`
+# may use; interactive lookups count against it but never wait.
+TRACKER_UPSTREAM_RPM = int(os.environ.get("TRACKER_UPSTREAM_RPM", "30"))
+
+# Batch autofill (POST /api/fetch-tracker/batch/): players per request and
+# concurrent lookups per request
+TRACKER_BATCH_MAX = int(os.environ.get("TRACKER_BATCH_MAX", "10"))
+TRACKER_BATCH_WORKERS = int(os.environ.get("TRACKER_BATCH_WORKERS", "4"))
 
 # --- Test/CI override (must be LAST) ---
 
@@ -171,4 +312,10 @@ TRACKER_EXTRA_COOKIES = os.environ.get("TRACKER_EXTRA_COOKIES", "")
 if 'test' in sys.argv or os.environ.get("CI") == "true":
     SECURE_SSL_REDIRECT = False
     SESSION_COOKIE_SECURE = False
-    CSRF_COOKIE_SECURE = False
\ No newline at end of file
+    CSRF_COOKIE_SECURE = False
+    # Keep test runs out of the real caches under data/: one scratch directory, removed at exit
+    _TEST_CACHE_DIR = Path(tempfile.mkdtemp(prefix='valo-test-cache-'))
+    atexit.register(shutil.rmtree, _TEST_CACHE_DIR, ignore_errors=True)
+    CACHES['default']['LOCATION'] = str(_TEST_CACHE_DIR / 'cache.sqlite3')
+    CACHES['cards']['LOCATION'] = _TEST_CACHE_DIR / 'card_cache'
+    CARD_REMOTE_CACHE_DIR = _TEST_CACHE_DIR / 'remote_cache'
\ No newline at end of file
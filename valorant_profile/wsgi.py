@@ -9,3 +9,15 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'valorant_profile.settings')
 
 application = get_wsgi_application()
+
+# Load the catalog snapshot and decode card fonts/icons up front so the first
+# requests after a deploy aren't the slow ones.
+from django.conf import settings  # noqa: E402
+from profiles.catalog import warm_catalog  # noqa: E402
+
+warm_catalog()
+
+if settings.CARD_ASSET_WARMUP:
+    from profiles.utils.card_image import warm_asset_cache
+
+    warm_asset_cache()